@@ -36,5 +36,14 @@ from .qchemparser import QChem
 #   from cclib.parser import ccread
 from .ccopen import ccopen
 from .ccopen import ccread
+from .ccopen import ccread_many
+from .ccopen import ParseTimeout
+from .ccopen import ccread_archive
+from .ccopen import ccsniff
+from .ccopen import ccstatus
+from .ccopen import iter_frames
+
+from .cache import ParseCache
+from .index import SectionIndex
 
 from .data import ccData
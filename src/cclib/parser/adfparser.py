@@ -25,6 +25,48 @@ from . import utils
 class ADF(logfileparser.Logfile):
     """An ADF log file"""
 
+    # Phrases that start each section parsed in extract(), in the same order.
+    section_triggers = [
+        "(INPUT FILE)",
+        "Create",
+        "Symmetry:",
+        "Irreducible Representations, including subspecies",
+        "Molecule:",
+        "ATOMS",
+        "FRAGMENTS",
+        "Net Charge",
+        "S C F   U P D A T E S",
+        "Numerical Integration : Voronoi Polyhedra (Te Velde)",
+        "General Accuracy Parameter",
+        "Numerical Integration : Fuzzy Cells (Becke)",
+        "Becke grid quality",
+        ("======  smat", ["aooverlaps"]),
+        "CYCLE    1",
+        "Total Bonding Energy:",
+        "Final Geometry",
+        "Coordinates (Cartesian)",
+        "Geometry Convergence Tests",
+        "Geometry CONVERGED",
+        "Geometry Convergence after Step",
+        "Orbital Energies, per Irrep and Spin",
+        "Orbital Energies, both Spins",
+        "Orbital Energies, all Irreps",
+        ("Vibrations and Normal Modes", ["vibdisps"]),
+        "List of All Frequencies",
+        "Total nr. of (C)SFOs (summation over all irreps)",
+        ("This section contains the SFO overlap matrices", ["fooverlaps"]),
+        ("SFO MO coefficients", ["mocoeffs"]),
+        ("Final excitation energies from Davidson algorithm", ["etenergies", "etoscs", "etsecs", "etsyms"]),
+        "M U L L I K E N   P O P U L A T I O N S",
+        "Dipole Moment",
+    ]
+
+    # Attributes that are parsed once and never change afterwards.
+    final_attributes = ["charge", "mult", "natom", "nbasis"]
+
+    # Phrases printed at the end of jobs that terminate normally, for status().
+    termination_triggers = ["NORMAL TERMINATION"]
+
     def __init__(self, *args, **kwargs):
 
         # Call the __init__ method of the superclass
@@ -166,7 +208,7 @@ class ADF(logfileparser.Logfile):
         # and the atommasses (previously called vibmasses)
             self.updateprogress(inputfile, "Attributes", self.cupdate)
 
-            self.atomcoords = []
+            self.atomcoords = utils.FrameBuffer()
 
             self.skip_lines(inputfile, ['header1', 'header2', 'header3'])
 
@@ -366,7 +408,7 @@ class ADF(logfileparser.Logfile):
         if line[:21] == "Total Bonding Energy:":
 
             if not hasattr(self, "scfenergies"):
-                self.scfenergies = []
+                self.scfenergies = utils.FrameBuffer()
 
             energy = utils.convertor(float(line.split()[3]), "hartree", "eV")
             self.scfenergies.append(energy)
@@ -386,7 +428,7 @@ class ADF(logfileparser.Logfile):
                 line = next(inputfile)
 
             if not hasattr(self, "atomcoords"):
-                self.atomcoords = []
+                self.atomcoords = utils.FrameBuffer()
             self.atomcoords.append(atomcoords)
 
             # Don't get any more coordinates in this case.
@@ -422,7 +464,7 @@ class ADF(logfileparser.Logfile):
                 self.geotargets = numpy.array([0.0, 0.0, 0.0, 0.0, 0.0], "d")
 
             if not hasattr(self, "scfenergies"):
-                self.scfenergies = []
+                self.scfenergies = utils.FrameBuffer()
 
             self.skip_lines(inputfile, ['e', 'b'])
 
@@ -496,7 +538,7 @@ class ADF(logfileparser.Logfile):
             cart_step_rms = next(inputfile)
 
             if not hasattr(self, "scfenergies"):
-                self.scfenergies = []
+                self.scfenergies = utils.FrameBuffer()
 
             energy = utils.convertor(float(current_energy.split()[-2]), "hartree", "eV")
             self.scfenergies.append(energy)
@@ -805,7 +847,9 @@ class ADF(logfileparser.Logfile):
                 # blankline blankline
                 next(inputfile); next(inputfile)
 
-        if line[1:32] == "S F O   P O P U L A T I O N S ,":
+        # This line follows the header of the SFO populations only when they include
+        # the overlap matrices (not always the case since ADF 2013).
+        if line[1:47] == "This section contains the SFO overlap matrices":
         #Extract overlap matrix
 
 #            self.fooverlaps = numpy.zeros((self.nbasis, self.nbasis), "d")
@@ -829,18 +873,14 @@ class ADF(logfileparser.Logfile):
                 if not hasattr(self,"fooverlaps"): # make sure there is a matrix to store this
                     self.fooverlaps = numpy.zeros((self.nbasis, self.nbasis), "d")
 
+                lines = []
                 base = 0
                 while base < nosymrep: #have we read all the columns?
 
                     for i in range(nosymrep - base):
 
                         self.updateprogress(inputfile, "Overlap", self.fupdate)
-                        line = next(inputfile)
-                        parts = line.split()[1:]
-                        for j in range(len(parts)):
-                            k = float(parts[j])
-                            self.fooverlaps[base + symoffset + j, base + symoffset +i] = k
-                            self.fooverlaps[base + symoffset + i, base + symoffset + j] = k
+                        lines.append(next(inputfile))
 
                     #blank, blank, column
                     for i in range(3):
@@ -848,6 +888,9 @@ class ADF(logfileparser.Logfile):
 
                     base += 4
 
+                block = slice(symoffset, symoffset + nosymrep)
+                self.fooverlaps[block, block] = utils.readmatrix(lines, nosymrep, 4, start=5, triangular=True)
+
                 symoffset += nosymrep
                 base = 0
 
@@ -918,26 +961,25 @@ class ADF(logfileparser.Logfile):
                     self.skip_lines(inputfile, ['occup', 'label'])
 
                     # The table can end with a blank line or "1".
-                    row = 0
+                    lines = []
                     line = next(inputfile)
                     while not line.strip() in ["", "1"]:
-                        info = line.split()
 
-                        if int(info[0]) < self.start_indeces[sym]:
+                        if int(line.split()[0]) < self.start_indeces[sym]:
                         #check to make sure we aren't parsing CFs
                             line = next(inputfile)
                             continue
 
                         self.updateprogress(inputfile, "Coefficients", self.fupdate)
-                        row += 1
-                        coeffs = [float(x) for x in info[1:]]
-                        moindices = [aolist[n-1] for n in monumbers]
-                        # The AO index is 1 less than the row.
-                        aoindex = symoffset + row - 1
-                        for i in range(len(monumbers)):
-                            self.mocoeffs[spin][moindices[i], aoindex] = coeffs[i]
+                        lines.append(line)
                         line = next(inputfile)
-                    lastrow = row
+
+                    # The AO index is 1 less than the row.
+                    coeffs = utils.readfields(lines, start=6, ncols=len(monumbers))
+                    moindices = [aolist[n-1] for n in monumbers]
+                    aoindices = list(range(symoffset, symoffset + len(lines)))
+                    self.mocoeffs[spin][numpy.ix_(moindices, aoindices)] = coeffs.T
+                    lastrow = len(lines)
 
         # **************************************************************************
         # *                                                                        *
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of cclib (http://cclib.github.io), a library for parsing
+# and interpreting the results of computational chemistry packages.
+#
+# Copyright (C) 2015, the cclib development team
+#
+# The library is free software, distributed under the terms of
+# the GNU Lesser General Public version 2.1 or later. You should have
+# received a copy of the license along with cclib. You can also access
+# the full license online at http://www.gnu.org/copyleft/lgpl.html.
+
+"""A persistent cache of parsed data, for logfiles that are read again and again"""
+
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+import zipfile
+
+from .. import __version__
+
+
+class ParseCache(object):
+    """A directory with the data parsed from logfiles, shared between processes.
+
+    Each entry is a file written with ccData.save, so its arrays are memory-mapped when
+    it is loaded and only read once they are accessed, and loading it runs no code from
+    the file. Entries are keyed by the paths, sizes and modification times of the
+    logfiles, as well as by the parser class and cclib version, so a lookup does not
+    read the logfiles. An entry also stores a hash of the contents of the logfiles,
+    which is checked when the key matches but a logfile was modified so shortly before
+    it was parsed that it might have changed again without another modification time.
+    When the total size of the entries exceeds maxsize bytes, the least recently used
+    ones are removed.
+
+    Entries are written to temporary files that are renamed when complete, which is
+    atomic, so many processes can use the same cache directory at the same time.
+    """
+
+    suffix = ".ccdata"
+
+    # The member of an entry with the hash of the logfiles and the skipped attributes.
+    member = "cache.json"
+
+    # The resolution of modification times in seconds, generously for some filesystems.
+    resolution = 2
+
+    def __init__(self, directory, maxsize=2**30):
+        self.directory = directory
+        self.maxsize = maxsize
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                # Another process might have created it in the meantime.
+                if not os.path.isdir(directory):
+                    raise
+
+    def filenames(self, log):
+        """Return the names of the logfiles of a Logfile instance, or None."""
+
+        filenames = log.filename
+        if isinstance(filenames, str):
+            filenames = [filenames]
+        if getattr(log, "isstream", False) or hasattr(log, "buffer") or \
+           not isinstance(filenames, list):
+            return None
+        return filenames
+
+    def key(self, log, attributes=None):
+        """Return the key for the data parsed by a Logfile instance, or None.
+
+        Only logfiles given by name have keys, not streams or buffers.
+        """
+
+        filenames = self.filenames(log)
+        if filenames is None:
+            return None
+
+        digest = hashlib.sha1()
+        for name in [__version__, type(log).__name__, log.datatype.__name__]:
+            digest.update(name.encode("utf-8") + b"\0")
+        if attributes is not None:
+            digest.update(" ".join(sorted(attributes)).encode("utf-8") + b"\0")
+        for filename in filenames:
+            stat = os.stat(filename)
+            identity = "%s %d %r" % (os.path.abspath(filename), stat.st_size, stat.st_mtime)
+            digest.update(identity.encode("utf-8") + b"\0")
+        return digest.hexdigest()
+
+    def digest(self, log):
+        """Return the hash of the contents of the logfiles of a Logfile instance."""
+
+        digest = hashlib.sha1()
+        for filename in self.filenames(log):
+            with open(filename, "rb") as handle:
+                for chunk in iter(lambda: handle.read(2**20), b""):
+                    digest.update(chunk)
+        return digest.hexdigest()
+
+    def recent(self, log, start):
+        """Return whether a logfile was modified too shortly before the time given."""
+        return any(os.stat(filename).st_mtime > start - self.resolution for filename in self.filenames(log))
+
+    def path(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def load(self, key, datatype):
+        """Return the entry for a key, or None if there is no usable entry.
+
+        An entry is a dictionary with the data, the skipped attributes if attributes
+        were requested, the hash of the logfiles and the time when parsing started.
+        """
+
+        path = self.path(key)
+        try:
+            with zipfile.ZipFile(path) as archive:
+                entry = json.loads(archive.read(self.member).decode("utf-8"))
+            entry["data"] = datatype.load(path)
+            # Mark this entry as recently used.
+            os.utime(path, None)
+        except (EnvironmentError, KeyError, ValueError, zipfile.BadZipfile):
+            return None
+        return entry
+
+    def save(self, key, entry):
+        """Store an entry for a key, and remove old entries if the cache is too big."""
+
+        handle, temporary = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+        os.close(handle)
+        try:
+            entry["data"].save(temporary)
+            info = dict((k, v) for k, v in entry.items() if k != "data")
+            with zipfile.ZipFile(temporary, "a") as archive:
+                archive.writestr(self.member, json.dumps(info).encode("utf-8"))
+            getattr(os, "replace", os.rename)(temporary, self.path(key))
+        except EnvironmentError:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+        self.evict()
+
+    def evict(self):
+        """Remove the least recently used entries until the cache is small enough."""
+
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(self.suffix):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for mtime, size, name in entries)
+        for mtime, size, name in sorted(entries):
+            if total <= self.maxsize:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                # Another process removed it first.
+                pass
+            total -= size
+
+    def parse(self, log, attributes=None, **kwds):
+        """Return the data for a Logfile instance, parsing it only if it is not cached.
+
+        Any other keyword arguments are passed on to the parse method, except for lazy,
+        since entries have all attributes, with arrays that are only read when accessed.
+        """
+
+        if kwds.get("lazy"):
+            raise ValueError("ParseCache cannot be combined with lazy parsing")
+
+        key = self.key(log, attributes)
+        if key is None:
+            return log.parse(attributes=attributes, **kwds)
+
+        entry = self.load(key, log.datatype)
+        if entry is not None and self.recent(log, entry["time"]) and entry["digest"] != self.digest(log):
+            entry = None
+        if entry is None:
+            entry = {"time": time.time(), "digest": self.digest(log)}
+            entry["data"] = log.parse(attributes=attributes, **kwds)
+            entry["skipped"] = getattr(log, "skipped_attributes", None)
+            self.save(key, entry)
+        if attributes is not None:
+            log.skipped_attributes = entry["skipped"]
+        return entry["data"]
+
+    def clear(self):
+        """Remove all entries."""
+
+        for name in os.listdir(self.directory):
+            if name.endswith(self.suffix):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
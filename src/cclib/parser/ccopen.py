@@ -15,13 +15,20 @@
 
 from __future__ import print_function
 
+import collections
+import multiprocessing
 import os
+import pickle
+import signal
 import sys
 
 from . import data
 
 from . import logfileparser
 
+from .cache import ParseCache
+from .index import SectionIndex
+
 from .adfparser import ADF
 from .daltonparser import DALTON
 from .gamessparser import GAMESS
@@ -70,17 +77,72 @@ triggers = [
 
 ]
 
-def guess_filetype(inputfile):
-    """Try to guess the filetype by searching for trigger strings."""
+# The number of bytes searched for triggers at the start of a logfile, and also at its
+# end when the start is not conclusive. Streams that cannot seek are only searched at
+# the start, and sequences of lines are limited to this number of characters.
+guess_limit = 2**16
+
+def _bounded(lines, size):
+    """Iterate over lines until they add up to at least size characters."""
+
+    total = 0
+    for line in lines:
+        yield line
+        total += len(line)
+        if total >= size:
+            break
+
+def _match(lines):
+    """Return the filetype and the confidence of the guess from the triggers in lines."""
 
     filetype = None
-    for line in inputfile:
+    for line in lines:
         for parser, phrases, do_break in triggers:
             if all([line.find(p) >= 0 for p in phrases]):
                 filetype = parser
                 if do_break:
-                    return filetype
-    return filetype
+                    return filetype, 1.0
+    return filetype, 0.5 if filetype else 0.0
+
+def sniff_filetype(inputfile, limit=guess_limit):
+    """Guess the filetype of a logfile, and return it together with a confidence.
+
+    Lines with trigger strings are found with a single regular expression search,
+    which only runs over the first limit bytes of the logfile. The confidence is 1
+    if a trigger that identifies a program was found, 0.5 if only triggers that can
+    also appear in logfiles of other programs were found, and 0 otherwise. In the
+    last two cases, the last limit bytes are searched as well, if the logfile is
+    wrapped in a FileWrapper that can seek without decompressing, which is then left
+    at some position other than the start.
+    """
+
+    phrases = tuple(phrase for parser, phrases, do_break in triggers for phrase in phrases)
+    if not isinstance(inputfile, logfileparser.FileWrapper):
+        regex = logfileparser.compile_triggers(phrases, binary=False)
+        return _match(line for line in _bounded(inputfile, limit) if regex.search(line))
+
+    # The search runs over whole blocks, so they should not be larger than the limit.
+    regex = logfileparser.compile_triggers(phrases)
+    blocksize = inputfile.blocksize
+    inputfile.blocksize = min(limit, blocksize)
+    try:
+        filetype, confidence = _match(iter(lambda: inputfile.skip_to(regex, limit), None))
+
+        size = inputfile.size
+        if confidence < 1 and inputfile.raw is None and inputfile.seekable() and size > limit:
+            inputfile.seek(max(size - limit, limit))
+            tailtype, tailconfidence = _match(iter(lambda: inputfile.skip_to(regex), None))
+            if tailconfidence > confidence:
+                filetype, confidence = tailtype, tailconfidence
+    finally:
+        inputfile.blocksize = blocksize
+
+    return filetype, confidence
+
+def guess_filetype(inputfile):
+    """Try to guess the filetype by searching for trigger strings."""
+
+    return sniff_filetype(inputfile)[0]
 
 def ccread(source, *args, **kargs):
     """Attempt to open and read computational chemistry data from a file.
@@ -91,25 +153,300 @@ def ccread(source, *args, **kargs):
 
     Inputs:
         source - a single logfile, a list of logfiles, or an input stream
+        attributes - optional list of the attributes that are needed, in which
+                     case parts of the logfile with only other attributes are skipped
+        cache - optional ParseCache, or the name of its directory, from which the
+                data is loaded if the logfile was parsed before, with arrays that are
+                only read when accessed, which cannot be combined with lazy
+        index - optionally True, in which case a SectionIndex is written next to the
+                logfile, or used if it exists, so that only the sections needed are read
+        lazy - optionally True, in which case attributes that take long to parse, such
+               as aooverlaps, are parsed only when first accessed (see Logfile.parse)
+        split_jobs - optionally True, in which case each job in a logfile with several,
+                     such as a chain of Gaussian jobs, is parsed into a ccData object of
+                     its own (see Logfile.parse_jobs), which cannot be combined with
+                     cache, index or lazy
+        workers - optional number of processes parsing the logfile, in which case
+                  independent sections, such as mocoeffs, are parsed in other processes
+                  (see Logfile.parse_parallel), or the jobs if split_jobs is True
+        max_memory - optional number of bytes that the largest attributes, such as
+                     mocoeffs, should fit in, or else they are spilled to disk, kept in
+                     single precision or skipped, as reported in the memory_actions of
+                     the data (see Logfile.parse), which cannot be combined with cache,
+                     lazy or split_jobs
+        spill - optional directory to which attributes that do not fit in max_memory
+                are written, to be mapped from there
     Returns:
-        a ccData object containing cclib data attributes
+        a ccData object containing cclib data attributes, or an iterator over such
+        objects for the jobs in the logfile if split_jobs is True
     """
 
+    attributes = kargs.pop('attributes', None)
+    cache = kargs.pop('cache', None)
+    if isinstance(cache, str):
+        cache = ParseCache(cache)
+    index = kargs.pop('index', False)
+    lazy = kargs.pop('lazy', False)
+    split_jobs = kargs.pop('split_jobs', False)
+    workers = kargs.pop('workers', None)
+    if split_jobs and (cache is not None or index or lazy):
+        raise ValueError("split_jobs cannot be combined with cache, index or lazy")
+    if cache is not None and lazy:
+        raise ValueError("cache cannot be combined with lazy")
+    max_memory = kargs.pop('max_memory', None)
+    spill = kargs.pop('spill', None)
+    if max_memory is not None and (cache is not None or lazy or split_jobs):
+        raise ValueError("max_memory cannot be combined with cache, lazy or split_jobs")
+    budget = {} if max_memory is None else {'max_memory': max_memory, 'spill': spill}
+
     log = ccopen(source, *args, **kargs)
     if log:
         if kargs['verbose']:
             print('Identified logfile to be in %s format' % log.logname)
-        return log.parse()
+        if split_jobs:
+            return log.parse_jobs(attributes=attributes, workers=workers)
+        if cache is not None:
+            return cache.parse(log, attributes=attributes, workers=workers)
+        if index:
+            return SectionIndex().parse(log, attributes=attributes, lazy=lazy, workers=workers, **budget)
+        return log.parse(attributes=attributes, lazy=lazy, workers=workers, **budget)
     else:
         if kargs['verbose']:
             print('Attempting to use fallback mechanism to read file')
         return fallback(source)
 
+def ccsniff(source, *args, **kargs):
+    """Describe the job in a computational chemistry logfile, reading only its header.
+
+    This is meant for classifying many logfiles quickly, and is many times cheaper
+    than parsing them, since only the first few hundred kilobytes are read, and only
+    lines that are part of the header. See Logfile.sniff for the details.
+
+    Inputs:
+        source - a single logfile, a list of logfiles, or an input stream
+    Returns:
+        a dict with the program, version, method, basis, jobtypes, charge and mult
+        (each None if not found), or None if the type of the logfile is not known
+    """
+
+    log = ccopen(source, *args, **kargs)
+    if log:
+        return log.sniff()
+
+def ccstatus(source, *args, **kargs):
+    """Return the status of the job in a computational chemistry logfile, read from its end.
+
+    This is meant for monitoring jobs, and its cost is set by how much of the end of
+    the logfile is needed, not by the length of the job. See Logfile.status.
+
+    Inputs:
+        source - a single logfile, a list of logfiles, or an input stream
+    Returns:
+        a dict with whether the job terminated normally, the last SCF energy and the
+        last geometry (None if not found), or None if the type of the logfile is not known
+    """
+
+    log = ccopen(source, *args, **kargs)
+    if log:
+        return log.status()
+
+def iter_frames(source, window=8, *args, **kargs):
+    """Iterate over the geometries of a computational chemistry logfile as they are parsed.
+
+    This is meant for long optimizations, scans and IRC runs, since only the last few
+    steps are kept in memory, however many there are. See Logfile.iterframes.
+
+    Inputs:
+        source - a single logfile, a list of logfiles, or an input stream
+        window - the number of steps the entries of an attribute can be ahead of the others
+    Returns:
+        an iterator over Frame tuples with the coords, energy, grads, geovalues and
+        atomnos of each step, or None if the type of the logfile is not known
+    """
+
+    log = ccopen(source, *args, **kargs)
+    if log:
+        return log.iterframes(window)
+
+def ccread_many(paths, workers=None, ordered=False, timeout=None, recycle=None,
+                chunksize=None, *args, **kargs):
+    """Read computational chemistry data from many files with a pool of processes.
+
+    Each file is read with ccread in one of the worker processes, and the results
+    are yielded as they are sent back, so that they need not all be kept in memory.
+
+    Inputs:
+        paths - an iterable of logfile names
+        workers - the number of worker processes (default is the number of CPUs)
+        ordered - whether to yield results in the order of the paths, rather than
+                  in the order they are finished in
+        timeout - optional number of seconds after which parsing a file is stopped,
+                  with a ParseTimeout as the result (only supported on platforms
+                  with SIGALRM)
+        recycle - optional number of files after which a worker process is
+                  replaced by a new one, which contains memory leaks
+        chunksize - the number of files sent to a worker at a time, by default
+                    chosen from the number of paths like in Pool.map
+        any other arguments are passed on to ccread
+    Returns:
+        an iterator of (path, result) tuples, where result is a ccData object or
+        the exception that was raised while reading the file
+    """
+
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    if chunksize is None:
+        chunksize = 1
+        if hasattr(paths, "__len__"):
+            chunksize, extra = divmod(len(paths), workers * 4)
+            if extra or not chunksize:
+                chunksize += 1
+    kargs.setdefault('verbose', False)
+    tasks = ((path, timeout, args, kargs) for path in paths)
+
+    pool = multiprocessing.Pool(workers, maxtasksperchild=recycle)
+    try:
+        imap = pool.imap if ordered else pool.imap_unordered
+        for result in imap(_ccread_one, tasks, chunksize):
+            yield result
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+def ccread_archive(archive, workers=None, ordered=False, timeout=None, recycle=None,
+                   *args, **kargs):
+    """Read computational chemistry data from each file in a zip or tar archive.
+
+    With a single worker, each file is streamed from the archive into a parser in this
+    process, without extracting it. Otherwise, the archive is still read in a single
+    pass, but the contents of each file are sent to a pool of processes, with at most
+    two files per worker waiting to be parsed at any time.
+
+    Inputs:
+        archive - the name of a zip or tar archive, which can be compressed
+        workers, ordered, timeout, recycle - like for ccread_many
+        any other arguments are passed on to ccread
+    Returns:
+        an iterator of (name, result) tuples, where name is the name of a file in
+        the archive, and result is a ccData object or the exception that was raised
+    """
+
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    kargs.setdefault('verbose', False)
+    members = logfileparser.openarchive(archive)
+
+    if workers == 1:
+        for name, member in members:
+            result = _ccread_timed(member, timeout, args, kargs)
+            member.close()
+            yield name, result
+        return
+
+    pool = multiprocessing.Pool(workers, maxtasksperchild=recycle)
+    try:
+        pending = collections.OrderedDict()
+        for index, (name, member) in enumerate(members):
+            # A bytearray, since bytes are taken for a filename in Python 2.
+            contents = bytearray(member.file.read())
+            member.close()
+            task = ((name, contents), timeout, args, kargs)
+            pending[index] = (name, pool.apply_async(_ccread_one, (task,)))
+            while len(pending) >= 2 * workers:
+                yield _collect(pending, ordered)
+        while pending:
+            yield _collect(pending, ordered)
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+def _collect(pending, ordered):
+    """Return the next (name, result) tuple for ccread_archive from the pending tasks.
+
+    Unless the results are ordered, the first task that is finished is taken, and
+    the oldest one is waited for a little at a time until one is.
+    """
+
+    while True:
+        for index, (name, result) in list(pending.items()):
+            if ordered or result.ready():
+                del pending[index]
+                try:
+                    return result.get()
+                except Exception as detail:
+                    return name, detail
+        next(iter(pending.values()))[1].wait(0.01)
+
+class ParseTimeout(RuntimeError):
+    """Raised, or returned as the result, when parsing a file takes too long."""
+
+def _ccread_timed(source, timeout, args, kargs):
+    """Return the data read with ccread, or the exception raised within the timeout.
+
+    The alarm can interrupt the parser anywhere, also where an error is caught and
+    raised again as another one, so a timeout is reported as such whatever was raised.
+    """
+
+    expired = []
+    def expire(signum, frame):
+        expired.append(signum)
+        raise ParseTimeout("Parsing took longer than %s seconds" % timeout)
+
+    # The alarm can go off just after parsing is done, so catch errors outside of
+    # the block where it is turned off, which only happens once per file anyway.
+    alarm = timeout and hasattr(signal, "SIGALRM")
+    if alarm:
+        handler = signal.signal(signal.SIGALRM, expire)
+    try:
+        try:
+            # A file that cannot be opened is reported as such, rather than as a
+            # file of an unknown type, since ccopen only prints the error.
+            if isinstance(source, str):
+                open(source, "rb").close()
+            if alarm:
+                signal.setitimer(signal.ITIMER_REAL, timeout)
+            result = ccread(source, *args, **kargs)
+            if result is None:
+                result = ValueError("Could not identify the format of the file")
+        finally:
+            if alarm:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+    except Exception as detail:
+        result = detail
+    if alarm:
+        signal.signal(signal.SIGALRM, handler)
+    if expired:
+        result = ParseTimeout("Parsing took longer than %s seconds" % timeout)
+    return result
+
+def _ccread_one(task):
+    """Read one file in a worker process, catching any errors.
+
+    The path in a task can also be a tuple of a name and the contents of a file.
+    """
+
+    path, timeout, args, kargs = task
+    name, source = path if isinstance(path, tuple) else (path, path)
+    result = _ccread_timed(source, timeout, args, kargs)
+
+    # Not all exceptions can be sent back to the main process.
+    if isinstance(result, Exception):
+        try:
+            pickle.dumps(result)
+        except Exception:
+            result = RuntimeError(repr(result))
+
+    return name, result
+
 def ccopen(source, *args, **kargs):
     """Guess the identity of a particular log file and return an instance of it.
 
     Inputs:
-      source - a single logfile, a list of logfiles, or an input stream
+      source - a single logfile, a list of logfiles, an input stream (which can
+               be a FileWrapper, or a pipe such as sys.stdin), or the raw bytes
+               of a logfile
 
     Returns:
       one of ADF, DALTON, GAMESS, GAMESS UK, Gaussian, Jaguar, Molpro, NWChem, ORCA,
@@ -118,7 +455,7 @@ def ccopen(source, *args, **kargs):
     """
 
     # Try to open the logfile(s), using openlogfile.
-    if isinstance(source, str) or \
+    if isinstance(source, str) or isinstance(source, logfileparser.buffertypes) or \
        isinstance(source, list) and all([isinstance(s, str) for s in source]):
         try:
             inputfile = logfileparser.openlogfile(source)
@@ -127,22 +464,38 @@ def ccopen(source, *args, **kargs):
             print("I/O error %s (%s): %s" % (errno, source, strerror))
             return None
         isstream = False
-    elif hasattr(source, "read"):
+    elif isinstance(source, logfileparser.FileWrapper) or hasattr(source, "read"):
+        # Streams are wrapped, so that they can be parsed from the start after guessing.
+        # For those that cannot go back there, such as pipes, the bytes read while
+        # guessing are kept.
+        if not isinstance(source, logfileparser.FileWrapper):
+            source = logfileparser.FileWrapper(source)
         inputfile = source
         isstream = True
+        if not source.seekable():
+            source.history = []
     else:
         raise ValueError
 
     # Try to guess the filetype.
     filetype = guess_filetype(inputfile)
 
-    # Need to close file before creating a instance.
-    if not isstream:
-        inputfile.close()
+    # A FileWrapper is parsed from the start, so it needs to go back there.
+    if isinstance(inputfile, logfileparser.FileWrapper):
+        inputfile.seek(0)
 
-    # Return an instance of the logfile if one was chosen.
+    # Return an instance of the logfile if one was chosen. A single logfile that was
+    # opened here is handed over to it, and read from there the first time it is parsed.
+    # Otherwise, the file needs to be closed before creating an instance.
     if filetype:
-        return filetype(source, *args, **kargs)
+        log = filetype(source, *args, **kargs)
+        if not isstream and isinstance(inputfile, logfileparser.FileWrapper):
+            log._opened = inputfile
+        elif not isstream:
+            inputfile.close()
+        return log
+    if not isstream:
+        inputfile.close()
 
 def fallback(source):
     """Attempt to read standard molecular formats using other libraries.
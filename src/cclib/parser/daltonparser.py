@@ -23,6 +23,32 @@ from . import utils
 class DALTON(logfileparser.Logfile):
     """A DALTON log file."""
 
+    # Phrases that start each section parsed in extract(), in the same order.
+    section_triggers = [
+        "Atoms and basis sets",
+        "Symmetry Orbitals",
+        "@    Total charge of the molecule",
+        "@    Spin multiplicity and 2 M_S                1         0",
+        "Total number of orbitals",
+        "@    Occupied SCF orbitals",
+        "Threshold for SCF convergence",
+        "Total energy",
+        "*** SCF orbital energy analysis ***",
+        "Final DFT energy",
+        "Final HF energy",
+        "@   = MP2 second order energy",
+        "Total energy CCSD(T)",
+        "Molecular geometry (au)",
+        "Center-of-mass coordinates (a.u.):",
+        "Dipole moment components",
+    ]
+
+    # Attributes that are parsed once and never change afterwards.
+    final_attributes = ["charge", "mult", "natom", "nbasis"]
+
+    # Phrases printed at the end of jobs that terminate normally, for status().
+    termination_triggers = [">>>> Total wall time used in DALTON"]
+
     def __init__(self, *args, **kwargs):
 
         # Call the __init__ method of the superclass
@@ -390,7 +416,7 @@ class DALTON(logfileparser.Logfile):
         #
         if "Final DFT energy" in line or "Final HF energy" in line:
             if not hasattr(self, "scfenergies"):
-                self.scfenergies = []
+                self.scfenergies = utils.FrameBuffer()
             temp = line.split()
             self.scfenergies.append(utils.convertor(float(temp[-1]), "hartree", "eV"))
 
@@ -421,7 +447,7 @@ class DALTON(logfileparser.Logfile):
         #
         if "Molecular geometry (au)" in line:
             if not hasattr(self, "atomcoords"):
-                self.atomcoords = []
+                self.atomcoords = utils.FrameBuffer()
 
             if self.firststdorient:
                 self.firststdorient = False
@@ -13,6 +13,14 @@
 """Classes and tools for storing and handling parsed data"""
 
 
+import io
+import json
+import mmap
+import pickle
+import struct
+import sys
+import zipfile
+
 import numpy
 
 
@@ -164,6 +172,66 @@ class ccData(object):
         if attributes:
             self.setattributes(attributes)
 
+    def __getattr__(self, name):
+        """Parse a lazy attribute the first time it is accessed.
+
+        This is only called for attributes that are not set. Lazy attributes are those
+        in the dictionary _lazy, with a function that returns the value, and they are
+        only there if the logfile has them, so hasattr() gives the same answer as for
+        data that was parsed in full. For an attribute that is not there, this raises
+        right away, but hasattr() still parses a lazy attribute that is, so use
+        hasattribute() to check without that.
+        """
+
+        lazy = self.__dict__.get("_lazy", {})
+        if name not in lazy:
+            raise AttributeError("'%s' object has no attribute '%s'" % (type(self).__name__, name))
+        try:
+            value = lazy[name](name)
+        except AttributeError:
+            del lazy[name]
+            raise
+        setattr(self, name, value)
+        return value
+
+    def hasattribute(self, name):
+        """Return whether an attribute is set, without parsing it if it is lazy.
+
+        A lazy attribute is there if the logfile has the sections that it is parsed
+        from, which were found when the rest of the logfile was parsed.
+        """
+
+        return name in self.__dict__ or name in self.__dict__.get("_lazy", {})
+
+    def __getstate__(self):
+        """Keep lazy attributes lazy when pickling, or else parse them all first.
+
+        The functions of lazy attributes hold the parser and the offsets of the sections
+        in the logfile, which can normally be pickled, so that unpickled data still
+        parses them when accessed, and raises a ValueError if the logfile has changed.
+        """
+
+        lazy = self.__dict__.get("_lazy", {})
+        try:
+            pickle.dumps(lazy, pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            for name in list(lazy):
+                hasattr(self, name)
+            return dict((k, v) for k, v in self.__dict__.items() if k != "_lazy")
+        return dict(self.__dict__)
+
+    def evict(self, names=None):
+        """Remove the values of lazy attributes, which are parsed again when accessed.
+
+        Inputs:
+            names - optional list of attributes to evict, by default all lazy ones
+        """
+
+        lazy = self.__dict__.get("_lazy", {})
+        for name in lazy if names is None else names:
+            if name in lazy and name in self.__dict__:
+                delattr(self, name)
+
     def listify(self):
         """Converts all attributes that are arrays or lists/dicts of arrays to lists."""
 
@@ -188,11 +256,12 @@ class ccData(object):
             precision = 'd'
             if k in self._intarrays:
                 precision = 'i'
+            # Arrays of the right type are kept as they are, not copied, which also
+            # goes for growing arrays of frames such as utils.FrameBuffer.
             if v == numpy.ndarray:
-                a = getattr(self, k)
-                setattr(self, k, numpy.array(getattr(self, k), precision))
+                setattr(self, k, numpy.asarray(getattr(self, k), precision))
             elif v == list and k in self._listsofarrays:
-                setattr(self, k, [numpy.array(x, precision) for x in getattr(self, k)])
+                setattr(self, k, [numpy.asarray(x, precision) for x in getattr(self, k)])
             elif v == dict and k in self._dictsofarrays:
                 items = getattr(self, k).items()
                 pairs = [(key, numpy.array(val, precision)) for key, val in items]
@@ -272,6 +341,129 @@ class ccData(object):
         outputstr = ccwrite(self, outputdest=filename, *args, **kwargs)
         return outputstr
 
+    def save(self, filename):
+        """Save all attributes to a binary file that can be read with load().
+
+        The file is a zip archive like those written by numpy.savez, with an uncompressed
+        .npy member for each array, including the arrays in lists and dictionaries of
+        arrays, and a JSON header with all other attributes. Tuples are kept as such.
+        """
+
+        header = {"attributes": {}, "arrays": {}}
+        arrays = []
+        for attr in [a for a in self._attrlist if hasattr(self, a)]:
+            value = getattr(self, attr)
+            if isinstance(value, numpy.ndarray):
+                header["arrays"][attr] = ["array"]
+                arrays.append(("%s.npy" % attr, value))
+            elif isinstance(value, list) and value and \
+                 all(isinstance(v, numpy.ndarray) for v in value):
+                header["arrays"][attr] = ["list", len(value)]
+                arrays.extend(("%s/%d.npy" % (attr, i), v) for i, v in enumerate(value))
+            elif isinstance(value, dict) and value and \
+                 all(isinstance(v, numpy.ndarray) for v in value.values()):
+                keys = sorted(value.keys())
+                header["arrays"][attr] = ["dict", keys]
+                arrays.extend(("%s/%d.npy" % (attr, i), value[k]) for i, k in enumerate(keys))
+            else:
+                header["attributes"][attr] = _tojson(value)
+
+        with zipfile.ZipFile(filename, "w", zipfile.ZIP_STORED, allowZip64=True) as archive:
+            archive.writestr("header.json", json.dumps(header).encode("utf-8"))
+            for name, array in arrays:
+                # Arrays can be written to members directly only in newer versions of Python.
+                if sys.version_info >= (3, 6):
+                    with archive.open(name, "w", force_zip64=True) as member:
+                        numpy.lib.format.write_array(member, array, allow_pickle=False)
+                else:
+                    member = io.BytesIO()
+                    numpy.lib.format.write_array(member, array, allow_pickle=False)
+                    archive.writestr(name, member.getvalue())
+
+    @classmethod
+    def load(cls, filename, mmap=True):
+        """Return a data object with the attributes saved in a file with save().
+
+        With mmap, arrays are not read but mapped directly from the file, so loading
+        takes about the same time for any size, and the memory for an array is only
+        used once it is accessed. These arrays can be changed, but that does not change
+        the file, since the mapping is copy-on-write.
+        """
+
+        data = cls()
+        with open(filename, "rb") as handle:
+            with zipfile.ZipFile(handle) as archive:
+                header = json.loads(archive.read("header.json").decode("utf-8"))
+                members = dict((info.filename, info) for info in archive.infolist())
+                if mmap:
+                    buffer = _mmap(handle)
+
+                def read(name):
+                    if not mmap:
+                        return numpy.lib.format.read_array(io.BytesIO(archive.read(name)))
+                    return _maparray(buffer, members[name])
+
+                for attr, value in header["attributes"].items():
+                    setattr(data, attr, _fromjson(value))
+                for attr, layout in header["arrays"].items():
+                    if layout[0] == "array":
+                        value = read("%s.npy" % attr)
+                    elif layout[0] == "list":
+                        value = [read("%s/%d.npy" % (attr, i)) for i in range(layout[1])]
+                    else:
+                        value = dict((k, read("%s/%d.npy" % (attr, i))) for i, k in enumerate(layout[1]))
+                    setattr(data, attr, value)
+
+        return data
+
+
+def _tojson(value):
+    """Convert an attribute to an object that JSON can store, tagging tuples."""
+
+    if isinstance(value, tuple):
+        return {"__tuple__": [_tojson(v) for v in value]}
+    if isinstance(value, list):
+        return [_tojson(v) for v in value]
+    if isinstance(value, dict):
+        return dict((k, _tojson(v)) for k, v in value.items())
+    if isinstance(value, (numpy.ndarray, numpy.generic)):
+        return value.tolist()
+    if hasattr(value, "__iter__") and not isinstance(value, str):
+        return [_tojson(v) for v in value]
+    return value
+
+def _fromjson(value):
+    """Convert an object read from JSON back to an attribute."""
+
+    if isinstance(value, list):
+        return [_fromjson(v) for v in value]
+    if isinstance(value, dict):
+        if list(value.keys()) == ["__tuple__"]:
+            return tuple(_fromjson(v) for v in value["__tuple__"])
+        return dict((k, _fromjson(v)) for k, v in value.items())
+    return value
+
+def _mmap(handle):
+    """Return a copy-on-write memory map of a whole file."""
+
+    return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_COPY)
+
+def _maparray(buffer, info):
+    """Return an array for an uncompressed .npy member of a zip archive in a memory map."""
+
+    # The data follows the local header of the member, which has a fixed part of
+    # 30 bytes ending with the lengths of the file name and extra field.
+    namelength, extralength = struct.unpack("<HH", buffer[info.header_offset + 26:info.header_offset + 30])
+    start = info.header_offset + 30 + namelength + extralength
+    member = io.BytesIO(buffer[start:start + min(info.file_size, 2**16)])
+    version = numpy.lib.format.read_magic(member)
+    if version == (1, 0):
+        shape, fortran, dtype = numpy.lib.format.read_array_header_1_0(member)
+    else:
+        shape, fortran, dtype = numpy.lib.format.read_array_header_2_0(member)
+    return numpy.ndarray(shape, dtype, buffer=buffer, offset=start + member.tell(),
+                         order="F" if fortran else "C")
+
 
 class ccData_optdone_bool(ccData):
     """This is the version of ccData where optdone is a Boolean."""
@@ -26,9 +26,68 @@ from . import utils
 class GAMESS(logfileparser.Logfile):
     """A GAMESS/Firefly log file."""
 
+    # Phrases that start each section parsed in extract(), in the same order.
+    section_triggers = [
+        "INPUT CARD>",
+        "OPTTOL =",
+        "FINAL",
+        "RESULTS OF MOLLER-PLESSET",
+        "SCHWARZ INEQUALITY TEST SKIPPED",
+        "CCD ENERGY:",
+        "CCSD",
+        "MBPT(2) ENERGY:",
+        "CHARGE OF MOLECULE",
+        "EXCITATION ENERGIES",
+        "RESULTS FROM SPIN-ADAPTED ANTISYMMETRIZED PRODUCT (SAPS)",
+        "RESULTS FROM DETERMINANT BASED ATOMIC ORBITAL CI-SINGLES",
+        "EXCITED STATE",
+        "TRANSITION FROM THE GROUND STATE TO EXCITED STATE",
+        "LET EXCITATIONS",
+        "MAXIMUM GRADIENT",
+        "RMS GRADIENT",
+        "ATOMIC                      COORDINATES",
+        "EQUILIBRIUM GEOMETRY LOCATED",
+        "GEOMETRY SEARCH IS NOT CONVERGED",
+        "COORDINATES OF ALL ATOMS ARE",
+        " SCF CALCULATION",
+        "ITER EX",
+        ("NORMAL COORDINATE ANALYSIS IN THE HARMONIC APPROXIMATION", ["vibdisps", "vibfreqs", "vibirs", "vibramans"]),
+        ("ATOMIC BASIS SET", ["gbasis"]),
+        ("EIGENVECTORS", ["aonames", "atombasis", "mocoeffs", "moenergies", "mosyms", "nmo"]),
+        ("MOLECULAR OBRITALS", ["aonames", "atombasis", "mocoeffs", "moenergies", "mosyms", "nmo"]),
+        ("CIS NATURAL ORBITALS", ["nocoeffs", "nooccnos"]),
+        "NUMBER OF OCCUPIED ORBITALS",
+        "SYMMETRIES FOR INITIAL GUESS ORBITALS FOLLOW",
+        "(?i)NUMBER OF ATOMS",
+        "NUMBER OF CARTESIAN GAUSSIAN BASIS",
+        "TOTAL NUMBER OF BASIS FUNCTIONS",
+        "TOTAL NUMBER OF CONTAMINANTS DROPPED",
+        "SPHERICAL HARMONICS KEPT IN THE VARIATION SPACE",
+        "TOTAL NUMBER OF MOS IN VARIATION SPACE",
+        ("OVERLAP MATRIX", ["aooverlaps"], " ?OVERLAP MATRIX"),
+        "ECP POTENTIALS",
+        "TOTAL MULLIKEN AND LOWDIN ATOMIC POPULATIONS",
+        "ELECTROSTATIC MOMENTS",
+    ]
+
+    # Attributes that are parsed once and never change afterwards.
+    final_attributes = ["mult", "natom", "nbasis"]
+
+    # Phrases that start the parts of the header handled by sniff_header().
+    header_triggers = ["GAMESS VERSION =", "Firefly version", "INPUT CARD>"]
+
+    # The values of RUNTYP in $CONTRL, and the job types in sniff().
+    runtyp_jobtypes = {
+        "energy": "sp", "gradient": "sp", "optimize": "opt", "sadpoint": "opt",
+        "hessian": "freq", "raman": "freq", "surface": "scan",
+    }
+
     # Used to index self.scftargets[].
     SCFRMS, SCFMAX, SCFENERGY = list(range(3))
 
+    # Phrases printed at the end of jobs that terminate normally, for status().
+    termination_triggers = ["TERMINATED NORMALLY", "ddikick.x: exited gracefully"]
+
     def __init__(self, *args, **kwargs):
 
         # Call the __init__ method of the superclass
@@ -69,6 +128,65 @@ class GAMESS(logfileparser.Logfile):
         self.cihamtyp = "none" # Type of CI Hamiltonian: saps or dets.
         self.scftype = "none" # Type of SCF calculation: BLYP, RHF, ROHF, etc.
     
+    def sniff_header(self, inputfile, line, record):
+        """Update the job description from the version and the echo of the input."""
+
+        #          *         GAMESS VERSION =  1 MAY 2012 (R1)          *
+        #          *      Firefly version 8.0.1, build number 8540      *
+        if "GAMESS VERSION =" in line and record["version"] is None:
+            record["version"] = line.split("=")[1].strip(" *\n")
+        if re.match(r" *\* +Firefly version", line) and record["version"] is None:
+            record["version"] = line.split()[3].strip(",")
+
+        # The input cards echo the input groups, with keywords that are not case sensitive:
+        #
+        #  INPUT CARD> $CONTRL COORD=PRINAXIS UNITS=ANGS
+        #  INPUT CARD>         RUNTYP=OPTIMIZE SCFTYP=RHF DFTTYP=B3LYP $END
+        #  INPUT CARD> $BASIS  GBASIS=STO NGAUSS=3 $END
+        #
+        # Keywords are stored per group, since for example MULT can also be in $TDDFT.
+        if line[1:12] == "INPUT CARD>" and record["method"] is None:
+            cards = {}
+            group = None
+            while line[1:12] == "INPUT CARD>":
+                for word in line[12:].lower().split():
+                    if word[:1] == "$":
+                        group = word[1:] if word != "$end" else None
+                    elif "=" in word and group not in (None, "data"):
+                        key, value = word.split("=", 1)
+                        cards[(group, key)] = value
+                line = next(inputfile)
+
+            contrl = lambda key, default=None: cards.get(("contrl", key), default)
+            dfttyp = contrl("dfttyp") or cards.get(("dft", "dfttyp"))
+            if contrl("cctyp"):
+                method = contrl("cctyp")
+            elif contrl("mplevl") == "2":
+                method = "mp2"
+            elif contrl("cityp") and contrl("cityp") != "tddft":
+                method = contrl("cityp")
+            elif dfttyp and dfttyp != "none":
+                method = dfttyp
+            else:
+                method = "hf" if contrl("scftyp", "rhf") in ("rhf", "uhf", "rohf") else contrl("scftyp")
+            gbasis = cards.get(("basis", "gbasis"))
+            ngauss = cards.get(("basis", "ngauss"), "")
+            if gbasis in ("mndo", "am1", "pm3", "rm1", "pm6"):
+                method, gbasis = gbasis, None
+            elif gbasis == "sto":
+                gbasis = "sto-%sg" % ngauss
+            elif gbasis in ("n21", "n31", "n311"):
+                gbasis = "%s-%sg" % (ngauss, gbasis[1:])
+            record["method"] = method
+            record["basis"] = gbasis
+
+            jobtypes = [self.runtyp_jobtypes.get(contrl("runtyp", "energy"), contrl("runtyp"))]
+            if contrl("cityp") in ("tddft", "cis") or contrl("tddft", "none") != "none":
+                jobtypes = [jobtype for jobtype in jobtypes if jobtype != "sp"] + ["td"]
+            record["jobtypes"] = sorted(jobtypes)
+            record["charge"] = int(contrl("icharg", 0))
+            record["mult"] = int(contrl("mult", 1))
+
     def extract(self, inputfile, line):
         """Extract information from the file object inputfile."""
 
@@ -90,7 +208,7 @@ class GAMESS(logfileparser.Logfile):
         # ...so take the number after the "IS"
         if line.find("FINAL") == 1:
             if not hasattr(self, "scfenergies"):
-                self.scfenergies = []
+                self.scfenergies = utils.FrameBuffer()
             temp = line.split()
             self.scfenergies.append(utils.convertor(float(temp[temp.index("IS") + 1]), "hartree", "eV"))
 
@@ -386,7 +504,7 @@ class GAMESS(logfileparser.Logfile):
                 return
 
             if not hasattr(self, "geovalues"):
-                self.geovalues = []
+                self.geovalues = utils.FrameBuffer()
 
             # Newer versions (around 2006) have both maximum and RMS on one line:
             #       MAXIMUM GRADIENT =  0.0531540    RMS GRADIENT = 0.0189223
@@ -418,7 +536,7 @@ class GAMESS(logfileparser.Logfile):
         if line[11:50] == "ATOMIC                      COORDINATES":
 
             if not hasattr(self, "atomcoords"):
-                self.atomcoords = []
+                self.atomcoords = utils.FrameBuffer()
 
             line = next(inputfile)
             atomcoords = []
@@ -456,7 +574,7 @@ class GAMESS(logfileparser.Logfile):
             if self.firststdorient:
                 self.firststdorient = False
                 # Wipes out the single input coordinate at the start of the file
-                self.atomcoords = []
+                self.atomcoords = utils.FrameBuffer()
                 
             self.skip_lines(inputfile, ['line', '-'])
 
@@ -639,7 +757,11 @@ class GAMESS(logfileparser.Logfile):
 
             self.vibfreqs = []
             self.vibirs = []
-            self.vibdisps = []
+
+            # The displacements for each page of modes are written straight into this array,
+            # and there are as many modes as Cartesian coordinates before removing any.
+            vibdisps = numpy.zeros((3 * self.natom, self.natom, 3), "d")
+            nmodes = 0
 
             # Need to get to the modes line, which is often preceeded by
             # a list of atomic weights and some possible warnings.
@@ -717,18 +839,13 @@ class GAMESS(logfileparser.Logfile):
                 # This line seems always to be blank.
                 assert line.strip() == ''
 
-                # Extract the Cartesian displacement vectors.
-                p = [ [], [], [], [], [] ]
-                for j in range(self.natom):
-                    q = [ [], [], [], [], [] ]
-                    for coord in "xyz":
-                        line = next(inputfile)[21:]
-                        cols = list(map(float, line.split()))
-                        for i, val in enumerate(cols):
-                            q[i].append(val)
-                    for k in range(len(cols)):
-                        p[k].append(q[k])
-                self.vibdisps.extend(p[:len(cols)])
+                # Extract the Cartesian displacement vectors, with the x, y and z lines
+                # for each atom and a column for each mode, all at once.
+                lines = [next(inputfile) for i in range(3 * self.natom)]
+                ncols = len(self.vibfreqs) - nmodes
+                cols = utils.readfields(lines, start=21, ncols=ncols)
+                vibdisps[nmodes:nmodes + ncols] = cols.reshape(self.natom, 3, ncols).transpose(2, 0, 1)
+                nmodes += ncols
 
                 # Skip the Sayvetz stuff at the end.
                 for j in range(10):
@@ -740,7 +857,7 @@ class GAMESS(logfileparser.Logfile):
             # Exclude rotations and translations.
             self.vibfreqs = numpy.array(self.vibfreqs[:startrot-1]+self.vibfreqs[endrot:], "d")
             self.vibirs = numpy.array(self.vibirs[:startrot-1]+self.vibirs[endrot:], "d")
-            self.vibdisps = numpy.array(self.vibdisps[:startrot-1]+self.vibdisps[endrot:], "d")
+            self.vibdisps = numpy.concatenate((vibdisps[:startrot-1], vibdisps[endrot:nmodes]))
             if hasattr(self, "vibramans"):
                 self.vibramans = numpy.array(self.vibramans[:startrot-1]+self.vibramans[endrot:], "d")
 
@@ -863,6 +980,7 @@ class GAMESS(logfileparser.Logfile):
 
             self.skip_line(inputfile, 'dashes')
 
+            # Each page of coefficients is converted at once into the transpose of mocoeffs.
             for base in range(0, self.nmo, 5):
 
                 self.updateprogress(inputfile, "Coefficients")
@@ -898,11 +1016,14 @@ class GAMESS(logfileparser.Logfile):
                 i_atom = 0 # counter to keep track of n_atoms > 99
                 flag_w = True # flag necessary to keep from adding 100's at wrong time
 
+                lines = []
                 for i in range(self.nbasis):
                     line = next(inputfile)
 
-                    # If line is empty, break (ex. for FMO in exam37 which is a regression).
-                    if not line.strip(): break
+                    # If line is empty, break (ex. for FMO in exam37 which is a regression),
+                    # and leave the coefficients of the remaining basis functions as zeros.
+                    if not line.strip():
+                        break
 
                     # Fill atombasis and aonames only first time around
                     if readatombasis and base == 0:
@@ -939,12 +1060,10 @@ class GAMESS(logfileparser.Logfile):
                         self.atombasis[atomno].append(orbno)
                         self.aonames.append(aoname)
 
-                    coeffs = line[15:] # Strip off the crud at the start.
-                    j = 0
+                    lines.append(line)
 
-                    while j*11+4 < len(coeffs):
-                        self.mocoeffs[0][base+j, i] = float(coeffs[j * 11:(j + 1) * 11])
-                        j += 1
+                # Strip off the crud at the start of the lines.
+                utils.readpage(self.mocoeffs[0].T, lines, base, 5, width=11, start=15)
 
             line = next(inputfile)
 
@@ -989,13 +1108,8 @@ class GAMESS(logfileparser.Logfile):
                     self.moenergies[1].extend([utils.convertor(float(x), "hartree", "eV") for x in line.split()])
                     line = next(inputfile)
                     self.mosyms[1].extend(list(map(self.normalisesym, line.split())))
-                    for i in range(self.nbasis):
-                        line = next(inputfile)
-                        temp = line[15:] # Strip off the crud at the start
-                        j = 0
-                        while j * 11 + 4 < len(temp):
-                            self.mocoeffs[1][base+j, i] = float(temp[j * 11:(j + 1) * 11])
-                            j += 1
+                    lines = [next(inputfile) for i in range(self.nbasis)]
+                    utils.readpage(self.mocoeffs[1].T, lines, base, 5, width=11, start=15)
                 line = next(inputfile)
             self.moenergies = [numpy.array(x, "d") for x in self.moenergies]
 
@@ -1016,12 +1130,15 @@ class GAMESS(logfileparser.Logfile):
         #
         if line[10:30] == "CIS NATURAL ORBITALS":
 
-            self.nocoeffs = numpy.zeros((self.nmo, self.nbasis), "d")
+            # The eigenvectors set nmo to nbasis if it was not printed before, but that
+            # section might not have been parsed.
+            nmo = getattr(self, "nmo", self.nbasis)
+            self.nocoeffs = numpy.zeros((nmo, self.nbasis), "d")
             self.nooccnos = []
 
             self.skip_line(inputfile, 'dashes')
 
-            for base in range(0, self.nmo, 5):
+            for base in range(0, nmo, 5):
 
                 self.skip_lines(inputfile, ['blank', 'numbers'])
 
@@ -1037,14 +1154,8 @@ class GAMESS(logfileparser.Logfile):
                 line = next(inputfile)
                 
                 # Now we have nbasis lines with the coefficients.
-                for i in range(self.nbasis):
-
-                    line = next(inputfile)
-                    coeffs = line[15:]
-                    j = 0
-                    while j*11+4 < len(coeffs):
-                        self.nocoeffs[base+j, i] = float(coeffs[j * 11:(j + 1) * 11])
-                        j += 1
+                lines = [next(inputfile) for i in range(self.nbasis)]
+                utils.readpage(self.nocoeffs.T, lines, base, 5, width=11, start=15)
 
         # We cannot trust this self.homos until we come to the phrase:
         #   SYMMETRIES FOR INITAL GUESS ORBITALS FOLLOW
@@ -1117,19 +1228,13 @@ class GAMESS(logfileparser.Logfile):
                 self.aooverlaps = numpy.zeros((self.nbasis, self.nbasis), "d")
             else:
                 self.logger.info("Reading additional aooverlaps...")
-            base = 0
-            while base < self.nbasis:
+            for base in range(0, self.nbasis, 5):
                 self.updateprogress(inputfile, "Overlap")
 
                 self.skip_lines(inputfile, ['b', 'basis_fn_number', 'b'])
 
-                for i in range(self.nbasis - base): # Fewer lines each time
-                    line = next(inputfile)
-                    temp = line.split()
-                    for j in range(4, len(temp)):
-                        self.aooverlaps[base+j-4, i+base] = float(temp[j])
-                        self.aooverlaps[i+base, base+j-4] = float(temp[j])
-                base += 5
+                lines = [next(inputfile) for i in range(self.nbasis - base)] # Fewer lines each time
+                utils.readpage(self.aooverlaps, lines, base, 5, width=11, start=15, triangular=True)
 
         # ECP Pseudopotential information
         if "ECP POTENTIALS" in line:
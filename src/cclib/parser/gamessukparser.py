@@ -23,7 +23,46 @@ from . import utils
 
 class GAMESSUK(logfileparser.Logfile):
     """A GAMESS UK log file"""
+
+    # Phrases that start each section parsed in extract(), in the same order.
+    section_triggers = [
+        "total number of atoms",
+        "convergence threshold in optimization run",
+        "largest component of gradient",
+        "convergence?",
+        "molecular geometry",
+        "nuclear coordinates",
+        "optimization converged",
+        "minimisation not converging",
+        "total number of basis functions",
+        ("s-matrix over gaussian basis set", ["aooverlaps"]),
+        "EFFECTIVE CORE POTENTIALS",
+        "Wavefunction convergence",
+        ("normal mode", ["vibdisps", "vibfreqs", "vibirs", "vibramans"]),
+        ("normalised normal coordinates", ["vibdisps", "vibfreqs", "vibirs", "vibramans"]),
+        ("raman data", ["vibdisps", "vibfreqs", "vibirs", "vibramans"]),
+        "SCF TYPE",
+        "convergence data",
+        "total energy",
+        "mp2 correlation energy",
+        "second order perturbation energy",
+        "third order perturbation energy",
+        ("molecular basis set", ["gbasis"]),
+        "----- beta set -----",
+        "SYMMETRY ASSIGNMENT",
+        "eigenvectors",
+        "irrep",
+        "dipole moments",
+        "mulliken and lowdin population analyses",
+        "natural orbital occupations",
+    ]
+
+    # Attributes that are parsed once and never change afterwards.
+    final_attributes = ["charge", "mult", "natom", "nbasis"]
     SCFRMS, SCFMAX, SCFENERGY = list(range(3)) # Used to index self.scftargets[]
+    # Phrases printed at the end of jobs that terminate normally, for status().
+    termination_triggers = ["end of  G A M E S S   program", "rungamess: gamess completed"]
+
     def __init__(self, *args, **kwargs):
 
         # Call the __init__ method of the superclass
@@ -72,13 +111,13 @@ class GAMESSUK(logfileparser.Logfile):
         if line[32:61] == "largest component of gradient":
             # This is the geotarget in the case of OPTXYZ
             if not hasattr(self, "geovalues"):
-                self.geovalues = []
+                self.geovalues = utils.FrameBuffer()
             self.geovalues.append([float(line.split()[4])])
 
         if line[37:49] == "convergence?":
             # Get the geovalues and geotargets for OPTIMIZE
             if not hasattr(self, "geovalues"):
-                self.geovalues = []
+                self.geovalues = utils.FrameBuffer()
                 self.geotargets = []
             geotargets = []
             geovalues = []
@@ -141,7 +180,7 @@ class GAMESSUK(logfileparser.Logfile):
                     atomnos.append(int(round(float(line.split()[2]))))
             
             if not hasattr(self, "atomcoords"):
-                self.atomcoords = []
+                self.atomcoords = utils.FrameBuffer()
             self.atomcoords.append(atomcoords)
             self.set_attribute('atomnos', atomnos)
 
@@ -182,7 +221,7 @@ class GAMESSUK(logfileparser.Logfile):
                 line = next(inputfile)
 
             if not hasattr(self, "atomcoords"):
-                self.atomcoords = []
+                self.atomcoords = utils.FrameBuffer()
             self.atomcoords.append(atomcoords)
             self.set_attribute('atomnos', atomnos)
 
@@ -224,17 +263,18 @@ class GAMESSUK(logfileparser.Logfile):
 
             self.skip_lines(inputfile, ['d', 'b'])
 
+            # Each page has as many columns as numbers in its header, and is converted at once.
             i = 0
             while i < self.nbasis:
                 self.updateprogress(inputfile, "Overlap")
 
-                self.skip_lines(inputfile, ['b', 'b', 'header', 'b', 'b'])
+                header = self.skip_lines(inputfile, ['b', 'b', 'header', 'b', 'b'])[2]
+                columns = len(header.split())
 
-                for j in range(self.nbasis):
-                    temp = list(map(float, next(inputfile).split()[1:]))
-                    self.aooverlaps[j,(0+i):(len(temp)+i)] = temp
-                    
-                i += len(temp)
+                lines = [next(inputfile) for j in range(self.nbasis)]
+                utils.readpage(self.aooverlaps, lines, i, columns, start=10)
+
+                i += columns
 
         if line[18:43] == 'EFFECTIVE CORE POTENTIALS':
 
@@ -282,25 +322,29 @@ class GAMESSUK(logfileparser.Logfile):
 
             self.skip_lines(inputfile, ['e', 'b', 'b'])
 
-            self.vibdisps = []
+            # The displacements for each page of modes are written straight into this array,
+            # which has room for as many modes as there are Cartesian coordinates.
+            natom = len(self.atomnos)
+            vibdisps = numpy.zeros((3 * natom, natom, 3), "d")
+            nmodes = 0
             freqnum = next(inputfile)
             while freqnum.find("=")<0:
 
                 self.skip_lines(inputfile, ['b', 'e', 'freqs', 'e', 'b', 'header', 'e'])
 
-                p = [ [] for x in range(9) ]
-                for i in range(len(self.atomnos)):
-                    brokenx = list(map(float, next(inputfile)[25:].split()))
-                    brokeny = list(map(float, next(inputfile)[25:].split()))            
-                    brokenz = list(map(float, next(inputfile)[25:].split()))
-                    for j,x in enumerate(list(zip(brokenx, brokeny, brokenz))):
-                        p[j].append(x)
-                self.vibdisps.extend(p)
+                # The x, y and z lines for each atom, with a column for each mode.
+                ncols = len(freqnum.split())
+                lines = [next(inputfile) for i in range(3 * natom)]
+                cols = utils.readfields(lines, start=25, ncols=ncols)
+                vibdisps[nmodes:nmodes + ncols] = cols.reshape(natom, 3, ncols).transpose(2, 0, 1)
+                nmodes += ncols
         
                 self.skip_lines(inputfile, ['b', 'b'])
 
                 freqnum = next(inputfile)                    
 
+            self.vibdisps = vibdisps[:nmodes]
+
         if line[26:36] == "raman data":
             self.vibramans = []
 
@@ -342,7 +386,7 @@ class GAMESSUK(logfileparser.Logfile):
 
         if line[10:22] == "total energy" and len(line.split()) == 3:
             if not hasattr(self, "scfenergies"):
-                self.scfenergies = []
+                self.scfenergies = utils.FrameBuffer()
             scfenergy = utils.convertor(float(line.split()[-1]), "hartree", "eV")
             self.scfenergies.append(scfenergy)
         
@@ -488,8 +532,10 @@ class GAMESSUK(logfileparser.Logfile):
             while mo < self.nmo:
                 self.updateprogress(inputfile, "Coefficients")
 
-                self.skip_lines(inputfile, ['b', 'b', 'nums', 'b', 'b'])
+                nums = self.skip_lines(inputfile, ['b', 'b', 'nums', 'b', 'b'])[2]
+                columns = len(nums.split())
 
+                lines = []
                 for basis in range(self.nbasis):
                     line = next(inputfile)
                     # Fill atombasis only first time around.
@@ -508,8 +554,8 @@ class GAMESSUK(logfileparser.Logfile):
                             aonum += 1
                         name = "%s_%d%s" % (atomname, aonum, pg[2].upper())
                         aonames.append(name) 
-                    temp = list(map(float, line[19:].split()))
-                    mocoeffs[mo:(mo+len(temp)), basis] = temp
+                    lines.append(line)
+                utils.readpage(mocoeffs.T, lines, mo, columns, start=19)
                 # Fill atombasis only first time around.
                 readatombasis = False
                 if not self.aonames:
@@ -521,8 +567,8 @@ class GAMESSUK(logfileparser.Logfile):
                 evalues = line
                 if evalues[:17].strip(): # i.e. if these aren't evalues
                     break # Not all the MOs are present
-                mo += len(temp)
-            mocoeffs = mocoeffs[0:(mo+len(temp)), :] # In case some aren't present
+                mo += columns
+            mocoeffs = mocoeffs[0:(mo+columns), :] # In case some aren't present
             if self.betamocoeffs:
                 self.mocoeffs.append(mocoeffs)
             else:
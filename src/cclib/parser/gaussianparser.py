@@ -25,6 +25,75 @@ from . import utils
 class Gaussian(logfileparser.Logfile):
     """A Gaussian 98/03 log file."""
 
+    # Phrases that start each section parsed in extract(), in the same order.
+    section_triggers = [
+        "Symbolic Z-matrix:",
+        "Multiplicity",
+        "NAtoms=",
+        "Optimization completed",
+        "Optimization stopped",
+        "Input orientation",
+        "Z-Matrix orientation",
+        "Isotopes and Nuclear Properties:",
+        "Standard orientation:",
+        "Fragment guess:",
+        "ONIOM: generating point",
+        ("AO basis set", ["gbasis"]),
+        "Requested convergence on RMS density matrix",
+        "Cycle   1",
+        "It=",
+        "SCF Done",
+        "Energy=",
+        "EUMP2",
+        "EUMP3",
+        "UMP4(DQ)",
+        "MP5",
+        "DE(Corr)=",
+        "T5(CCSD)=",
+        "Population analysis using the SCF density",
+        "Converged?",
+        "Forces",
+        "Summary of the potential surface scan:",
+        "Orbital symmetries:",
+        "eigenvalues",
+        ("Harmonic freq", ["vibdisps", "vibfreqs", "vibirs", "vibramans", "vibsyms"]),
+        ("Excited State", ["etenergies", "etoscs", "etsecs", "etsyms"]),
+        "|rxdel|0>",
+        "NBasis",
+        "NBsUse",
+        "basis functions, ",
+        ("Overlap", ["aooverlaps"]),
+        ("Molecular Orbital Coefficients", ["aonames", "atombasis", "mocoeffs"]),
+        ("Natural Orbital Coefficients", ["aonames", "atombasis", "nocoeffs", "nooccnos"]),
+        "X matrix of Anharmonic Constants (cm-1)",
+        "Pseudopotential Parameters",
+        "Counterpoise:",
+        "ONIOM:",
+        "Mulliken atomic charges:",
+        "Mulliken charges:",
+        "Lowdin Atomic Charges:",
+        "Lowdin charges:",
+        "Natural Population",
+        "Sum of electronic and thermal Enthalpies",
+        "Sum of electronic and thermal Free Energies=",
+        "Temperature",
+    ]
+
+    # Attributes that are parsed once and never change afterwards.
+    final_attributes = ["charge", "mult", "natom", "nbasis"]
+
+    # Phrases that start the parts of the header handled by sniff_header().
+    header_triggers = [" Gaussian ", " #", "Multiplicity ="]
+
+    # Route keywords that determine the type of job, and the job types in sniff().
+    route_jobtypes = {"opt": "opt", "freq": "freq", "td": "td", "tda": "td", "scan": "scan", "sp": "sp"}
+
+    # Phrases printed at the end of jobs that terminate normally, for status().
+    termination_triggers = ["Normal termination of Gaussian"]
+
+    # Phrase that starts each later job in a chain of jobs separated by --Link1--.
+    job_triggers = ["Link1:  Proceeding to internal job step number"]
+
     def __init__(self, *args, **kwargs):
 
         # Call the __init__ method of the superclass
@@ -111,6 +180,96 @@ class Gaussian(logfileparser.Logfile):
             if hasattr(self, 'inputcoords'):
                 self.inputcoords = self.inputcoords[:last_point + 1]
             
+    def sniff_header(self, inputfile, line, record):
+        """Update the job description from the version, route section and charge."""
+
+        #  Gaussian 09:  EM64L-G09RevD.01 24-Apr-2013
+        if re.match(r" Gaussian \d+: ", line) and record["version"] is None:
+            record["version"] = line.split()[2].split("-")[-1]
+
+        # The route section can span several lines, which are broken anywhere:
+        #
+        #  ----------------------------------------------------------------------
+        #  #p b3lyp/sto-3g gfinput guess=read geom=allcheck pop=full iop(3/33=1,3
+        #  /36=-1)
+        #  ----------------------------------------------------------------------
+        #
+        # Every keyword that is not an option of a job type or method can be prefixed
+        # with a hash, and the method and basis set are given together, as in #B3LYP/Gen,
+        # but options in parentheses can also contain slashes, as in IOp(3/33=1).
+        if line[:2] == " #" and record["method"] is None:
+            route = line.strip()
+            line = next(inputfile)
+            while line[1:4] != "---":
+                route += line.strip()
+                line = next(inputfile)
+            jobtypes = []
+            for keyword in route.lower().split():
+                keyword = keyword.lstrip("#")
+                name = re.split("[=(]", keyword)[0]
+                methodbasis = re.split(r"/(?![^(]*\))", keyword)
+                if name in self.route_jobtypes:
+                    jobtypes.append(self.route_jobtypes[name])
+                elif len(methodbasis) == 2:
+                    record["method"] = re.sub(r"\(.*=.*\)$", "", methodbasis[0])
+                    record["basis"] = methodbasis[1]
+                    if name.startswith("cis"):
+                        jobtypes.append("td")
+            record["jobtypes"] = sorted(set(jobtypes)) or ["sp"]
+
+        #  Charge =  0 Multiplicity = 1
+        if line[1:7] == "Charge" and "Multiplicity" in line and record["charge"] is None:
+            match = re.match(r".*=(.*)Mul.*=\s*-?(\d+).*", line)
+            record["charge"] = int(match.groups()[0])
+            record["mult"] = int(match.groups()[1])
+
+    def status_tail(self, tail, record):
+        """Fill in the job status from the archive entry, or else from the parsed tail.
+
+        The archive entry at the end of a job is a compact summary, with lines of 70
+        characters separated by backslashes and its sections by double backslashes:
+
+         1\\1\\GINC-NODE\\SP\\RB3LYP\\STO-3G\\C10H10\\USER\\31-Aug-2014\\0\\\\#p b3
+         lyp/sto-3g ...\\\\title\\\\0,1\\C,-1.4,0.,0.\\C,...\\\\Version=EM64L-G09RevD.0
+         1\\State=1-AG\\HF=-382.3082666\\RMSD=8.987e-10\\PG=C02H [SGH(C10H10)]\\\\@
+
+        The energy in HF= is the last SCF energy. The geometry in the fourth section is
+        in the input orientation, however, rather than the standard orientation used for
+        atomcoords, so the geometry is always parsed from the tail, which status() widens
+        until the last standard orientation is found, and is otherwise left out.
+        """
+
+        start = tail.rfind(b"\n 1\\1\\")
+        end = tail.find(b"\\@", start)
+        if start > -1 and end > -1:
+            archive = tail[start:end].decode("utf-8", "ignore").replace("\r", "")
+            sections = archive.replace("\n ", "").strip().split("\\\\")
+            for field in "\\".join(sections[4:]).split("\\"):
+                if field[:3] == "HF=":
+                    energy = self.float(field[3:].split(",")[-1])
+                    record["scfenergy"] = utils.convertor(energy, "hartree", "eV")
+
+        if any(value is None for value in record.values()):
+            super(Gaussian, self).status_tail(tail, record)
+
+    def basis_labels(self, lines, start):
+        """Return aonames and atombasis from the labels of the first page of coefficients.
+
+        The label of each basis function is its name from the given position on, and the
+        first basis function of each atom also has the atom number and element before it.
+        """
+
+        aonames = []
+        atombasis = []
+        for i, line in enumerate(lines):
+            parts = line[:start].split()
+            if len(parts) > 1: # New atom
+                atombasis.append([])
+                atomname = "%s%s" % (parts[2], parts[1])
+            aonames.append("%s_%s" % (atomname, line[start:20].strip()))
+            atombasis[-1].append(i)
+        return aonames, atombasis
+
     def extract(self, inputfile, line):
         """Extract information from the file object inputfile."""
 
@@ -226,7 +385,7 @@ class Gaussian(logfileparser.Logfile):
             self.updateprogress(inputfile, "Attributes", self.cupdate)
             
             if not hasattr(self, "inputcoords"):
-                self.inputcoords = []
+                self.inputcoords = utils.FrameBuffer()
             self.inputatoms = []
 
             self.skip_lines(inputfile, ['d', 'cols', 'cols', 'd'])
@@ -281,7 +440,7 @@ class Gaussian(logfileparser.Logfile):
             self.counterpoise = 0
 
             if not hasattr(self, "atomcoords"):
-                self.atomcoords = []
+                self.atomcoords = utils.FrameBuffer()
 
             self.skip_lines(inputfile, ['d', 'cols', 'cols', 'd'])
             
@@ -304,14 +463,14 @@ class Gaussian(logfileparser.Logfile):
         # all fragment, but that will happen in a newer version of cclib.
         if line[1:16] == "Fragment guess:" and getattr(self, 'nfragments', 0) > 1:
             if not "full" in line:
-                inputfile.file.seek(0, 2)
+                inputfile.seek(0, 2)
 
         # Another hack for regression Gaussian03/ortho_prod_prod_freq.log, which is an ONIOM job.
         # Basically for now we stop parsing after the output for the real system, because
         # currently we don't support changes in system size or fragments in cclib. When we do,
         # we will want to parse the model systems, too, and that is what nmodels could track.
         if "ONIOM: generating point" in line and line.strip()[-13:] == 'model system.' and getattr(self, 'nmodels', 0) > 0:
-            inputfile.file.seek(0,2)
+            inputfile.seek(0, 2)
 
         # With the gfinput keyword, the atomic basis set functios are:
         #
@@ -467,7 +626,7 @@ class Gaussian(logfileparser.Logfile):
                 except StopIteration:
                     break
 
-            self.scfvalues.append(scfvalues)
+            self.scfvalues.append(numpy.array(scfvalues, "d"))
 
         # Extract SCF convergence information (AM1, INDO and other semi-empirical calcs).
         # The output (for AM1) looks like this:
@@ -513,7 +672,7 @@ class Gaussian(logfileparser.Logfile):
         if line[1:9] == 'SCF Done':
 
             if not hasattr(self, "scfenergies"):
-                self.scfenergies = []
+                self.scfenergies = utils.FrameBuffer()
 
             self.scfenergies.append(utils.convertor(self.float(line.split()[4]), "hartree", "eV"))
         # gmagoon 5/27/09: added scfenergies reading for PM3 case
@@ -521,7 +680,7 @@ class Gaussian(logfileparser.Logfile):
         # See regression Gaussian03/QVGXLLKOCUKJST-UHFFFAOYAJmult3Fixed.out
         if line[1:8] == 'Energy=':
             if not hasattr(self, "scfenergies"):
-                self.scfenergies = []
+                self.scfenergies = utils.FrameBuffer()
             self.scfenergies.append(utils.convertor(self.float(line.split()[1]), "hartree", "eV"))
         
         # Total energies after Moller-Plesset corrections.
@@ -592,7 +751,7 @@ class Gaussian(logfileparser.Logfile):
         if line[49:59] == 'Converged?':
 
             if not hasattr(self, "geotargets"):
-                self.geovalues = []
+                self.geovalues = utils.FrameBuffer()
                 self.geotargets = numpy.array([0.0, 0.0, 0.0, 0.0], "d")
 
             newlist = [0]*4
@@ -637,7 +796,7 @@ class Gaussian(logfileparser.Logfile):
         if line[37:43] == "Forces":
 
             if not hasattr(self, "grads"):
-                self.grads = []
+                self.grads = utils.FrameBuffer()
 
             self.skip_lines(inputfile, ['header', 'd'])
 
@@ -773,17 +932,12 @@ class Gaussian(logfileparser.Logfile):
                     else:
                         self.homos = numpy.array([HOMO], "i")
 
-                # Convert to floats and append to moenergies, but sometimes Gaussian
-                #  doesn't print correctly so test for ValueError (bug 1756789).
+                # Collect the fields and convert them all at once after the last line,
+                #  but sometimes Gaussian doesn't print correctly so these become NaN (bug 1756789).
                 part = line[28:]
                 i = 0
                 while i*10+4 < len(part):
-                    s = part[i*10:(i+1)*10]
-                    try:
-                        x = self.float(s)
-                    except ValueError:
-                        x = numpy.nan
-                    self.moenergies[0].append(utils.convertor(x, "hartree", "eV"))
+                    self.moenergies[0].append(part[i*10:(i+1)*10])
                     i += 1
                 line = next(inputfile)
 
@@ -813,12 +967,14 @@ class Gaussian(logfileparser.Logfile):
                 part = line[28:]
                 i = 0
                 while i*10+4 < len(part):
-                    x = part[i*10:(i+1)*10]
-                    self.moenergies[1].append(utils.convertor(self.float(x), "hartree", "eV"))
+                    self.moenergies[1].append(part[i*10:(i+1)*10])
                     i += 1
                 line = next(inputfile)
 
-            self.moenergies = [numpy.array(x, "d") for x in self.moenergies]
+            self.moenergies[0] = utils.fortranfloats(self.moenergies[0], strict=False)
+            if len(self.moenergies) == 2:
+                self.moenergies[1] = utils.fortranfloats(self.moenergies[1])
+            self.moenergies = [utils.convertor(x, "hartree", "eV") for x in self.moenergies]
 
         # Start of the IR/Raman frequency section.
         # Caution is advised here, as additional frequency blocks
@@ -1070,24 +1226,17 @@ class Gaussian(logfileparser.Logfile):
             # Ensure that this is the main calc and not a fragment
             if self.counterpoise != 0: return
 
-            self.aooverlaps = numpy.zeros( (self.nbasis, self.nbasis), "d")
-            # Overlap integrals for basis fn#1 are in aooverlaps[0]
-            base = 0
+            # The lower triangle is printed in pages of five columns, each with
+            # fewer rows, and each page is converted at once into the matrix.
+            self.aooverlaps = numpy.zeros((self.nbasis, self.nbasis), "d")
             colmNames = next(inputfile)
-            while base < self.nbasis:
-                 
+            for base in range(0, self.nbasis, 5):
+
                 self.updateprogress(inputfile, "Overlap", self.fupdate)
-                        
-                for i in range(self.nbasis-base): # Fewer lines this time
-                    line = next(inputfile)
-                    parts = line.split()
-                    for j in range(len(parts)-1): # Some lines are longer than others
-                        k = float(parts[j+1].replace("D", "E"))
-                        self.aooverlaps[base+j, i+base] = k
-                        self.aooverlaps[i+base, base+j] = k
-                base += 5
+
+                lines = [next(inputfile) for i in range(self.nbasis-base)] # Fewer lines this time
+                utils.readpage(self.aooverlaps, lines, base, 5, width=14, start=7, triangular=True)
                 colmNames = next(inputfile)
-            self.aooverlaps = numpy.array(self.aooverlaps, "d")                    
 
         # Molecular orbital coefficients (mocoeffs).
         # Essentially only produced for SCF calculations.
@@ -1107,12 +1256,13 @@ class Gaussian(logfileparser.Logfile):
                     #continue # Not going to extract mocoeffs
                 # Need to add an extra array to self.mocoeffs
                 self.mocoeffs.append(numpy.zeros((self.nmo, self.nbasis), "d"))
+                mocoeffs = self.mocoeffs[1]
             else:
                 beta = False
-                self.aonames = []
-                self.atombasis = []
-                mocoeffs = [numpy.zeros((self.nmo, self.nbasis), "d")]
+                mocoeffs = numpy.zeros((self.nmo, self.nbasis), "d")
 
+            # The coefficients are printed in pages of five orbitals, and each
+            # page is converted at once into the transpose of the matrix.
             base = 0
             self.popregular = False
             for base in range(0, self.nmo, 5):
@@ -1131,39 +1281,20 @@ class Gaussian(logfileparser.Logfile):
                     self.popregular = True
                 symmetries = next(inputfile)
                 eigenvalues = next(inputfile)
-                for i in range(self.nbasis):
-                                   
-                    line = next(inputfile)
-                    if i == 0:
-                        # Find location of the start of the basis function name
-                        start_of_basis_fn_name = line.find(line.split()[3]) - 1
-                    if base == 0 and not beta: # Just do this the first time 'round
-                        parts = line[:start_of_basis_fn_name].split()
-                        if len(parts) > 1: # New atom
-                            if i > 0:
-                                self.atombasis.append(atombasis)
-                            atombasis = []
-                            atomname = "%s%s" % (parts[2], parts[1])
-                        orbital = line[start_of_basis_fn_name:20].strip()
-                        self.aonames.append("%s_%s" % (atomname, orbital))
-                        atombasis.append(i)
-
-                    part = line[21:].replace("D", "E").rstrip()
-                    temp = [] 
-                    for j in range(0, len(part), 10):
-                        temp.append(float(part[j:j+10]))
-                    if beta:
-                        self.mocoeffs[1][base:base + len(part) / 10, i] = temp
-                    else:
-                        mocoeffs[0][base:base + len(part) / 10, i] = temp
+                lines = [next(inputfile) for i in range(self.nbasis)]
+
+                if base == 0 and not beta: # Just do this the first time 'round
+                    # Find location of the start of the basis function name
+                    start_of_basis_fn_name = lines[0].find(lines[0].split()[3]) - 1
+                    self.aonames, self.atombasis = self.basis_labels(lines, start_of_basis_fn_name)
 
-                if base == 0 and not beta: # Do the last update of atombasis
-                    self.atombasis.append(atombasis)
                 if self.popregular:
                     # We now have aonames, so no need to continue
                     break
+                utils.readpage(mocoeffs.T, lines, base, 5, width=10, start=21)
+
             if not self.popregular and not beta:
-                self.mocoeffs = mocoeffs
+                self.mocoeffs = [mocoeffs]
 
         # Natural orbital coefficients (nocoeffs) and occupation numbers (nooccnos),
         # which are respectively define the eigenvectors and eigenvalues of the
@@ -1180,8 +1311,6 @@ class Gaussian(logfileparser.Logfile):
         #
         if line[5:33] == "Natural Orbital Coefficients":
 
-            self.aonames = []
-            self.atombasis = []
             nocoeffs = numpy.zeros((self.nmo, self.nbasis), "d")
             nooccnos = []
 
@@ -1199,41 +1328,17 @@ class Gaussian(logfileparser.Logfile):
 
                 eigenvalues = next(inputfile)
                 nooccnos.extend(map(float, eigenvalues.split()[2:]))
+                lines = [next(inputfile) for i in range(self.nbasis)]
 
-                for i in range(self.nbasis):
-                                   
-                    line = next(inputfile)
-
-                    # Just do this the first time 'round.
-                    if base == 0:
-
-                        # Changed below from :12 to :11 to deal with Elmar Neumann's example.
-                        parts = line[:11].split()
-                        # New atom.
-                        if len(parts) > 1:
-                            if i > 0:
-                                self.atombasis.append(atombasis)
-                            atombasis = []
-                            atomname = "%s%s" % (parts[2], parts[1])
-                        orbital = line[11:20].strip()
-                        self.aonames.append("%s_%s" % (atomname, orbital))
-                        atombasis.append(i)
-
-                    part = line[21:].replace("D", "E").rstrip()
-                    temp = [] 
-
-                    for j in range(0, len(part), 10):
-                        temp.append(float(part[j:j+10]))
-
-                    nocoeffs[base:base + len(part) / 10, i] = temp
-
-                # Do the last update of atombasis.
+                # Just do this the first time 'round.
+                # Changed below from :12 to :11 to deal with Elmar Neumann's example.
                 if base == 0:
-                    self.atombasis.append(atombasis)
+                    self.aonames, self.atombasis = self.basis_labels(lines, 11)
 
                 # We now have aonames, so no need to continue.
                 if self.popregular:
                     break
+                utils.readpage(nocoeffs.T, lines, base, 5, width=10, start=21)
 
             if not self.popregular:
                 self.nocoeffs = nocoeffs
@@ -1242,21 +1347,14 @@ class Gaussian(logfileparser.Logfile):
         # For FREQ=Anharm, extract anharmonicity constants
         if line[1:40] == "X matrix of Anharmonic Constants (cm-1)":
             Nvibs = len(self.vibfreqs)
-            self.vibanharms = numpy.zeros( (Nvibs, Nvibs), "d")
 
-            base = 0
+            lines = []
             colmNames = next(inputfile)
-            while base < Nvibs:
-                 
+            for base in range(0, Nvibs, 5):
                 for i in range(Nvibs-base): # Fewer lines this time
-                    line = next(inputfile)
-                    parts = line.split()
-                    for j in range(len(parts)-1): # Some lines are longer than others
-                        k = float(parts[j+1].replace("D", "E"))
-                        self.vibanharms[base+j, i+base] = k
-                        self.vibanharms[i+base, base+j] = k
-                base += 5
+                    lines.append(next(inputfile))
                 colmNames = next(inputfile)
+            self.vibanharms = utils.readmatrix(lines, Nvibs, 5, start=7, triangular=True)
 
         # Pseudopotential charges.
         if line.find("Pseudopotential Parameters") > -1:
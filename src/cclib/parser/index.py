@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of cclib (http://cclib.github.io), a library for parsing
+# and interpreting the results of computational chemistry packages.
+#
+# Copyright (C) 2015, the cclib development team
+#
+# The library is free software, distributed under the terms of
+# the GNU Lesser General Public version 2.1 or later. You should have
+# received a copy of the license along with cclib. You can also access
+# the full license online at http://www.gnu.org/copyleft/lgpl.html.
+
+"""A persistent index of the sections in logfiles, for going straight to them"""
+
+
+import json
+import os
+import tempfile
+
+import numpy
+
+from . import logfileparser
+
+
+class SectionIndex(object):
+    """Sidecar files with the byte offsets of the sections in logfiles.
+
+    The index of a logfile is written next to it, with the suffix appended to its name,
+    when it is parsed for the first time. It has the offset of every line containing
+    one of the section_triggers of the parser, which phrases the line contains, and the
+    size and modification time of the logfile. Parsing it again, for example for other
+    attributes, then goes straight to the lines that start the sections needed instead
+    of searching the whole logfile, see Logfile.replay. The phrases are stored by name,
+    so the index stays usable after cclib is upgraded, as long as the parser has no new
+    phrases. Otherwise, or if the logfile changed, the index is written again.
+
+    Only single uncompressed logfiles given by name are indexed, and an index that
+    cannot be written, for example in a read-only directory, is simply not kept.
+    """
+
+    suffix = ".ccindex"
+
+    def path(self, filename):
+        return filename + self.suffix
+
+    def stamp(self, log):
+        stat = os.stat(log.filename)
+        return {"parser": type(log).__name__, "size": stat.st_size, "mtime": stat.st_mtime}
+
+    def phrases(self, log):
+        return log.section_phrases()
+
+    def load(self, log):
+        """Return the sections of a logfile from its index, or None if it is not usable."""
+
+        try:
+            with numpy.load(self.path(log.filename), allow_pickle=False) as archive:
+                header = json.loads(str(archive["header"]))
+                offsets = archive["offsets"]
+                phrases = archive["phrases"]
+        except (EnvironmentError, KeyError, ValueError):
+            return None
+
+        stamp = self.stamp(log)
+        if any(header.get(key) != stamp[key] for key in stamp):
+            return None
+
+        # Map the phrases in the index to the current ones, which might be in another order.
+        current = self.phrases(log)
+        if not set(current) <= set(header["phrases"]):
+            return None
+        positions = numpy.array([current.index(p) if p in current else -1 for p in header["phrases"]], "i")
+        phrases = positions[phrases] if len(phrases) else phrases
+        return offsets[phrases >= 0], phrases[phrases >= 0]
+
+    def build(self, log, inputfile):
+        """Return the sections found by one search over a memory-mapped logfile."""
+        return log.find_sections(inputfile)
+
+    def save(self, log, sections):
+        """Write the index of a logfile, unless that is not possible."""
+
+        header = self.stamp(log)
+        header["phrases"] = self.phrases(log)
+        directory = os.path.dirname(os.path.abspath(log.filename))
+        try:
+            handle, temporary = tempfile.mkstemp(suffix=".tmp", dir=directory)
+        except EnvironmentError:
+            return
+        try:
+            with os.fdopen(handle, "wb") as handle:
+                numpy.savez(handle, header=json.dumps(header), offsets=sections[0], phrases=sections[1])
+            os.chmod(temporary, os.stat(log.filename).st_mode & 0o666)
+            getattr(os, "replace", os.rename)(temporary, self.path(log.filename))
+        except EnvironmentError:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+    def parse(self, log, attributes=None, **kwds):
+        """Return the data for a Logfile instance, reading only the sections needed.
+
+        Any other keyword arguments are passed on to the parse method.
+        """
+
+        if log.isstream or hasattr(log, "buffer") or not isinstance(log.filename, str) \
+           or not log.section_triggers:
+            return log.parse(attributes=attributes, **kwds)
+
+        inputfile = log._open()
+        if not isinstance(inputfile, logfileparser.FileWrapper) or inputfile.buffer is None:
+            log._opened = inputfile
+            return log.parse(attributes=attributes, **kwds)
+
+        sections = self.load(log)
+        if sections is None:
+            sections = self.build(log, inputfile)
+            self.save(log, sections)
+
+        inputfile.seek(0)
+        log._opened = inputfile
+        log._sections = sections
+        return log.parse(attributes=attributes, **kwds)
@@ -24,6 +24,39 @@ from . import utils
 class Jaguar(logfileparser.Logfile):
     """A Jaguar output file"""
 
+    # Phrases that start each section parsed in extract(), in the same order.
+    section_triggers = [
+        "net molecular charge",
+        "Gaussian basis set information",
+        "Effective Core Potential",
+        "new geometry",
+        "Symmetrized geometry",
+        "Input geometry",
+        "SCFE: SCF energy:",
+        "Total LMP2 Energy",
+        "Geometry optimization complete",
+        "number of occupied orbitals",
+        "number of basis functions",
+        "number of alpha occupied orb",
+        "etot",
+        "Orbital energies",
+        ("Occupied + virtual Orbitals- final wvfn", ["aonames", "atombasis", "mocoeffs"]),
+        ("occupied + virtual orbitals: final wave function", ["aonames", "atombasis", "mocoeffs"]),
+        "Atomic charges from Mulliken population analysis:",
+        ("olap", ["aooverlaps"]),
+        ("overlap matrix:", ["aooverlaps"]),
+        "start of program geopt",
+        "geometry optimization step",
+        "start of program freq",
+        "Excited State",
+    ]
+
+    # Attributes that are parsed once and never change afterwards.
+    final_attributes = ["charge", "mult", "natom", "nbasis"]
+
+    # Phrases printed at the end of jobs that terminate normally, for status().
+    termination_triggers = ["completed on"]
+
     def __init__(self, *args, **kwargs):
 
         # Call the __init__ method of the superclass
@@ -202,7 +235,7 @@ class Jaguar(logfileparser.Logfile):
         # Get the atom coordinates
             if not hasattr(self, "atomcoords") or line[1:21] == "Symmetrized geometry":
                 # Wipe the "Input geometry" if "Symmetrized geometry" present
-                self.atomcoords = []
+                self.atomcoords = utils.FrameBuffer()
             p = re.compile("(\D+)\d+") # One/more letters followed by a number
             atomcoords = []
             atomnos = []
@@ -222,7 +255,7 @@ class Jaguar(logfileparser.Logfile):
         # Hartree-Fock energy after SCF
         if line[1:18] == "SCFE: SCF energy:":
             if not hasattr(self, "scfenergies"):
-                self.scfenergies = []
+                self.scfenergies = utils.FrameBuffer()
             temp = line.strip().split()
             scfenergy = float(temp[temp.index("hartrees") - 1])
             scfenergy = utils.convertor(scfenergy, "hartree", "eV")
@@ -397,12 +430,13 @@ class Jaguar(logfileparser.Logfile):
 
             spin = 1 + int(self.unrestrictedflag)
             for s in range(spin):
-                mocoeffs = numpy.zeros((len(self.moenergies[s]), self.nbasis), "d")
+                nmo = len(self.moenergies[s])
+                lines = []
 
                 if s == 1: #beta case
                     self.skip_lines(inputfile, ['s', 'b', 'title', 'b', 's', 'b', 'b'])
 
-                for k in range(0, len(self.moenergies[s]), 5):
+                for k in range(0, nmo, 5):
                     self.updateprogress(inputfile, "Coefficients")
 
                     # All known version have a line with indices followed by the eigenvalues.
@@ -449,16 +483,15 @@ class Jaguar(logfileparser.Logfile):
 
                             lastatom = info[1]
 
-                        for j in range(len(info[3:])):
-                            mocoeffs[j+k, i] = float(info[3+j])
-
+                        lines.append(line)
                         line = next(inputfile)
 
                     if not hasattr(self,"aonames"):
                         self.aonames = aonames
 
                     offset += 5
-                self.mocoeffs.append(mocoeffs)
+                mocoeffs = utils.readmatrix(lines, self.nbasis, 5, width=10, start=25, ncols=nmo)
+                self.mocoeffs.append(mocoeffs.T.copy())
 
         #  Atomic charges from Mulliken population analysis: 
         #   
@@ -491,17 +524,15 @@ class Jaguar(logfileparser.Logfile):
                 return
                 # This was continue (in loop) before parser refactoring.
                 # continue # avoid "olap-dev"
-            self.aooverlaps = numpy.zeros((self.nbasis, self.nbasis), "d")
-
+            lines = []
             for i in range(0, self.nbasis, 5):
                 self.updateprogress(inputfile, "Overlap")
 
                 self.skip_lines(inputfile, ['b', 'header'])
 
                 for j in range(i, self.nbasis):
-                    temp = list(map(float, next(inputfile).split()[1:]))
-                    self.aooverlaps[j, i:(i+len(temp))] = temp
-                    self.aooverlaps[i:(i+len(temp)), j] = temp
+                    lines.append(next(inputfile))
+            self.aooverlaps = utils.readmatrix(lines, self.nbasis, 5, start=4, triangular=True)
             
         if line[2:24] == "start of program geopt":
             if not self.geoopt:
@@ -536,7 +567,7 @@ class Jaguar(logfileparser.Logfile):
         if line[2:28] == "geometry optimization step":
 
             if not hasattr(self, "geovalues"):
-                self.geovalues = []
+                self.geovalues = utils.FrameBuffer()
                 self.geotargets = numpy.zeros(5, "d")
 
             gopt_step = int(line.split()[-1])
@@ -13,17 +13,31 @@
 """Generic output file parser and related tools"""
 
 
+import bisect
 import bz2
+import collections
+import copy
 import fileinput
+import functools
 import gzip
 import inspect
 import io
 import logging
+import mmap
+import multiprocessing
 import os
 import random
+import re
 import sys
+import tarfile
+import tempfile
 import zipfile
 
+try:
+    import lzma
+except ImportError:
+    lzma = None
+
 import numpy
 
 from . import utils
@@ -33,57 +47,351 @@ from .data import ccData
 # This seems to avoid a problem with Avogadro.
 logging.logMultiprocessing =  0
 
+# Besides non-ASCII characters, these bytes make FileWrapper split a block as bytes
+# rather than as text: carriage returns, and the control characters that
+# str.splitlines() treats as line boundaries but files do not.
+_special = [b"\r", b"\x0b", b"\x0c", b"\x1c", b"\x1d", b"\x1e"]
+
+# Objects holding the raw bytes of a logfile that can be parsed without a copy.
+buffertypes = (bytes, bytearray, memoryview, mmap.mmap)
+
+# The magic bytes at the start of compressed files, the module needed to read them,
+# and functions that return a binary file object with the decompressed contents of
+# such a file object. Gzip files can consist of several members, read one by one.
+# Before Python 3.3, BZ2File only takes the name of a file.
+compressions = [
+    (b"\x1f\x8b",       gzip,   lambda raw: gzip.GzipFile(fileobj=raw, mode="rb")),
+    (b"BZh",            bz2,    lambda raw: bz2.BZ2File(raw if sys.version_info >= (3, 3) else raw.name, "rb")),
+    (b"\xfd7zXZ\x00",   lzma,   lambda raw: lzma.LZMAFile(raw, "rb")),
+]
+
+
+# The expressions compiled by compile_triggers, by their phrases and type.
+_compiled = {}
+
+
+def compile_triggers(phrases, binary=True):
+    """Compile a tuple of phrases into one regular expression that finds any of them.
+
+    Phrases are matched exactly, except those prefixed with (?i), which are
+    matched regardless of case. The alternatives are factored by their common
+    prefixes, which makes the search several times faster than a plain alternation
+    of the phrases. The first character of every alternative is kept literal, since
+    the search can then quickly skip positions that cannot start a match. The
+    expression is compiled for bytes by default, or for text.
+
+    >>> compile_triggers(("SCF Done", "SCF energy", "Step"), False).pattern
+    'S(?:CF\\\\ (?:Done|energy)|tep)'
+    >>> compile_triggers(("(?i)Atoms:", ), False).pattern
+    '(?:A[Tt][Oo][Mm][Ss]:|a[Tt][Oo][Mm][Ss]:)'
+    """
+
+    if (phrases, binary) in _compiled:
+        return _compiled[(phrases, binary)]
+
+    variants = []
+    for phrase in phrases:
+        if phrase.startswith("(?i)"):
+            rest = ["[%s%s]" % (c.upper(), c.lower()) if c.isalpha() else re.escape(c) for c in phrase[5:]]
+            for first in sorted(set([phrase[4].upper(), phrase[4].lower()])):
+                variants.append([re.escape(first)] + rest)
+        else:
+            variants.append([re.escape(c) for c in phrase])
+
+    tree = {}
+    for keys in variants:
+        node = tree
+        for key in keys:
+            node = node.setdefault(key, {})
+        node[""] = {}
 
-class myBZ2File(bz2.BZ2File):
-    """Return string instead of bytes"""
-    def __next__(self):
-        line = super().__next__()
-        return line.decode("ascii", "replace")
+    def alternation(node):
+        branches = [key + alternation(child) for key, child in sorted(node.items()) if key]
+        if "" in node:
+            return ""
+        if len(branches) == 1:
+            return branches[0]
+        return "(?:%s)" % "|".join(branches)
 
-class myGzipFile(gzip.GzipFile):
-    """Return string instead of bytes"""
-    def __next__(self):
-        line = super().__next__()
-        return line.decode("ascii", "replace")
+    pattern = alternation(tree)
+    _compiled[(phrases, binary)] = re.compile(pattern.encode("latin-1") if binary else pattern)
+    return _compiled[(phrases, binary)]
 
 
 class FileWrapper(object):
-    """Wrap a file object so that we can maintain position"""
+    """Wrap a file object so that we can maintain position
+
+    Lines are read from the raw bytes of the file, which is memory-mapped whenever
+    possible, in large blocks that always end at a newline. Blocks of plain ASCII
+    text are split into lines in one go, and lines from any other block (non-ASCII
+    characters or carriage returns) are split as bytes and decoded only at the time
+    they are handed out, so pos is always an exact byte offset. Besides binary file
+    objects, bytes, bytearray and mmap objects can be wrapped directly, without
+    copying them first. Other buffers, such as a memoryview, are copied to bytes,
+    since they cannot be searched in every version of Python.
+
+    A file object with decompressed contents can also be wrapped, together with
+    the raw file object it decompresses, in which case the size and the progress
+    position (from progress_pos) refer to the compressed bytes in the raw file.
+    For file objects that cannot seek, such as members of archives or pipes, the
+    size can be given, and is None otherwise. Such files can still go back to an
+    earlier position once, but only if the bytes read were kept, which is done when
+    history is set to an empty list before reading. Text streams are read as UTF-8.
+    """
+
+    # The number of bytes read and decoded at a time (rounded up to the next newline).
+    blocksize = 2**20
 
-    def __init__(self, file):
-        self.file = file
+    def __init__(self, source, raw=None, size=None):
         self.pos = 0
-        self.file.seek(0, 2)
-        self.size = self.file.tell()
-        self.file.seek(0, 0)
+        self.file = None
+        self.buffer = None
+        self.raw = raw
+        self.history = None
+        self._replay = b""
+        self._ownsbuffer = False
+        if raw is not None or size is not None:
+            self.file = source
+        elif hasattr(source, "read"):
+            self.file = source
+            try:
+                self.buffer = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+                self._ownsbuffer = True
+            except (AttributeError, EnvironmentError, ValueError, io.UnsupportedOperation):
+                pass
+        elif isinstance(source, mmap.mmap):
+            self.buffer = source
+        elif isinstance(source, (bytes, bytearray)):
+            self.buffer = source
+        else:
+            self.buffer = memoryview(source).tobytes()
+        if self.buffer is not None:
+            self.size = len(self.buffer)
+        elif raw is not None:
+            self.size = os.fstat(raw.fileno()).st_size
+        elif size is not None or not self.seekable():
+            self.size = size
+        else:
+            self.file.seek(0, 2)
+            self.size = self.file.tell()
+            self.file.seek(0, 0)
+        self._reset(0)
+
+    def _reset(self, offset):
+        """Discard any buffered lines and continue reading from the given offset."""
+        self._offset = offset
+        self._remainder = b""
+        self._block = b""
+        self._lines = []
+        self._ends = None
+        self._index = 0
+        self._raw = False
+
+    def _read(self, size):
+        """Return up to size raw bytes following the last ones read."""
+        if self.buffer is not None:
+            chunk = self.buffer[self._offset:self._offset + size]
+            self._offset += len(chunk)
+            return bytes(chunk)
+        if self._replay:
+            chunk = self._replay[:size]
+            self._replay = self._replay[size:]
+        else:
+            chunk = self.file.read(size)
+            if not isinstance(chunk, bytes):
+                chunk = chunk.encode("utf-8")
+            if self.history is not None:
+                self.history.append(chunk)
+        self._offset += len(chunk)
+        return chunk
+
+    def _fill(self):
+        """Split the next block into lines, returning False at the end of the input."""
+
+        block = self._remainder + self._read(self.blocksize)
+        end = block.rfind(b"\n") + 1
+        while not end:
+            chunk = self._read(self.blocksize)
+            if not chunk:
+                end = len(block)
+                break
+            block += chunk
+            end = block.rfind(b"\n") + 1
+        if not block:
+            return False
+
+        self._remainder = block[end:]
+        block = self._block = block[:end]
+        try:
+            text = block.decode("ascii")
+            self._raw = any(c in block for c in _special)
+        except UnicodeDecodeError:
+            self._raw = True
+        self._lines = block.splitlines(True) if self._raw else text.splitlines(True)
+        self._ends = None
+        self._index = 0
+        return True
 
     def next(self):
-        line = next(self.file)
+
+        try:
+            line = self._lines[self._index]
+        except IndexError:
+            if not self._fill():
+                raise StopIteration
+            line = self._lines[0]
+        self._index += 1
         self.pos += len(line)
+
+        if self._raw:
+            line = line.decode("utf-8", "ignore")
+            if line[-1:] == "\r" or line[-2:] == "\r\n":
+                line = line.rstrip("\r\n") + "\n"
         return line
 
-    def __next__(self):
-        return self.next()
+    __next__ = next
 
     def __iter__(self):
         return self
 
-    def close(self):
-        self.file.close()
+    def skip_to(self, regex, end=None):
+        """Skip to the next line that contains a match for a compiled bytes regex.
+
+        The search runs over whole blocks of raw bytes at a time, and the lines
+        skipped are never decoded. Returns the matching line, or None at the end,
+        or before a line that starts at or after the byte offset end, if given.
+        """
+
+        while True:
+            if self._index < len(self._lines):
+                if self._ends is None:
+                    self._ends = numpy.cumsum([len(line) for line in self._lines]).tolist()
+                start = self._ends[self._index - 1] if self._index else 0
+                match = regex.search(self._block, start)
+                if match:
+                    self._index = bisect.bisect_right(self._ends, match.start())
+                    self.pos += (self._ends[self._index - 1] if self._index else 0) - start
+                    if end is not None and self.pos >= end:
+                        return None
+                    return self.next()
+                self.pos += self._ends[-1] - start
+                self._index = len(self._lines)
+            if end is not None and self.pos >= end:
+                return None
+            if not self._fill():
+                return None
+
+    def tail(self, size):
+        """Return the last size bytes of the input, or all of them if there are fewer.
+
+        When tailed() is True, the end is read directly and the position is not changed.
+        Anything else, such as compressed files and pipes, has to be read to the end
+        once (blocksize bytes at a time), keeping only the blocks that make up the last
+        size bytes.
+        """
+
+        if self.buffer is not None:
+            return bytes(self.buffer[max(self.size - size, 0):])
+        if self.tailed():
+            self.file.seek(max(self.size - size, 0))
+            chunk = self.file.read(size)
+            self.file.seek(self._offset)
+            return chunk
+        blocks = collections.deque()
+        kept = 0
+        chunk = self._read(self.blocksize)
+        while chunk:
+            blocks.append(chunk)
+            kept += len(chunk)
+            while kept - len(blocks[0]) >= size:
+                kept -= len(blocks.popleft())
+            chunk = self._read(self.blocksize)
+        return b"".join(blocks)[-size:]
+
+    def tailed(self):
+        """Can the end of the input be read without reading everything before it?"""
+        if self.buffer is not None:
+            return True
+        return (self.raw is None and self.size is not None and self.seekable()
+                and not isinstance(self.file, io.TextIOBase))
 
-    def seek(self, pos, ref):
-        self.file.seek(pos, ref)
+    def close(self):
+        if self._ownsbuffer:
+            self.buffer.close()
+        if self.file is not None:
+            self.file.close()
+        if self.raw is not None:
+            self.raw.close()
+
+    def seek(self, pos, ref=0):
+        if ref == 1:
+            pos += self.pos
+        elif ref == 2 and self.buffer is None and (self.raw is not None or not self.seekable()):
+            # The decompressed size is only known once everything was decompressed,
+            # and files that cannot seek need to be read to the end anyway.
+            while self._read(self.blocksize):
+                pass
+            pos += self._offset
+        elif ref == 2:
+            pos += self.size
+        if self.buffer is not None and ref != 2 and self._inblock(pos):
+            return
+        if self.buffer is None and pos != self._offset:
+            if self.history is not None and pos <= self._offset:
+                # Read the bytes kept from this position again, which is only done once.
+                self._replay = b"".join(self.history)[pos:]
+                self.history = None
+            else:
+                self.file.seek(pos, 0)
+        self.pos = pos
+        self._reset(pos)
+
+    def _inblock(self, pos):
+        """Go to pos without splitting the block again, if it starts a line in it."""
+
+        start = self._offset - len(self._remainder) - len(self._block)
+        if not self._lines or not start <= pos < start + len(self._block):
+            return False
+        if self._ends is None:
+            self._ends = numpy.cumsum([len(line) for line in self._lines]).tolist()
+        index = bisect.bisect_right(self._ends, pos - start)
+        if (self._ends[index - 1] if index else 0) != pos - start:
+            return False
+        self.pos = pos
+        self._index = index
+        return True
+
+    def seekable(self):
+        if self.buffer is not None:
+            return True
+        try:
+            return self.file.seekable()
+        except (AttributeError, io.UnsupportedOperation):
+            return False
+
+    def tell(self):
+        return self.pos
+
+    def progress_pos(self):
+        """Return the position to report progress with, relative to size."""
+        return self.pos if self.raw is None else self.raw.tell()
 
 
 def openlogfile(filename):
     """Return a file object given a filename.
 
-    Given the filename of a log file or a gzipped, zipped, or bzipped
-    log file, this function returns a regular Python file object.
+    Given the filename of a log file or a gzipped, zipped, bzipped or xz
+    compressed log file, this function returns a FileWrapper object. Compressed
+    files are recognized by their first bytes, not by the extension, and are
+    decompressed as they are read. A zip file should contain a single logfile,
+    while archives with many logfiles can be read with openarchive.
 
     Given an address starting with http://, this function retrieves the url
     and returns a file object using a temporary file.
 
+    Given an object with raw bytes (bytes, bytearray or mmap), this function
+    wraps it directly without copying the contents, and a memoryview is copied.
+
     Given a list of filenames, this function returns a FileInput object,
     which can be used for seamless iteration without concatenation.
     """
@@ -91,26 +399,31 @@ def openlogfile(filename):
     # If there is a single string argument given.
     if type(filename) in [str, str]:
 
-        extension = os.path.splitext(filename)[1]
+        raw = io.open(filename, "rb")
+        magic = raw.read(8)
+        raw.seek(0)
 
-        if extension == ".gz":
-            fileobject = myGzipFile(filename, "r")
-
-        elif extension == ".zip":
-            zip = zipfile.ZipFile(filename, "r")
+        if magic.startswith(b"PK\x03\x04"):
+            zip = zipfile.ZipFile(raw, "r")
             assert len(zip.namelist()) == 1, "ERROR: Zip file contains more than 1 file"
-            fileobject = io.StringIO(zip.read(zip.namelist()[0]).decode("ascii", "ignore"))
-
-        elif extension in ['.bz', '.bz2']:
-            # Module 'bz2' is not always importable.
-            assert bz2 != None, "ERROR: module bz2 cannot be imported"
-            fileobject = myBZ2File(filename, "r")
+            fileobject = FileWrapper(zip.open(zip.infolist()[0]), raw)
 
         else:
-            fileobject = FileWrapper(io.open(filename, "r", errors='ignore'))
+            for prefix, module, decompress in compressions:
+                if magic.startswith(prefix):
+                    # Module 'lzma' is not always importable.
+                    assert module != None, "ERROR: module for compressed file cannot be imported"
+                    fileobject = FileWrapper(decompress(raw), raw)
+                    break
+            else:
+                fileobject = FileWrapper(raw)
 
         return fileobject
 
+    elif isinstance(filename, buffertypes):
+
+        return FileWrapper(filename)
+
     elif hasattr(filename, "__iter__"):
 
         # Compression (gzip and bzip) is supported as of Python 2.5.
@@ -122,6 +435,102 @@ def openlogfile(filename):
         return fileobject
 
 
+def openarchive(filename):
+    """Iterate over the files in a zip or tar archive as (name, FileWrapper) pairs.
+
+    The members are decompressed as they are read, without being extracted to disk
+    or read into memory as a whole. Tar archives can be compressed with gzip, bzip2
+    or xz, and are read in a single pass, so each file should be read before going
+    on to the next one, and cannot seek (but see FileWrapper.history).
+    """
+
+    if zipfile.is_zipfile(filename):
+        with zipfile.ZipFile(filename, "r") as archive:
+            for info in archive.infolist():
+                if not info.filename.endswith("/"):
+                    yield info.filename, FileWrapper(archive.open(info), size=info.file_size)
+    else:
+        with tarfile.open(filename, "r|*") as archive:
+            for info in archive:
+                if info.isfile():
+                    yield info.name, FileWrapper(archive.extractfile(info), size=info.size)
+
+
+# One step of a trajectory yielded by Logfile.iterframes, with the fields as in ccData.
+Frame = collections.namedtuple("Frame", ["coords", "energy", "grads", "geovalues", "atomnos"])
+
+
+def _signature(value):
+    """Return what changes when an attribute changes in place, for Logfile.events."""
+
+    def sized(item):
+        return (id(item), len(item)) if hasattr(item, "__len__") else (type(item), repr(item))
+
+    if isinstance(value, dict):
+        return tuple((key, sized(item)) for key, item in value.items())
+    if isinstance(value, list) and value:
+        return sized(value), sized(value[-1])
+    return sized(value)
+
+
+def _parse_job(task):
+    """Parse one job in a worker process for Logfile.pool_jobs, returning a list.
+
+    The job is parsed from its part of the logfile, which can still hold no jobs at
+    all, for example if it is only the output before the first job. This is read into
+    a bytearray, since bytes would be taken for a filename in Python 2.
+    """
+
+    parser, loglevel, datatype, filename, start, end, attributes = task
+    part = bytearray(end - start)
+    with io.open(filename, "rb") as handle:
+        handle.seek(start)
+        handle.readinto(part)
+    log = parser(part, loglevel=loglevel)
+    log.datatype = datatype
+    return list(log.split_jobs(log._open(), attributes))
+
+
+def _parse_lazy(parser, sections, stamp, name):
+    """Parse one lazy attribute with Logfile.parse_lazy.
+
+    This is used instead of the bound method, which cannot be pickled in Python 2.
+    """
+
+    return parser.parse_lazy(sections, stamp, name)
+
+
+def _copy_containers(value):
+    """Return a copy of the lists, dicts and frame buffers in a value, keeping everything else."""
+
+    if isinstance(value, utils.FrameBuffer):
+        return copy.deepcopy(value)
+    if isinstance(value, list):
+        copied = copy.copy(value)
+        copied[:] = [_copy_containers(item) for item in value]
+        return copied
+    if isinstance(value, dict):
+        copied = copy.copy(value)
+        for key in copied:
+            copied[key] = _copy_containers(copied[key])
+        return copied
+    return value
+
+
+def _parse_sections(task):
+    """Parse one group of independent sections in a worker for Logfile.parse_parallel.
+
+    Returns a dict with the attributes in the group that were found.
+    """
+
+    parser, loglevel, datatype, filename, sections, attributes = task
+    log = parser(filename, loglevel=loglevel)
+    log.datatype = datatype
+    log._sections = sections
+    data = log.parse(attributes=attributes)
+    return dict((name, getattr(data, name)) for name in attributes if hasattr(data, name))
+
+
 class Logfile(object):
     """Abstract class for logfile objects.
 
@@ -130,6 +539,60 @@ class Logfile(object):
           Psi, QChem
     """
 
+    # Phrases that start the sections of output handled by extract(). If a subclass
+    # declares them, extract() is only called for lines that contain at least one
+    # of these phrases, so every condition that extract() tests on the line it is
+    # passed must imply one of them. All other lines are skipped at the speed of a
+    # single regular expression search, which is why these should be as specific as
+    # possible. A phrase prefixed with (?i) is matched regardless of case. If this
+    # is empty, extract() is called for every line.
+    #
+    # An entry can also be a tuple of a phrase and the list of attributes parsed in its
+    # section, which is skipped by parse() when none of those attributes are requested,
+    # so handlers must not rely on such sections other than their own. If the phrase is
+    # also printed in lines that do not start the section, a regular expression can be
+    # added as a third item, which the lines that do must match from their start.
+    section_triggers = []
+
+    # Attributes that are parsed at most once and never changed afterwards, not even
+    # in after_parsing(), so that parse() can stop reading as soon as these are the
+    # only ones requested and have all been set. In parsers, these are typically set
+    # with set_attribute(), which warns when a value does change.
+    final_attributes = []
+
+    # Phrases that start the parts of the output describing the job, rather than its
+    # results, such as the echo of the input, which are handled by sniff_header().
+    # These are matched like section_triggers, but only at the start of the logfile.
+    header_triggers = []
+
+    # The number of bytes at the start of the logfile read by sniff().
+    sniff_limit = 2**18
+
+    # Attributes that take long to parse and are rarely needed, which are parsed only
+    # when first accessed if parse() is lazy. This is done for the sections that only
+    # have such attributes according to section_triggers, while sections that also
+    # have other attributes are parsed right away, with their lazy attributes.
+    lazy_attributes = ["aooverlaps", "etsecs", "fooverlaps", "mocoeffs", "nocoeffs", "vibdisps"]
+
+    # Phrases printed when a job terminates normally, looked for by status() near the
+    # end of the logfile, which also reads at most the last status_limit bytes.
+    termination_triggers = []
+    status_limit = 2**24
+
+    # Attributes with an entry for each step of a job, such as each geometry of an
+    # optimization, for which iterparse() yields every entry as it is parsed.
+    step_attributes = ["atomcoords", "ccenergies", "geovalues", "grads", "mpenergies",
+                       "scfenergies", "scftargets", "scfvalues"]
+
+    # Phrases on the lines that start another job in the same logfile, such as the
+    # next step of a chain of Gaussian jobs, matched like section_triggers. Each job
+    # is parsed into a data object of its own by parse_jobs().
+    job_triggers = []
+
+    # Attributes that can take most of the memory of the data, whose sizes parse() checks
+    # against max_memory before their sections, see estimate().
+    heavy_attributes = ["aooverlaps", "fooverlaps", "hessian", "mocoeffs", "nocoeffs", "vibdisps"]
+
     def __init__(self, source, loglevel=logging.INFO, logname="Log",
                     logstream=sys.stdout, datatype=ccData, **kwds):
         """Initialise the Logfile object.
@@ -137,7 +600,9 @@ class Logfile(object):
         This should be called by a subclass in its own __init__ method.
 
         Inputs:
-            source - a single logfile, a list of logfiles, or input stream
+            source - a single logfile, a list of logfiles, input stream (which can
+                     be a FileWrapper), or raw bytes of a logfile (bytes, bytearray,
+                     mmap, or another buffer, which is copied)
         """
 
         # Set the filename to source if it is a string or a list of filenames.
@@ -149,10 +614,14 @@ class Logfile(object):
         elif isinstance(source, list) and all([isinstance(s, str) for s in source]):
             self.filename = source
             self.isstream = False
-        elif hasattr(source, "read"):
+        elif hasattr(source, "read") or isinstance(source, FileWrapper):
             self.filename = "stream %s" % str(type(source))
             self.isstream = True
             self.stream = source
+        elif isinstance(source, buffertypes):
+            self.filename = "buffer %s" % str(type(source))
+            self.isstream = False
+            self.buffer = source
         else:
             raise ValueError
 
@@ -184,6 +653,19 @@ class Logfile(object):
             from .data import ccData_optdone_bool
             self.datatype = ccData_optdone_bool
 
+    def __getstate__(self):
+        """Pickle the logger by its name, since it cannot be pickled in Python 2."""
+
+        state = dict(self.__dict__)
+        if "logger" in state:
+            state["logger"] = state["logger"].name
+        return state
+
+    def __setstate__(self, state):
+        if "logger" in state:
+            state["logger"] = logging.getLogger(state["logger"])
+        self.__dict__.update(state)
+
     def __setattr__(self, name, value):
 
         # Send info to logger if the attribute is in the list self._attrlist.
@@ -196,11 +678,43 @@ class Logfile(object):
                 else:
                     self.logger.info("Creating attribute %s: %s" %(name, str(value)))
 
+        # Remember the attributes assigned while yielding events in iterparse().
+        if "_assigned" in self.__dict__:
+            self._assigned.add(name)
+
         # Set the attribute.
         object.__setattr__(self, name, value)
 
-    def parse(self, progress=None, fupdate=0.05, cupdate=0.002):
-        """Parse the logfile, using the assumed extract method of the child."""
+    def parse(self, progress=None, fupdate=0.05, cupdate=0.002, attributes=None, lazy=False,
+              workers=None, max_memory=None, spill=None):
+        """Parse the logfile, using the assumed extract method of the child.
+
+        If a list of attributes is passed, sections of the logfile that only contain
+        other attributes are skipped, and parsing stops as soon as all requested
+        attributes are final. Attributes that were not requested may then be missing
+        from the returned data, and the names of those that depend on sections found
+        but skipped are stored in self.skipped_attributes.
+
+        If lazy (and no attributes are passed), the sections that only have some of the
+        lazy_attributes are skipped, and these attributes are parsed only when first
+        accessed on the data returned, which can also evict them again. The sections in a memory-mapped
+        logfile are found in one search beforehand, so that parsing an attribute later
+        goes straight to the sections needed, see replay(). Streams cannot be read
+        again, so they are parsed in full.
+
+        With more than one worker (and if not lazy), the sections that can be skipped are
+        parsed in other processes at the same time, see parse_parallel().
+
+        If max_memory is given, in bytes, the size of each of the heavy_attributes is
+        estimated before its first section, from the attributes parsed by then, and if
+        it does not fit in what is left of max_memory, the attribute is mapped from a
+        file written to the spill directory if one is given, or else kept in single
+        precision if that fits, or else its sections are skipped. What was done is
+        stored in the memory_actions of the data, a dict with (action, size) for each
+        of these attributes, where the action is "spilled", "float32" or "skipped",
+        and attributes skipped are also in self.skipped_attributes. This cannot be
+        combined with lazy parsing, and the logfile is then parsed in this process.
+        """
 
         # Check that the sub-class has an extract attribute,
         #  that is callable with the proper number of arguemnts.
@@ -211,20 +725,33 @@ class Logfile(object):
         if len(inspect.getargspec(self.extract)[0]) != 3:
             raise AttributeError("Method %s._extract takes wrong number of arguments." %self.__class__.__name__)
 
+        if max_memory is not None and lazy:
+            raise ValueError("max_memory cannot be combined with lazy parsing")
+
+        if workers is not None and workers > 1 and not lazy and self.section_triggers \
+           and max_memory is None:
+            return self.parse_parallel(workers, progress=progress, fupdate=fupdate,
+                                       cupdate=cupdate, attributes=attributes)
+
         # Save the current list of attributes to keep after parsing.
         # The dict of self should be the same after parsing.
         _nodelete = list(set(self.__dict__.keys()))
 
         # Initiate the FileInput object for the input files.
-        # Remember that self.filename can be a list of files.
-        if not self.isstream:
-            inputfile = openlogfile(self.filename)
-        else:
-            inputfile = self.stream
+        inputfile = self._open()
+
+        # For lazy parsing, the sections are kept for parsing the lazy attributes later.
+        lazy = lazy and attributes is None and not self.isstream
+        if lazy:
+            attributes = self.eager_attributes()
+            if not hasattr(self, "_sections") and self.section_triggers and \
+               isinstance(inputfile, FileWrapper) and inputfile.buffer is not None:
+                self._sections = self.find_sections(inputfile)
+            load = functools.partial(_parse_lazy, self, getattr(self, "_sections", None), self.stamp())
 
         # Intialize self.progress
-        is_compressed = isinstance(inputfile, myGzipFile) or isinstance(inputfile, myBZ2File)
-        if progress and not (is_compressed):
+        # The size of some streams is not known, in which case it is None.
+        if progress:
             self.progress = progress
             self.progress.initialize(inputfile.size)
             self.progress.step = 0
@@ -234,24 +761,673 @@ class Logfile(object):
         # Maybe the sub-class has something to do before parsing.
         self.before_parsing()
 
+        # Parsing can stop early only when all requested attributes are final.
+        self._skipped = set()
+        early = bool(attributes) and set(attributes) <= set(self.final_attributes)
+        stopped = False
+
+        # The sections of heavy attributes are checked against the memory left, if limited.
+        if max_memory is not None:
+            self._budget = {"limit": max_memory, "spill": spill, "actions": {}, "kept": set()}
+
         # Loop over lines in the file object and call extract().
         # This is where the actual parsing is done.
-        for line in inputfile:
+        for line in self.scan(inputfile, attributes):
 
             self.updateprogress(inputfile, "Unsupported information", cupdate)
 
+            if max_memory is not None and not self.budget(line):
+                continue
+
             # This call should check if the line begins a section of extracted data.
             # If it does, it parses some lines and sets the relevant attributes (to self).
             # Any attributes can be freely set and used across calls, however only those
             #   in data._attrlist will be moved to final data object that is returned.
             self.extract(inputfile, line)
 
+            if max_memory is not None:
+                self.reduce_attributes()
+
+            if early and all(hasattr(self, name) for name in attributes):
+                stopped = True
+                break
+
         # Close input file object.
         if not self.isstream:
             inputfile.close()
 
+        # Maybe the sub-class has something to do after parsing, but not if parsing
+        # stopped early, since that would normally expect the whole file to be parsed.
+        data = self.finalize(after_parsing=not stopped)
+
+        # Delete all temporary attributes (including cclib attributes).
+        # All attributes should have been moved to a data object, which will be returned.
+        skipped = self._skipped
+        if max_memory is not None:
+            data.memory_actions = {}
+            for name, (action, size) in self._budget["actions"].items():
+                done = skipped if action == "skipped" else data.__dict__
+                if name in done:
+                    data.memory_actions[name] = (action, size)
+        for attr in list(self.__dict__.keys()):
+            if not attr in _nodelete:
+                self.__delattr__(attr)
+        if attributes is not None or max_memory is not None:
+            self.skipped_attributes = sorted(name for name in skipped if not hasattr(data, name))
+        if lazy:
+            # Handlers can read on into a skipped section and set some of its attributes
+            # partly, so these are dropped and parsed in full when first accessed as well.
+            for name in skipped:
+                if name in data.__dict__:
+                    delattr(data, name)
+            data._lazy = dict((name, load) for name in sorted(skipped))
+
+        # Update self.progress as done.
+        if hasattr(self, "progress"):
+            self.progress.update(inputfile.size or inputfile.progress_pos(), "Done")
+
+        return data
+
+    def parse_parallel(self, workers, attributes=None, **kwds):
+        """Parse the logfile with the independent sections in a pool of processes.
+
+        The sections declared with attributes in section_triggers are those that can be
+        skipped without changing any other attributes, and their handlers rely only on
+        what was parsed in sections without attributes. Such sections are found in one
+        search over the memory-mapped logfile beforehand, and grouped by attributes, with
+        sections sharing any attributes in the same group. Each group found is parsed by
+        a worker process, which maps the logfile itself and goes straight to the sections
+        it needs, see replay(), while the other sections are parsed here at the same time.
+        The attributes from the workers are then added to the data, which is the same as
+        for lazy parsing once all attributes have been accessed.
+
+        Logfiles that are not memory-mapped from a single file given by name are simply
+        parsed here, and so are those in which there are no independent sections.
+        Other keyword arguments are passed on to parse().
+        """
+
+        inputfile = self._open()
+        self._opened = inputfile
+        if self.isstream or hasattr(self, "buffer") or not isinstance(self.filename, str) or \
+           not isinstance(inputfile, FileWrapper) or inputfile.buffer is None:
+            return self.parse(attributes=attributes, **kwds)
+
+        sections = getattr(self, "_sections", None)
+        if sections is None:
+            sections = self.find_sections(inputfile)
+        groups = self.independent_groups(set(sections[1].tolist()), attributes)
+        self._sections = sections
+        if not groups:
+            return self.parse(attributes=attributes, **kwds)
+
+        offloaded = set(name for group in groups for name in group)
+        requested = self.datatype._attrlist if attributes is None else attributes
+        tasks = [(type(self), self.loglevel, self.datatype, self.filename, sections, group)
+                 for group in groups]
+        pool = multiprocessing.Pool(min(workers - 1, len(tasks)))
+        try:
+            results = pool.map_async(_parse_sections, tasks)
+            data = self.parse(attributes=[name for name in requested if not name in offloaded], **kwds)
+            results = results.get()
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+
+        # Handlers can read on into a skipped section and set some of its attributes
+        # partly, so these are replaced by those from the workers, like in parse().
+        for name in offloaded:
+            if name in data.__dict__:
+                delattr(data, name)
+        for result in results:
+            for name, value in result.items():
+                setattr(data, name, value)
+        self.skipped_attributes = [name for name in self.skipped_attributes if not hasattr(data, name)]
+        return data
+
+    def independent_groups(self, found, attributes=None):
+        """Return groups of attributes from the sections found that can be parsed apart.
+
+        The sections found are given by their positions in section_triggers. If a list
+        of attributes is passed, only groups with any of them are returned.
+        """
+
+        groups = []
+        for i, trigger in enumerate(self.section_triggers):
+            if isinstance(trigger, str) or not i in found:
+                continue
+            names = set(trigger[1])
+            for group in [group for group in groups if group & names]:
+                groups.remove(group)
+                names |= group
+            groups.append(names)
+        return [sorted(group) for group in groups if attributes is None or group & set(attributes)]
+
+    def estimate(self, name):
+        """Return the estimated size of an attribute in bytes, or None if it is not known.
+
+        The sizes of heavy_attributes, and of atomcoords and grads so far, follow from
+        nbasis, nmo, natom, the number of spins in homos and the number of steps, once
+        these have been parsed.
+        """
+
+        natom = self.__dict__.get("natom")
+        nbasis = self.__dict__.get("nbasis")
+        nmo = self.__dict__.get("nmo", nbasis)
+        nspin = len(self.__dict__.get("homos", [None]))
+        if name in ("aooverlaps", "fooverlaps") and nbasis:
+            count = nbasis * nbasis
+        elif name == "mocoeffs" and nbasis and nmo:
+            count = nspin * nmo * nbasis
+        elif name == "nocoeffs" and nbasis and nmo:
+            count = nmo * nbasis
+        elif name == "hessian" and natom:
+            count = (3 * natom) ** 2
+        elif name == "vibdisps" and natom:
+            count = 3 * natom * natom * 3
+        elif name in ("atomcoords", "grads") and natom and name in self.__dict__:
+            count = len(self.__dict__[name]) * natom * 3
+        else:
+            return None
+        return 8 * count
+
+    def budget(self, line):
+        """Decide what to do with the attributes in the sections a line starts, if heavy.
+
+        This is called by parse() with max_memory, and returns False if the line should
+        not be passed to extract(), since its sections are skipped. That is only the case
+        if all heavy attributes in them are skipped, since sections often declare some
+        that are not always printed, and otherwise those skipped are removed afterwards.
+        """
+
+        budget = self._budget
+        actions = budget["actions"]
+        lower = line.lower()
+        names = set()
+        for trigger in self.section_triggers:
+            phrase = trigger if isinstance(trigger, str) else trigger[0]
+            found = phrase[4:].lower() in lower if phrase.startswith("(?i)") else phrase in line
+            found = found and self.starts_section(trigger, line)
+            if found and isinstance(trigger, str):
+                return True
+            if found:
+                names.update(trigger[1])
+
+        used = None
+        for name in [name for name in self.heavy_attributes if name in names]:
+            size = None if name in actions or name in budget["kept"] else self.estimate(name)
+            if size is None:
+                continue
+            if used is None:
+                used = self.memory_used()
+            if used + size <= budget["limit"]:
+                budget["kept"].add(name)
+                used += size
+            elif budget["spill"] is not None:
+                actions[name] = ("spilled", size)
+            elif used + size // 2 <= budget["limit"]:
+                actions[name] = ("float32", size)
+                used += size // 2
+            else:
+                actions[name] = ("skipped", size)
+                self.logger.info("Skipping %s, estimated at %i bytes" % (name, size))
+
+        heavy = [name for name in self.heavy_attributes if name in names]
+        if heavy and all(actions.get(name, ("",))[0] == "skipped" for name in heavy):
+            self._skipped.update(names)
+            return False
+        return True
+
+    def memory_used(self):
+        """Return the estimated size in bytes of the heavy attributes parsed so far."""
+
+        actions = self._budget["actions"]
+        used = 0
+        for name in self.heavy_attributes + ["atomcoords", "grads"]:
+            action = actions.get(name, ("",))[0]
+            if name in self.__dict__ and action != "spilled":
+                size = self.estimate(name) or 0
+                used += size // 2 if action == "float32" else size
+        return used
+
+    def reduce_attributes(self):
+        """Reduce or remove the heavy attributes parsed so far that are not kept as they are.
+
+        Only arrays and lists of arrays are reduced while parsing, since handlers might
+        still add to other values, and those are reduced in finalize().
+        """
+
+        for name, (action, size) in self._budget["actions"].items():
+            value = self.__dict__.get(name)
+            if action == "skipped" and name in self.__dict__:
+                delattr(self, name)
+                self._skipped.add(name)
+            elif isinstance(value, numpy.ndarray) or isinstance(value, list) and value and \
+               all(isinstance(item, numpy.ndarray) for item in value):
+                setattr(self, name, self.reduce(name, value, action))
+
+    def reduce(self, name, value, action):
+        """Return an attribute in single precision, or mapped from a file in the spill directory.
+
+        The file is written with a name starting with the attribute, and mapped
+        copy-on-write, like the arrays of ccData.load.
+        """
+
+        if isinstance(value, list) and name in self.datatype._listsofarrays:
+            dtype = "f" if action == "float32" else "d"
+            return [self.reduce(name, numpy.asarray(item, dtype), action) for item in value]
+        if action == "float32":
+            return numpy.asarray(value, "f")
+        if isinstance(value, numpy.ndarray) and isinstance(value.base, numpy.memmap):
+            return value
+        handle, path = tempfile.mkstemp(prefix=name + ".", suffix=".npy", dir=self._budget["spill"])
+        with os.fdopen(handle, "wb") as handle:
+            numpy.lib.format.write_array(handle, numpy.asarray(value, "d"), allow_pickle=False)
+        return numpy.load(path, mmap_mode="c").view(numpy.ndarray)
+
+    def iterparse(self, attributes=None, window=None):
+        """Parse the logfile, yielding (attribute, value, offset) events as they are parsed.
+
+        After each section, an event is yielded for every new entry of the attributes in
+        step_attributes, such as each SCF energy or geometry, with the entry as the value
+        (a float or an array). Entries that are lists in the parser, such as the energies
+        of each order in mpenergies, can still grow in later sections, so these are only
+        yielded once the next entry is added, or at the end. If a parser starts such an
+        attribute again, for example to replace the input geometry by the standard
+        orientation, an event with None as the value is yielded before the entries of
+        the new one. If entries yielded before are removed at the end, such as the last
+        geometry of a Gaussian optimization, which is printed twice, an event with a
+        slice of the entries that are kept is yielded instead.
+
+        Any other attribute is yielded whole when it is set, with the type it has in the
+        data returned by parse(), and again whenever it is set to another value or changed
+        in a later section, which is noticed for the attribute itself, its last item, and
+        the items of dicts. The offset is the position in the logfile at the end of the
+        section, in bytes, or None if it is not known.
+
+        At the end, events are yielded for what was left, and for attributes that were
+        set or changed after parsing, with values from the data that parse() returns.
+        If a list of attributes is passed, only events for these are yielded, and other
+        sections are skipped where possible like in parse().
+
+        If a window is passed, the entries of step_attributes that parsers keep in a
+        FrameBuffer are dropped once yielded, except for the last window of them, so
+        the memory used does not grow with the number of steps. Parsers only look back
+        at the last entries while parsing, but if after_parsing needs the others, it is
+        not called at the end.
+        """
+
+        # Save the current list of attributes to keep after parsing, like in parse().
+        _nodelete = list(set(self.__dict__.keys()))
+
+        inputfile = self._open()
+        self.fupdate = 0.05
+        self.cupdate = 0.002
+        self._assigned = set()
+        self._skipped = set()
+        self.before_parsing()
+
+        self._window = window
+        names = [name for name in self.datatype._attrlist if attributes is None or name in attributes]
+        yielded = {}
+        try:
+            for line in self.scan(inputfile, attributes):
+                self.extract(inputfile, line)
+                for event in self.events(names, yielded, getattr(inputfile, "pos", None)):
+                    yield event
+            self._discarded = dict((name, value._dropped) for name, value in self.__dict__.items()
+                                   if isinstance(value, utils.FrameBuffer))
+            try:
+                data = self.finalize()
+            except Exception as detail:
+                if window is None:
+                    raise
+                self.logger.info("Not finalizing the data without the entries dropped: %s" % detail)
+                data = self.finalize(after_parsing=False)
+            final = self.events(names, yielded, getattr(inputfile, "pos", None), data)
+        finally:
+            if not self.isstream:
+                inputfile.close()
+            for attr in list(self.__dict__.keys()):
+                if not attr in _nodelete:
+                    self.__delattr__(attr)
+
+        for event in final:
+            yield event
+
+    def events(self, names, yielded, offset, data=None):
+        """Return the events for iterparse() since the last call, as a list.
+
+        The number of entries yielded for step_attributes, and the signatures of other
+        attributes when they were yielded, are kept in the dict yielded. Changes are
+        found in the attributes of this object, but if data is passed, which means that
+        parsing is finished, the values yielded are taken from it.
+        """
+
+        window = self.__dict__.get("_window")
+
+        current = self.__dict__
+        values = current if data is None else data.__dict__
+        assigned = self._assigned
+        self._assigned = set()
+
+        steps = set(self.step_attributes)
+        events = []
+        for name in names:
+            if not name in current or not name in values:
+                continue
+            value = values[name]
+            if name in steps:
+                # The entries discarded from a FrameBuffer are not in the data at the end.
+                shift = 0 if data is None else self.__dict__.get("_discarded", {}).get(name, 0)
+                done = yielded.get(name, 0)
+                if data is None and name in assigned:
+                    if done:
+                        events.append((name, None, offset))
+                    done = 0
+                end = len(value) + shift
+                if end < done:
+                    events.append((name, slice(None, end), offset))
+                start = min(done, end)
+                if data is None and end > start and isinstance(value[end-1], list):
+                    end -= 1
+                for entry in (value[i - shift] for i in range(start, end)):
+                    if isinstance(entry, (list, tuple, numpy.ndarray)):
+                        entry = numpy.array(entry, "d")
+                    events.append((name, entry, offset))
+                yielded[name] = end
+                if data is None and window is not None and isinstance(value, utils.FrameBuffer):
+                    value.discard(yielded[name] - window)
+                continue
+            signature = _signature(current[name])
+            if yielded.get(name, self) != signature:
+                if isinstance(value, (list, dict)):
+                    value = type(value)(value)
+                if data is None:
+                    value = self.convert(name, value)
+                events.append((name, value, offset))
+                yielded[name] = signature
+        return events
+
+    def iterframes(self, window=8):
+        """Parse the logfile, yielding a Frame for every geometry as soon as it is complete.
+
+        The fields of the i-th frame are the i-th entries of atomcoords, scfenergies (in
+        eV), grads and geovalues, as in the data returned by parse(), or None if there
+        are not that many, with the atomnos known at that point. There is a frame for
+        every entry of atomcoords in that data, and it is yielded once all of these
+        attributes have its entry, or else when one of them is window steps ahead,
+        since the others might never be printed, and the rest at the end. Only the last
+        window entries of each attribute are kept meanwhile, see iterparse, so the memory
+        used does not grow with the length of the trajectory, and entries of the other
+        attributes more than window steps ahead of the geometries are dropped.
+
+        If a parser starts the geometries again, for example with the standard orientation
+        after the input orientation, those not yielded yet are replaced by the new ones,
+        and those removed at the end, for example since they were printed twice, are not
+        yielded at all.
+        """
+
+        attributes = ["atomcoords", "scfenergies", "grads", "geovalues"]
+        fields = collections.OrderedDict(zip(Frame._fields, attributes))
+        names = dict((name, field) for field, name in fields.items())
+        pending = dict((field, {}) for field in fields)
+        counts = dict((field, 0) for field in fields)
+        atomnos = None
+        emitted = 0
+
+        def frame():
+            values = [pending[field].pop(emitted, None) for field in fields]
+            return Frame(*values, atomnos=atomnos)
+
+        for name, value, offset in self.iterparse(attributes + ["atomnos"], window=window):
+            if name == "atomnos":
+                atomnos = value
+                continue
+            field = names[name]
+            if value is None:
+                pending[field].clear()
+                counts[field] = emitted
+                continue
+            if isinstance(value, slice):
+                counts[field] = min(counts[field], value.stop)
+                for index in [index for index in pending[field] if index >= value.stop]:
+                    del pending[field][index]
+                continue
+            ahead = field != "coords" and counts[field] >= counts["coords"] + window
+            if emitted <= counts[field] and not ahead:
+                pending[field][counts[field]] = value
+            counts[field] += 1
+            while counts["coords"] > emitted and \
+                  (min(counts.values()) > emitted or max(counts.values()) > emitted + window):
+                yield frame()
+                emitted += 1
+
+        while emitted < counts["coords"]:
+            yield frame()
+            emitted += 1
+
+    def convert(self, name, value):
+        """Return the value of an attribute with the type it has in the data returned.
+
+        The value is returned as it is if it cannot be converted yet, for example if
+        it is a list of arrays with different lengths while the section is parsed.
+        """
+
+        if type(value) is self.datatype._attrtypes.get(name) and not isinstance(value, (list, dict)):
+            return value
+        try:
+            return getattr(self.datatype({name: value}), name)
+        except (TypeError, ValueError):
+            return value
+
+    def eager_attributes(self):
+        """Return the attributes that are not parsed lazily by parse()."""
+
+        return [name for name in self.datatype._attrlist if not name in self.lazy_attributes]
+
+    def stamp(self):
+        """Return the sizes and modification times of the logfiles, if given by name."""
+
+        if self.isstream or hasattr(self, "buffer"):
+            return None
+        filenames = self.filename if isinstance(self.filename, list) else [self.filename]
+        return [(os.stat(name).st_size, os.stat(name).st_mtime) for name in filenames]
+
+    def parse_lazy(self, sections, stamp, name):
+        """Parse one attribute left for later by parse(), from the sections found then.
+
+        Raises an AttributeError if the logfile does not have it, and a ValueError if
+        the logfile changed in the meantime.
+        """
+
+        if self.stamp() != stamp:
+            raise ValueError("The logfile changed after it was parsed lazily")
+        skipped = getattr(self, "skipped_attributes", None)
+        if sections is not None:
+            self._sections = sections
+        data = self.parse(attributes=[name])
+        self.skipped_attributes = skipped
+        if not hasattr(data, name):
+            raise AttributeError("The logfile has no %s" % name)
+        return getattr(data, name)
+
+    def _open(self):
+        """Return a file object for reading the logfile from the start.
+
+        Remember that self.filename can be a list of files, and that the logfile may
+        have been opened already by ccopen, in which case it is used only once.
+        """
+
+        if hasattr(self, "_opened"):
+            inputfile = self._opened
+            del self._opened
+        elif hasattr(self, "buffer"):
+            inputfile = openlogfile(self.buffer)
+        elif not self.isstream:
+            inputfile = openlogfile(self.filename)
+        else:
+            inputfile = self.stream
+        return inputfile
+
+    def sniff(self, limit=None):
+        """Return a dict describing the job, read only from the start of the logfile.
+
+        The dict has the name of the program and its version, the method, basis set,
+        job types (a list with some of sp, opt, freq, td and scan), charge and
+        multiplicity, with None for those not found in the first limit bytes (by
+        default sniff_limit). Lines containing one of the header_triggers are passed
+        to sniff_header(), and reading stops as soon as nothing is missing, so that
+        this is many times cheaper than parse(). A stream is read from its current
+        position, and is not read from the start again by parse() afterwards.
+        """
+
+        record = dict.fromkeys(["program", "version", "method", "basis", "jobtypes", "charge", "mult"])
+        record["program"] = self.logname
+        if not self.header_triggers:
+            return record
+
+        limit = limit or self.sniff_limit
+        inputfile = self._open()
+        phrases = tuple(self.header_triggers)
+        if isinstance(inputfile, FileWrapper):
+            regex = compile_triggers(phrases)
+            lines = iter(lambda: inputfile.skip_to(regex, limit), None)
+        else:
+            regex = compile_triggers(phrases, binary=False)
+            lines = (line for line in inputfile if regex.search(line))
+
+        try:
+            for line in lines:
+                self.sniff_header(inputfile, line, record)
+                if not None in record.values():
+                    break
+        except StopIteration:
+            pass
+
+        if not self.isstream:
+            inputfile.close()
+
+        # Jobs that do nothing else are single points, but this is only known in the end.
+        if record["jobtypes"] is None and record["method"] is not None:
+            record["jobtypes"] = ["sp"]
+
+        return record
+
+    def sniff_header(self, inputfile, line, record):
+        """Update the dict returned by sniff() from a line with a header trigger.
+
+        This method should be overwritten by parsers that declare header_triggers,
+        and can read more lines from inputfile, like extract().
+        """
+        pass
+
+    def status(self, limit=None):
+        """Return a dict with the status of the job, read from the end of the logfile.
+
+        This is meant for monitoring jobs, and has whether the job terminated normally
+        (one of the termination_triggers is found near the end), the last SCF energy
+        (in eV, like scfenergies) and the last geometry (like atomcoords), with None
+        for those not found. The end of the logfile is read backwards in blocks that
+        double in size, starting at 64 kB, until everything is found in the block or
+        it reaches limit bytes (by default status_limit), and each block is passed
+        to status_tail(). The cost is thus set by the size of the block needed rather
+        than the length of the job. Compressed logfiles and streams cannot be read
+        backwards, and are instead read to the end once, keeping the last limit bytes.
+        """
+
+        limit = limit or self.status_limit
+        terminated = None
+        if self.termination_triggers:
+            terminated = compile_triggers(tuple(self.termination_triggers))
+
+        # Whatever cannot be read backwards is read once, keeping the last limit bytes.
+        inputfile = self._open()
+        if isinstance(inputfile, FileWrapper) and inputfile.tailed():
+            read = inputfile.tail
+        elif isinstance(inputfile, FileWrapper):
+            kept = inputfile.tail(limit)
+            read = lambda size: kept[-size:]
+        else:
+            lines = collections.deque()
+            length = 0
+            for line in inputfile:
+                lines.append(line.encode("utf-8"))
+                length += len(lines[-1])
+                while length - len(lines[0]) >= limit:
+                    length -= len(lines.popleft())
+            kept = b"".join(lines)[-limit:]
+            read = lambda size: kept[-size:]
+
+        size = min(2**16, limit)
+        while True:
+            tail = read(size)
+            whole = len(tail) < size or len(tail) == getattr(inputfile, "size", None)
+            if not whole:
+                tail = tail[tail.find(b"\n") + 1:]
+            record = dict.fromkeys(["terminated", "scfenergy", "atomcoords"])
+            record["terminated"] = bool(terminated and terminated.search(tail))
+            self.status_tail(tail, record)
+            if whole or size >= limit or all(value is not None for value in record.values()):
+                break
+            size = min(2 * size, limit)
+
+        if not self.isstream:
+            inputfile.close()
+
+        return record
+
+    def status_tail(self, tail, record):
+        """Fill in the missing values of the dict returned by status() from raw bytes.
+
+        The bytes are at the end of the logfile and start at a line, and are parsed
+        with extract() for the sections that have scfenergies or atomcoords, starting
+        from a fresh parser state. Since the sections before the tail are missing,
+        any error in extract() is ignored, and the search goes on with the next
+        section. The attributes of this object are the same afterwards. Subclasses
+        can override this to use summaries of the job printed at the end instead.
+        """
+
+        own = dict(self.__dict__)
+        self.fupdate = 0.05
+        self.cupdate = 0.002
+        self.before_parsing()
+        self._skipped = set()
+
+        inputfile = FileWrapper(tail)
+        lines = self.scan(inputfile, ["scfenergies", "atomcoords"])
+        while True:
+            try:
+                line = next(lines)
+            except StopIteration:
+                break
+            try:
+                self.extract(inputfile, line)
+            except StopIteration:
+                break
+            except Exception as detail:
+                self.logger.debug("Skipping a section at the start of the tail: %s" % detail)
+
+        energies = getattr(self, "scfenergies", [])
+        coords = getattr(self, "atomcoords", getattr(self, "inputcoords", []))
+        if record["scfenergy"] is None and len(energies) > 0:
+            record["scfenergy"] = float(energies[-1])
+        if record["atomcoords"] is None and len(coords) > 0:
+            record["atomcoords"] = numpy.array(coords[-1], "d")
+
+        self.__dict__.clear()
+        self.__dict__.update(own)
+
+    def finalize(self, after_parsing=True):
+        """Return a data object with the attributes parsed so far.
+
+        This also sets some attributes that were not parsed, when they can be inferred
+        from others, and the attributes of this object can change in the process.
+        """
+
         # Maybe the sub-class has something to do after parsing.
-        self.after_parsing()
+        if after_parsing:
+            self.after_parsing()
 
         # If atomcoords were not parsed, but some input coordinates were ("inputcoords").
         # This is originally from the Gaussian parser, a regression fix.
@@ -266,6 +1442,15 @@ class Logfile(object):
         if not hasattr(self, "coreelectrons") and hasattr(self, "natom"):
             self.coreelectrons = numpy.zeros(self.natom, "i")
 
+        # Attributes reduced for parse(max_memory=...) are set on the data afterwards,
+        # since arrayify() would convert them back to double precision in memory.
+        reduced = {}
+        for name, (action, size) in self.__dict__.get("_budget", {}).get("actions", {}).items():
+            if name in self.__dict__:
+                value = self.__dict__.pop(name)
+                if action != "skipped":
+                    reduced[name] = self.reduce(name, value, action)
+
         # Create the data object we want to return. This is normally ccData, but can be changed
         # by passing the datatype argument to the constructor. All supported cclib attributes
         # are copied to this object, but beware that in order to be moved an attribute must be
@@ -277,17 +1462,410 @@ class Logfile(object):
         # Now make sure that the cclib attributes in the data object are all the correct type,
         # including arrays and lists of arrays.
         data.arrayify()
+        for name, value in reduced.items():
+            setattr(data, name, value)
 
-        # Delete all temporary attributes (including cclib attributes).
-        # All attributes should have been moved to a data object, which will be returned.
-        for attr in list(self.__dict__.keys()):
-            if not attr in _nodelete:
-                self.__delattr__(attr)
+        return data
 
-        # Update self.progress as done.
-        if hasattr(self, "progress"):
-            self.progress.update(inputfile.size, "Done")
+    def _close_opened(self):
+        """Close the logfile opened by ccopen, if it was not parsed yet."""
+
+        opened = self.__dict__.pop("_opened", None)
+        if opened is not None:
+            opened.close()
+
+    def __del__(self):
+        self._close_opened()
+
+    def refresh(self):
+        """Parse what was appended to the logfile since the last call, and return all data.
+
+        This is meant for following a logfile that is still being written, without
+        parsing it again from the start each time. The state of the parser is kept
+        between calls, along with the offset of the end of the last complete section,
+        and each call parses only the complete lines appended after that. A section
+        that is still incomplete (one that runs into the end of the logfile) is left
+        for a later call, and so are the lines after it. If the logfile is shorter
+        than that offset or is another file, for example after it was rotated, it is
+        parsed again from the start.
+        """
 
+        if self.isstream or hasattr(self, "buffer") or not isinstance(self.filename, str):
+            raise ValueError("Only a single logfile can be followed")
+
+        # The logfile is read again here for every call, so the one opened by ccopen is not
+        # needed, and it could not be kept with the state anyway.
+        self._close_opened()
+
+        stat = os.stat(self.filename)
+        identity = (stat.st_dev, stat.st_ino)
+        if hasattr(self, "_following"):
+            offset, state, followed = self._following
+            if stat.st_size < offset or identity != followed:
+                self.logger.info("The logfile was truncated or replaced, so parsing it again")
+                del self._following
+
+        # On the first call, start from a clean parser state, kept as a dict of attributes.
+        if not hasattr(self, "_following"):
+            own = dict(self.__dict__)
+            self.fupdate = 0.05
+            self.cupdate = 0.002
+            self.before_parsing()
+            state = dict((k, v) for k, v in self.__dict__.items() if k != "logger")
+            self.__dict__.clear()
+            self.__dict__.update(own)
+            self._following = (0, state, identity)
+        offset, state, identity = self._following
+
+        with io.open(self.filename, "rb") as handle:
+            handle.seek(offset)
+            appended = handle.read()
+        appended = appended[:appended.rfind(b"\n") + 1]
+
+        # The data returned is still the same as parse() would return for the logfile so far,
+        # unless the last section ran into the end of the logfile with an error, in which
+        # case it is left out.
+        end, current = self.follow(appended, state)
+        self._following = (offset + end, state, identity)
+
+        # Since the data object is created at the end of parsing, it needs a copy of the state.
+        # Subclasses do not expect after_parsing() to be called for a logfile that is not
+        # finished yet, so skip it if it fails for the data that was parsed so far.
+        clone = copy.copy(self)
+        clone.__dict__.update(self.copy_state(current))
+        try:
+            return clone.finalize()
+        except Exception as detail:
+            self.logger.info("Not finalizing the data parsed so far: %s" % detail)
+        clone = copy.copy(self)
+        clone.__dict__.update(self.copy_state(current))
+        return clone.finalize(after_parsing=False)
+
+    def follow(self, appended, state):
+        """Parse appended lines for refresh(), changing the given state in place.
+
+        Returns the number of bytes taken up by the sections that are surely complete,
+        and the state to build the data from. A section might be incomplete when
+        extract() reads its last line, and it is when extract() tries to read beyond
+        that, which raises StopIteration. What such a section changed is rolled back in
+        the state, see mark_state(), but the state returned has it unless parsing it
+        failed. The attributes of this object are the same afterwards.
+        """
+
+        own = dict(self.__dict__)
+        self.__dict__.update(state)
+
+        inputfile = FileWrapper(appended)
+        end = len(appended)
+        done = 0
+        failed = False
+        mark = {}
+        try:
+            for line in self.scan(inputfile):
+                mark = self.mark_state()
+                self.extract(inputfile, line)
+                if inputfile.pos == len(appended):
+                    end = done
+                    break
+                done = inputfile.pos
+        except StopIteration:
+            end = done
+            failed = True
+
+        current = None
+        if end < len(appended):
+            if not failed:
+                current = self.copy_state(self.__dict__)
+            self.rollback_state(mark)
+
+        state.clear()
+        state.update((k, v) for k, v in self.__dict__.items() if not k in ("logger", "_following"))
+        self.__dict__.clear()
+        self.__dict__.update(own)
+        if current is None:
+            return end, state
+        return end, dict((k, v) for k, v in current.items() if not k in ("logger", "_following"))
+
+    def mark_state(self):
+        """Return what rollback_state() needs to undo the section that is parsed next.
+
+        Handlers set attributes, append to lists and frame buffers, also to the last list
+        in a list, and add keys to dicts, so this is what is undone, while values that were changed in
+        place are kept. This is cheap, since nothing is copied.
+        """
+
+        mark = {}
+        for name, value in self.__dict__.items():
+            size = None
+            if isinstance(value, list):
+                size = (len(value), len(value[-1]) if value and isinstance(value[-1], list) else None)
+            elif isinstance(value, dict):
+                size = set(value)
+            elif isinstance(value, utils.FrameBuffer):
+                size = len(value)
+            mark[name] = (value, size)
+        return mark
+
+    def rollback_state(self, mark):
+        """Undo what was parsed after mark_state() returned the mark."""
+
+        for name in [name for name in self.__dict__ if not name in mark]:
+            del self.__dict__[name]
+        for name, (value, size) in mark.items():
+            self.__dict__[name] = value
+            if isinstance(value, list):
+                del value[size[0]:]
+                if size[1] is not None:
+                    del value[-1][size[1]:]
+            elif isinstance(value, dict):
+                for key in [key for key in value if not key in size]:
+                    del value[key]
+            elif isinstance(value, utils.FrameBuffer):
+                value.truncate(size)
+
+    def copy_state(self, state):
+        """Return a copy of a parser state with its own lists and dicts, but the same arrays."""
+        return dict((k, _copy_containers(v)) for k, v in state.items())
+
+    def scan(self, inputfile, attributes=None, extra=()):
+        """Return an iterator over the lines of inputfile that extract() should see.
+
+        If the parser declares section_triggers, only lines containing one of them
+        are returned, and for a FileWrapper the lines in between are skipped by a
+        regular expression search over the raw bytes without being decoded.
+        Otherwise, this is simply every line.
+
+        If a list of attributes is passed, lines that start sections with none
+        of these attributes are not returned, but the attributes in such sections
+        are added to self._skipped.
+
+        Lines containing one of the extra phrases are returned as well, in the same
+        search, which is how parse_jobs() finds the lines that start jobs.
+
+        If the offsets of the lines with triggers were set in self._sections (by
+        a SectionIndex), they are used once instead of searching, see replay().
+        """
+
+        if hasattr(self, "_sections"):
+            sections = self._sections
+            del self._sections
+            return self.replay(inputfile, sections, attributes)
+
+        if not self.section_triggers:
+            return inputfile
+
+        phrases = list(extra)
+        skipped = []
+        for trigger in self.section_triggers:
+            if isinstance(trigger, str):
+                phrases.append(trigger)
+            else:
+                phrases.append(trigger[0])
+                if attributes is not None and not set(trigger[1]) & set(attributes):
+                    skipped.append(trigger)
+
+        phrases = tuple(phrases)
+        if isinstance(inputfile, FileWrapper):
+            regex = compile_triggers(phrases)
+            lines = iter(lambda: inputfile.skip_to(regex), None)
+        else:
+            regex = compile_triggers(phrases, binary=False)
+            lines = (line for line in inputfile if regex.search(line))
+
+        if not skipped:
+            return lines
+        return self.skip_sections(lines, skipped, extra)
+
+    def starts_section(self, trigger, line):
+        """Return whether a line containing the phrase of a trigger starts its section."""
+        return isinstance(trigger, str) or len(trigger) < 3 or re.match(trigger[2], line) is not None
+
+    def section_phrases(self):
+        """Return the phrases in section_triggers, without the attributes."""
+        return [t if isinstance(t, str) else t[0] for t in self.section_triggers]
+
+    def find_sections(self, inputfile):
+        """Return the sections in a memory-mapped logfile for replay(), in one search."""
+
+        phrases = self.section_phrases()
+        regex = compile_triggers(tuple(phrases))
+        tests = [(p[4:].lower(), True) if p.startswith("(?i)") else (p, False) for p in phrases]
+
+        offsets = []
+        found = []
+        buffer = inputfile.buffer
+        match = regex.search(buffer)
+        while match:
+            start = buffer.rfind(b"\n", 0, match.start()) + 1
+            end = buffer.find(b"\n", match.end()) + 1 or len(buffer)
+            line = bytes(buffer[start:end]).decode("utf-8", "ignore")
+            lower = line.lower()
+            for i, (phrase, ignorecase) in enumerate(tests):
+                if phrase in (lower if ignorecase else line) and \
+                   self.starts_section(self.section_triggers[i], line):
+                    offsets.append(start)
+                    found.append(i)
+            match = regex.search(buffer, end)
+
+        return numpy.array(offsets, "i8"), numpy.array(found, "i2")
+
+    def replay(self, inputfile, sections, attributes=None):
+        """Return the lines that scan() would return, going straight to their offsets.
+
+        The sections are given by two arrays of the same length, sorted by the first,
+        with the byte offsets of the lines containing trigger phrases and the position
+        of the phrase in section_triggers, so a line with several phrases is in them
+        several times. A line is returned if it is at or after the position reached
+        by extract(), just as a trigger search would find it, so that the lines that
+        extract() reads itself are not returned again. Blocks are read in smaller
+        sizes here, since sections are often far apart.
+        """
+
+        offsets, phrases = sections
+        kept = []
+        skipped = {}
+        for i, trigger in enumerate(self.section_triggers):
+            if isinstance(trigger, str) or attributes is None or set(trigger[1]) & set(attributes):
+                kept.append(i)
+            else:
+                skipped[i] = trigger[1]
+        keep = numpy.in1d(phrases, kept)
+
+        # A line is returned if any of its phrases are kept, so those come first.
+        order = numpy.lexsort((~keep, offsets))
+        inputfile.blocksize = min(inputfile.blocksize, 2**16)
+        for offset, phrase, returned in zip(offsets[order].tolist(), phrases[order].tolist(), keep[order].tolist()):
+            if offset < inputfile.pos:
+                continue
+            if returned:
+                inputfile.seek(offset)
+                yield next(inputfile)
+            else:
+                self._skipped.update(skipped[phrase])
+
+    def skip_sections(self, lines, skipped, extra=()):
+        """Filter out lines that only start the sections in skipped.
+
+        The sections themselves are not skipped as a whole, but since they are not
+        parsed their lines are simply passed over by the trigger search.
+        """
+
+        kept = tuple(extra) + tuple(phrase for phrase in self.section_triggers if isinstance(phrase, str))
+        kept += tuple(trigger[0] for trigger in self.section_triggers
+                      if not isinstance(trigger, str) and not trigger in skipped)
+        regex = compile_triggers(kept, binary=False) if kept else None
+        for line in lines:
+            if regex and regex.search(line):
+                yield line
+                continue
+            for trigger in skipped:
+                if compile_triggers((trigger[0],), binary=False).search(line) and \
+                   self.starts_section(trigger, line):
+                    self._skipped.update(trigger[1])
+
+    def parse_jobs(self, attributes=None, workers=None):
+        """Parse a logfile with several jobs, returning an iterator with the data of each.
+
+        A job starts at each line containing one of the job_triggers, and these lines
+        are found in the same search as the sections, so the logfile is still read only
+        once. The parser starts each job from a clean state, as if it were a logfile of
+        its own, and parts of the logfile in which no attributes were parsed, such as
+        the output before the first job, are not yielded. A logfile without any of the
+        job_triggers is a single job. If a list of attributes is passed, sections with
+        only other attributes are skipped like in parse().
+
+        With more than one worker, the lines starting the jobs in a memory-mapped
+        logfile given by name are found in one search beforehand, and the jobs are
+        then parsed in a pool of processes, which map the logfile themselves, but
+        are still yielded in order. Otherwise, the jobs are parsed one after another.
+        """
+
+        inputfile = self._open()
+        if workers is not None and workers > 1 and self.job_triggers and \
+           not self.isstream and isinstance(self.filename, str) and \
+           isinstance(inputfile, FileWrapper) and inputfile.buffer is not None:
+            offsets = self.find_jobs(inputfile)
+            inputfile.close()
+            return self.pool_jobs(offsets, attributes, workers)
+        return self.split_jobs(inputfile, attributes)
+
+    def find_jobs(self, inputfile):
+        """Return the offsets of the jobs in a memory-mapped logfile, in one search."""
+
+        regex = compile_triggers(tuple(self.job_triggers))
+        buffer = inputfile.buffer
+        offsets = [0]
+        match = regex.search(buffer)
+        while match:
+            start = buffer.rfind(b"\n", 0, match.start()) + 1
+            if start > offsets[-1]:
+                offsets.append(start)
+            end = buffer.find(b"\n", match.end()) + 1 or len(buffer)
+            match = regex.search(buffer, end)
+        offsets.append(len(buffer))
+        return offsets
+
+    def pool_jobs(self, offsets, attributes, workers):
+        """Yield the data of the jobs between offsets, parsed in a pool of processes."""
+
+        tasks = [(type(self), self.loglevel, self.datatype, self.filename, start, end, attributes)
+                 for start, end in zip(offsets[:-1], offsets[1:])]
+        pool = multiprocessing.Pool(min(workers, len(tasks)))
+        try:
+            for jobs in pool.imap(_parse_job, tasks):
+                for data in jobs:
+                    yield data
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def split_jobs(self, inputfile, attributes=None):
+        """Yield the data of each job in inputfile, parsed one after another."""
+
+        # The state of this object is reset to this at the start of every job.
+        nodelete = set(self.__dict__.keys())
+        if hasattr(self, "_sections"):
+            del self._sections
+
+        regex = compile_triggers(tuple(self.job_triggers), binary=False) if self.job_triggers else None
+        try:
+            fresh = self.start_job()
+            for line in self.scan(inputfile, attributes, self.job_triggers):
+                if regex and regex.search(line):
+                    data = self.finish_job(nodelete, fresh)
+                    if data is not None:
+                        yield data
+                    fresh = self.start_job()
+                self.extract(inputfile, line)
+            data = self.finish_job(nodelete, fresh)
+            if data is not None:
+                yield data
+        finally:
+            if not self.isstream:
+                inputfile.close()
+
+    def start_job(self):
+        """Prepare for parsing the next job, returning the names of the attributes set."""
+
+        self.fupdate = 0.05
+        self.cupdate = 0.002
+        self._skipped = set()
+        self.before_parsing()
+        return set(self.__dict__.keys())
+
+    def finish_job(self, nodelete, fresh):
+        """Return the data of the job parsed so far, or None if nothing was parsed.
+
+        Attributes already set by start_job() do not count as parsed, and afterwards
+        all attributes not in nodelete are deleted, like at the end of parse().
+        """
+
+        parsed = [name for name in self.datatype._attrlist if name in self.__dict__ and not name in fresh]
+        data = self.finalize() if parsed else None
+        for attr in list(self.__dict__.keys()):
+            if not attr in nodelete:
+                self.__delattr__(attr)
         return data
 
     def before_parsing(self):
@@ -302,7 +1880,7 @@ class Logfile(object):
         """Update progress."""
 
         if hasattr(self, "progress") and random.random() < xupdate:
-            newstep = inputfile.pos
+            newstep = inputfile.progress_pos()
             if newstep != self.progress.step:
                 self.progress.update(newstep, msg)
                 self.progress.step = newstep
@@ -338,6 +1916,19 @@ class Logfile(object):
 
         return float(number.replace("D","E"))
 
+    def floats(self, numbers):
+        """Convert many strings to an array of floats at once.
+
+        This reads the same numbers as the float method, and also Fortran exponents
+        with the E missing and blank fields (as NaN), but without going through them
+        one by one, so it should be used for blocks of numbers, see utils.fortranfloats.
+
+        >>> t = Logfile("dummyfile")
+        >>> t.floats(["123.2323D+02", "1.5-102", "*****"]).tolist()
+        [12323.23, 1.5e-102, nan]
+        """
+        return utils.fortranfloats(numbers)
+
     def set_attribute(self, name, value, check=True):
         """Set an attribute and perform a check when it already exists.
 
@@ -55,8 +55,44 @@ def create_atomic_orbital_names(orbitals):
 class Molpro(logfileparser.Logfile):
     """Molpro file parser"""
 
+    # Phrases that start each section parsed in extract(), in the same order.
+    section_triggers = [
+        "ATOMIC COORDINATES",
+        ("BASIS DATA", ["aonames", "atombasis", "gbasis"]),
+        "NUMBER OF CONTRACTIONS",
+        "-SCF",
+        "NUMBER OF ELECTRONS",
+        "CONVERGENCE THRESHOLDS:",
+        "ITERATION",
+        "!RHF",
+        "!UHF",
+        "!RKS",
+        "!MP2",
+        "MP2:",
+        "MP3(D):",
+        "PROGRAM * CCSD",
+        "Final occupancy:",
+        "Final alpha occupancy:",
+        "Dipole moment",
+        ("ELECTRON ORBITALS", ["aonames", "atombasis", "mocoeffs", "moenergies"]),
+        ("MATRIX S", ["aooverlaps"]),
+        "THRESHOLDS",
+        "END OF GEOMETRY OPTIMIZATION.",
+        "Quadratic Steepest Descent - Minimum Search",
+        ("Normal Modes", ["vibdisps", "vibfreqs", "vibirs", "vibsyms"]),
+        "Force Constants",
+        "Atomic Masses",
+        "1PROGRAM * POP (Mulliken population analysis)",
+    ]
+
+    # Attributes that are parsed once and never change afterwards.
+    final_attributes = ["charge", "mult", "natom", "nbasis"]
+
     atomic_orbital_names = create_atomic_orbital_names(['D', 'F', 'G'])
 
+    # Phrases printed at the end of jobs that terminate normally, for status().
+    termination_triggers = ["Variable memory released"]
+
     def __init__(self, *args, **kwargs):
         # Call the __init__ method of the superclass
         super(Molpro, self).__init__(logname="Molpro", *args, **kwargs)
@@ -100,7 +136,7 @@ class Molpro(logfileparser.Logfile):
         if line[1:19] == "ATOMIC COORDINATES":
             
             if not hasattr(self,"atomcoords"):
-                self.atomcoords = []
+                self.atomcoords = utils.FrameBuffer()
 
             atomcoords = []
             atomnos = []
@@ -298,7 +334,7 @@ class Molpro(logfileparser.Logfile):
             line[16:22].lower() == "energy"):
             
             if not hasattr(self, "scfenergies"):
-                self.scfenergies = []
+                self.scfenergies = utils.FrameBuffer()
             scfenergy = float(line.split()[4])
             self.scfenergies.append(utils.convertor(scfenergy, "hartree", "eV"))
             
@@ -410,6 +446,7 @@ class Molpro(logfileparser.Logfile):
             atombasis = [[] for i in range(self.natom)]
             moenergies = []
             mocoeffs = []
+            lines = []
             line = next(inputfile)
 
             # Besides a double blank line, stop when the next orbitals are encountered for unrestricted jobs
@@ -447,30 +484,17 @@ class Molpro(logfileparser.Logfile):
                 if "HOMO" in line or "LUMO" in line:
                     break
 
-                # Now parse the MO coefficients, padding the list with an appropriate amount of zeros.
-                coeffs = [0.0 for i in range(offset)]
+                # Now collect the lines with the MO coefficients, which are converted all at once
+                # below, and remember the offset and lines of this MO to put it together later.
+                first = len(lines)
                 while line.strip() != "":
                     if line[:31].rstrip():
                         moenergy = float(line.split()[2])
                         moenergy = utils.convertor(moenergy, "hartree", "eV")
                         moenergies.append(moenergy)
-
-                    # Coefficients are in 10.6f format and splitting does not work since there are not
-                    # always spaces between them. If the numbers are very large, there will be stars.
-                    str_coeffs = line[31:]
-                    ncoeffs = len(str_coeffs) // 10
-                    coeff = []
-                    for ic in range(ncoeffs):
-                        p = str_coeffs[ic*10:(ic+1)*10]
-                        try:
-                            c = float(p)
-                        except ValueError as detail:
-                            self.logger.warn("setting mocoeff element to zero: %s" % detail)
-                            c = 0.0
-                        coeff.append(c)
-                    coeffs.extend(coeff)
+                    lines.append(line)
                     line = next(inputfile)
-                mocoeffs.append(coeffs)
+                mocoeffs.append((offset, first, len(lines)))
 
                 # The loop should keep going until there is a double blank line, and there is
                 # a single line between each coefficient block.
@@ -478,6 +502,21 @@ class Molpro(logfileparser.Logfile):
                 if not line.strip():
                     line = next(inputfile)
 
+            # Coefficients are in 10.6f format and splitting does not work since there are not
+            # always spaces between them. If the numbers are very large, there will be stars.
+            # The MO coefficients are padded at the start with an appropriate amount of zeros.
+            fields = utils.readfields(lines, width=10, start=31)
+            counts = numpy.array([len(line[31:].rstrip("\r\n")) // 10 for line in lines], "i")
+            coeffs = fields[numpy.arange(fields.shape[1]) < counts[:, numpy.newaxis]]
+            if numpy.isnan(coeffs).any():
+                self.logger.warn("setting %i mocoeff elements with stars to zero" % numpy.isnan(coeffs).sum())
+                coeffs[numpy.isnan(coeffs)] = 0.0
+            ends = numpy.cumsum(counts)
+            for im, (padding, first, last) in enumerate(mocoeffs):
+                begin = ends[first - 1] if first else 0
+                end = ends[last - 1] if last else 0
+                mocoeffs[im] = [0.0] * padding + coeffs[begin:end].tolist()
+
             # If symmetry was used (offset was needed) then we will need to pad all MO vectors
             # up to nbasis for all irreps before the last one.
             if offset > 0:
@@ -497,9 +536,11 @@ class Molpro(logfileparser.Logfile):
             self.mocoeffs.append(mocoeffs)
 
             # Check if last line begins the next ELECTRON ORBITALS section, because we already used
-            # this line and need to know when this method is called next time.
+            # this line and need to know about it when parsing that section. Since extract() is only
+            # called for lines matching the section triggers, parse the next section right away.
             if line[1:18] == "ELECTRON ORBITALS":
                 self.electronorbitals = line
+                self.extract(inputfile, next(inputfile))
             else:
                 self.electronorbitals = ""
 
@@ -515,18 +556,21 @@ class Molpro(logfileparser.Logfile):
 
             self.skip_lines(inputfile, ['b', 'symblocklabel'])
 
+            lines = []
             line = next(inputfile)
             while line.strip() != "":
-                elements = [float(s) for s in line.split()]
-                if len(self.aooverlaps[-1]) + len(elements) <= self.nbasis:
-                    self.aooverlaps[-1] += elements
-                else:
-                    n = len(self.aooverlaps[-1]) + len(elements) - self.nbasis
-                    self.aooverlaps[-1] += elements[:-n]
-                    self.aooverlaps.append([])
-                    self.aooverlaps[-1] += elements[-n:]
+                lines.append(line)
                 line = next(inputfile)
 
+            elements = utils.readfields([" ".join(lines)]).ravel().tolist()
+            i = 0
+            while i < len(elements):
+                if len(self.aooverlaps[-1]) == self.nbasis:
+                    self.aooverlaps.append([])
+                n = self.nbasis - len(self.aooverlaps[-1])
+                self.aooverlaps[-1] += elements[i:i+n]
+                i += n
+
         # Thresholds are printed only if the defaults are changed with GTHRESH.
         # In that case, we can fill geotargets with non-default values.
         # The block should look like this as of Molpro 2006.1:
@@ -597,7 +641,7 @@ class Molpro(logfileparser.Logfile):
             index_THRSTEP = headers.index('STEPMAX')
 
             line = next(inputfile)
-            self.geovalues = []            
+            self.geovalues = utils.FrameBuffer()            
             while line.strip():
 
                 line = line.split()
@@ -25,6 +25,81 @@ from . import utils
 class NWChem(logfileparser.Logfile):
     """An NWChem log file."""
 
+    # Phrases that start each section parsed in extract(), in the same order.
+    section_triggers = [
+        "Geometry \"geometry\" -> \"",
+        "XYZ format geometry",
+        "NWChem Geometry Optimization",
+        ("Basis \"ao basis\" -> \"ao basis\" (cartesian)", ["gbasis"]),
+        "Summary of",
+        "NWChem SCF Module",
+        "General Information",
+        "global array: Temp Over[",
+        "is already converged",
+        "Quadratically convergent ROHF",
+        "convergence",
+        "Step",
+        "Optimization converged",
+        "Failed to converge",
+        "Total SCF energy",
+        "Total DFT energy",
+        "Symmetry analysis of molecular orbitals - final",
+        "Molecular Orbital Analysis",
+        ("Final MO vectors", ["mocoeffs", "nbasis", "nmo"]),
+        "Mulliken analysis of the total density",
+        "Mulliken population analysis",
+        "Dipole Moment",
+        "Quadrupole Moment",
+        "Octupole Moment",
+        "Total MP2 energy",
+        "CCSD(T) total energy / hartree",
+    ]
+
+    # Attributes that are parsed once and never change afterwards.
+    final_attributes = ["charge", "mult", "natom", "nbasis"]
+
+    # Phrases that start the parts of the header handled by sniff_header().
+    header_triggers = [
+        "nwchem branch",
+        "echo of input deck",
+        "Summary of \"ao basis\"",
+        "NWChem Geometry Optimization",
+        "NWChem Nuclear Hessian and Frequency Analysis",
+        "NWChem TDDFT Module",
+        "NWChem SCF Module",
+        "NWChem MP2",
+        "XC Information",
+        "charge          =",
+        "wavefunction",
+        "Charge           :",
+        "Spin multiplicity:",
+        "Calculation type :",
+    ]
+
+    # The banners of modules that determine the type of job, the operations in task
+    # directives, and the job types in sniff().
+    module_jobtypes = {
+        "NWChem Geometry Optimization": "opt",
+        "NWChem Nuclear Hessian and Frequency Analysis": "freq",
+        "NWChem TDDFT Module": "td",
+    }
+    task_jobtypes = {"energy": "sp", "optimize": "opt", "saddle": "opt", "frequencies": "freq", "freq": "freq"}
+
+    # The types of calculation in the TCE module, and their methods.
+    tce_methods = {
+        "Coupled-cluster doubles": "ccd",
+        "Coupled-cluster singles & doubles": "ccsd",
+        "Coupled-cluster singles & doubles w/ perturbation": "ccsd",
+        "Coupled-cluster singles, doubles, & triples": "ccsdt",
+    }
+
+    # Phrases printed at the end of jobs that terminate normally, for status().
+    termination_triggers = ["Total times  cpu:"]
+
+    # The input module is entered again after each task in the input deck, and the
+    # output for the next task follows it.
+    job_triggers = ["NWChem Input Module"]
+
     def __init__(self, *args, **kwargs):
 
         # Call the __init__ method of the superclass
@@ -55,6 +130,97 @@ class NWChem(logfileparser.Logfile):
 
     name2element = lambda self, lbl: "".join(itertools.takewhile(str.isalpha, str(lbl)))
 
+    def sniff_header(self, inputfile, line, record):
+        """Update the job description from the input, if it is echoed, or the modules run.
+
+        The modules are run in the order of the task directives, so the method of a later
+        module, such as MP2, replaces the one of the module before it, such as SCF.
+        """
+
+        #    nwchem branch   = 6.5
+        if "nwchem branch" in line and record["version"] is None:
+            record["version"] = line.split()[-1]
+
+        # The input is only echoed with the echo directive, and then any task directive
+        # determines the method and job type, unless the method is DFT, which is set up in
+        # the dft block like the multiplicity. The charge has a directive of its own.
+        if "echo of input deck" in line:
+            jobtypes = []
+            line = next(inputfile)
+            while not line.strip()[:10] == "=" * 10:
+                words = line.lower().split()
+                if words[:1] == ["task"]:
+                    if words[1] != "dft":
+                        record["method"] = "hf" if words[1] == "scf" else words[1]
+                    if len(words) > 2:
+                        jobtypes.append(self.task_jobtypes.get(words[2], words[2]))
+                if words[:1] == ["xc"] and len(words) > 1:
+                    record["method"] = words[1]
+                if words[:1] == ["charge"]:
+                    record["charge"] = int(words[1])
+                if words[:1] == ["mult"]:
+                    record["mult"] = int(words[1])
+                if words[:1] == ["*"] and "library" in words:
+                    record["basis"] = words[-1]
+                line = next(inputfile)
+            record["jobtypes"] = sorted(set(jobtypes or ["sp"]))
+
+        #  Summary of "ao basis" -> "" (cartesian)
+        #  ------------------------------------------------------------------------------
+        #        Tag                 Description            Shells   Functions and Types
+        #  ---------------- ------------------------------  ------  ---------------------
+        #  *                           sto-3g                   on all atoms
+        if "Summary of \"ao basis\"" in line and record["basis"] is None:
+            self.skip_lines(inputfile, ['d', 'Tag', 'd'])
+            words = next(inputfile).split()
+            if len(words) > 1:
+                record["basis"] = words[1].lower()
+
+        for banner, jobtype in self.module_jobtypes.items():
+            if banner in line:
+                record["jobtypes"] = sorted(set((record["jobtypes"] or []) + [jobtype]))
+
+        if "NWChem SCF Module" in line:
+            record["method"] = "hf"
+        if "NWChem MP2" in line:
+            record["method"] = "mp2"
+
+        # The DFT module prints the functional in the XC information:
+        #
+        #               XC Information
+        #               --------------
+        #                          B3LYP Method XC Potential
+        if line.strip() == "XC Information":
+            self.skip_line(inputfile, 'd')
+            words = next(inputfile).split()
+            if "Method" in words:
+                record["method"] = words[0].lower()
+
+        #   charge          =   0.00
+        #   wavefunction    = RHF
+        if line.split()[:2] == ["charge", "="] and record["charge"] is None:
+            record["charge"] = int(float(line.split()[-1]))
+        if line.split()[:1] == ["wavefunction"] and record["mult"] is None:
+            if line.split()[-1] == "RHF":
+                record["mult"] = 1
+
+        #           Charge           :     0
+        #           Spin multiplicity:     1
+        if line.strip().startswith("Charge           :") and record["charge"] is None:
+            record["charge"] = int(line.split()[-1])
+        if line.strip().startswith("Spin multiplicity:") and record["mult"] is None:
+            record["mult"] = int(line.split()[-1])
+
+        #           Calculation type : Coupled-cluster singles & doubles w/ perturbation
+        #    Perturbative correction : (T)
+        if line.strip().startswith("Calculation type :"):
+            calculation = line.split(":")[1].strip()
+            method = self.tce_methods.get(calculation, calculation.lower())
+            line = next(inputfile)
+            if "Perturbative correction" in line:
+                method += line.split(":")[1].strip().lower()
+            record["method"] = method
+
     def extract(self, inputfile, line):
         """Extract information from the file object inputfile."""
 
@@ -69,7 +235,7 @@ class NWChem(logfileparser.Logfile):
             self.skip_lines(inputfile, ['dashes', 'blank', 'units', 'blank', 'header', 'dashes'])
 
             if not hasattr(self, 'atomcoords'):
-                self.atomcoords = []
+                self.atomcoords = utils.FrameBuffer()
 
             line = next(inputfile)
             coords = []
@@ -314,24 +480,24 @@ class NWChem(logfileparser.Logfile):
             self.set_attribute('nbasis', int(line.split('[')[1].split(',')[0].split(':')[1]))
             self.set_attribute('nmo', int(line.split(']')[0].split(',')[1].split(':')[1]))
 
-            aooverlaps = []
-            while len(aooverlaps) < self.nbasis:
+            lines = []
+            ncols = 0
+            while ncols < self.nbasis:
 
                 self.skip_line(inputfile, 'blank')
 
-                indices = [int(i) for i in inputfile.next().split()]
-                assert indices[0] == len(aooverlaps) + 1
+                indices = [int(i) for i in next(inputfile).split()]
+                assert indices[0] == ncols + 1
+                ncols += len(indices)
 
                 self.skip_line(inputfile, "dashes")
-                data = [inputfile.next().split() for i in range(self.nbasis)]
-                indices = [int(d[0]) for d in data]
+                data = [next(inputfile) for i in range(self.nbasis)]
+                indices = [int(d.split(None, 1)[0]) for d in data]
                 assert indices == list(range(1, self.nbasis+1))
+                lines.extend(data)
 
-                for i in range(1, len(data[0])):
-                    vector = [float(d[i]) for d in data]
-                    aooverlaps.append(vector)
-
-            self.set_attribute('aooverlaps', aooverlaps)
+            aooverlaps = utils.readmatrix(lines, self.nbasis, 6, width=12, start=6, ncols=ncols)
+            self.aooverlaps = aooverlaps.T
 
         if line.strip() in ("The SCF is already converged", "The DFT is already converged"):
             if self.linesearch:
@@ -462,7 +628,7 @@ class NWChem(logfileparser.Logfile):
             xrms = float(line.split()[6])
             xmax = float(line.split()[7])
             if not hasattr(self, 'geovalues'):
-                self.geovalues = []
+                self.geovalues = utils.FrameBuffer()
             self.geovalues.append([gmax, grms, xmax, xrms])
             self.linesearch = True
         if line[2:6] == "Step":
@@ -477,7 +643,7 @@ class NWChem(logfileparser.Logfile):
             xrms = float(line.split()[6])
             xmax = float(line.split()[7])
             if not hasattr(self, 'geovalues'):
-                self.geovalues = []
+                self.geovalues = utils.FrameBuffer()
             self.geovalues.append([gmax, grms, xmax, xrms])
             self.linesearch = True
 
@@ -508,7 +674,7 @@ class NWChem(logfileparser.Logfile):
                 return
 
             if not hasattr(self, "scfenergies"):
-                self.scfenergies = []
+                self.scfenergies = utils.FrameBuffer()
             energy = float(line.split()[-1])
             energy = utils.convertor(energy, "hartree", "eV")
             self.scfenergies.append(energy)
@@ -675,23 +841,21 @@ class NWChem(logfileparser.Logfile):
                 self.set_attribute('nmo', nmo)
             
                 self.skip_line(inputfile, 'blank')
-                mocoeffs = []
-                while len(mocoeffs) < self.nmo:
+                lines = []
+                ncols = 0
+                while ncols < self.nmo:
                     nmos = list(map(int,next(inputfile).split()))
-                    assert len(mocoeffs) == nmos[0]-1
-                    for n in nmos:
-                        mocoeffs.append([])
+                    assert ncols == nmos[0]-1
+                    ncols += len(nmos)
                     self.skip_line(inputfile, 'dashes')
-                    for nb in range(nbasis):                
+                    for nb in range(nbasis):
                         line = next(inputfile)
-                        index = int(line.split()[0])
+                        index = int(line.split(None, 1)[0])
                         assert index == nb+1
-                        coefficients = list(map(float,line.split()[1:]))
-                        assert len(coefficients) == len(nmos)
-                        for i,c in enumerate(coefficients):
-                            mocoeffs[nmos[i]-1].append(c)
+                        lines.append(line)
                     self.skip_line(inputfile, 'blank')
-                self.mocoeffs.append(mocoeffs)
+                mocoeffs = utils.readmatrix(lines, nbasis, 6, width=12, start=6, ncols=ncols)
+                self.mocoeffs.append(mocoeffs.T)
 
                 array_info = next(inputfile)
 
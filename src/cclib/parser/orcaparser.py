@@ -14,6 +14,7 @@
 
 
 from __future__ import print_function
+import re
 
 import numpy
 
@@ -24,6 +25,54 @@ from . import utils
 class ORCA(logfileparser.Logfile):
     """An ORCA log file."""
 
+    # Phrases that start each section parsed in extract(), in the same order.
+    section_triggers = [
+        "Number of atoms",
+        "Total Charge",
+        "SCF ITERATIONS",
+        "SCF CONVERGED AFTER",
+        "SCF NOT CONVERGED AFTER",
+        "Geometry Optimization Run",
+        "RELAXED SURFACE SCAN STEP",
+        "Geometry convergence",
+        "CARTESIAN COORDINATES",
+        "GEOMETRY OPTIMIZATION CYCLE",
+        "FINAL ENERGY EVALUATION AT THE STATIONARY POINT",
+        "The optimization did not converge",
+        "ORBITAL ENERGIES",
+        "# of contracted basis functions",
+        "Basis Dimension        Dim",
+        ("OVERLAP MATRIX", ["aooverlaps"]),
+        ("MOLECULAR ORBITALS", ["aonames", "atombasis", "mocoeffs"]),
+        "TD-DFT/TDA EXCITED",
+        "ABSORPTION SPECTRUM",
+        "VIBRATIONAL FREQUENCIES",
+        ("NORMAL MODES", ["vibdisps"]),
+        "IR SPECTRUM",
+        "RAMAN SPECTRUM",
+        "MULLIKEN ATOMIC CHARGES",
+        "LOEWDIN ATOMIC CHARGES",
+        "DIPOLE MOMENT",
+    ]
+
+    # Attributes that are parsed once and never change afterwards.
+    final_attributes = ["charge", "mult", "natom", "nbasis"]
+
+    # Phrases that start the parts of the header handled by sniff_header().
+    header_triggers = ["Program Version", "INPUT FILE"]
+
+    # Simple input keywords, besides the method and basis set, are recognized with
+    # these expressions, where the keywords for job types come first.
+    input_jobtypes = [("opt", "^(|c|z|g)(tight|loose|verytight)?opt$"), ("freq", "^(num|an)?freq$")]
+    input_basis = "^(sto-|3-21|6-31|(aug-|ma-)?(cc-p|def2?-|pc-)|(def2-|old-)?(sv|tzv|qzv)p|lanl|ano-)"
+    input_options = "^(r|u|ro)(hf|ks)$|^(no)?(usesym|ri|autostart|pop)$|scf$|print|conv$|grid\\d|^pal\\d|^rij|/|^(moread|kdiis|soscf|direct|keepdens)$"
+
+    # Phrases printed at the end of jobs that terminate normally, for status().
+    termination_triggers = ["ORCA TERMINATED NORMALLY"]
+
+    # Phrase in the banner that starts each later job of a multi-job input ($new_job).
+    job_triggers = ["JOB NUMBER"]
+
     def __init__(self, *args, **kwargs):
 
         # Call the __init__ method of the superclass
@@ -59,6 +108,59 @@ class ORCA(logfileparser.Logfile):
         # Keep track of whether this is a relaxed scan calculation
         self.is_relaxed_scan = False
 
+    def sniff_header(self, inputfile, line, record):
+        """Update the job description from the version and the echo of the input."""
+
+        #                          Program Version 3.0.1 -  RELEASE  -
+        if "Program Version" in line and record["version"] is None:
+            record["version"] = line.split()[2]
+
+        # The input file is echoed with numbered lines, like this:
+        #
+        # |  1> # Geometry optimization restricted B3LYP/sto-3g calc
+        # |  2> ! RKS STO-3G B3LYP UseSym Opt
+        # |  3> %output
+        # |  4>  PrintLevel Normal
+        # |  5> end
+        # |  6> * xyz 0 1
+        # ...
+        # | 32>                          ****END OF INPUT****
+        #
+        # The method and basis set are among the simple input keywords after an exclamation
+        # mark, which are not ordered. A scan is set up in the %geom block, and excited states
+        # are computed with a %tddft or %cis block. Keywords are not case sensitive.
+        if line.strip() == "INPUT FILE" and record["method"] is None:
+            jobtypes = []
+            references = []
+            line = next(inputfile)
+            while not "****END OF INPUT****" in line:
+                content = line.partition(">")[2].strip().lower()
+                words = content.split()
+                if content[:1] == "!":
+                    for word in content[1:].split():
+                        for jobtype, regex in self.input_jobtypes:
+                            if re.match(regex, word):
+                                jobtypes.append(jobtype)
+                                break
+                        else:
+                            if re.match(self.input_basis, word):
+                                record["basis"] = record["basis"] or word
+                            elif re.match("^(r|u|ro)hf$", word):
+                                references.append("hf")
+                            elif not re.search(self.input_options, word):
+                                record["method"] = record["method"] or word
+                if words[:1] in (["%tddft"], ["%cis"]):
+                    jobtypes.append("td")
+                if words[:1] == ["scan"]:
+                    jobtypes.append("scan")
+                if content[:1] == "*" and len(words) > 2 and record["charge"] is None:
+                    words = content[1:].split()
+                    record["charge"] = int(words[1])
+                    record["mult"] = int(words[2])
+                line = next(inputfile)
+            record["method"] = record["method"] or (references + [None])[0]
+            record["jobtypes"] = sorted(set(jobtypes)) or ["sp"]
+
     def extract(self, inputfile, line):
         """Extract information from the file object inputfile."""
 
@@ -120,7 +222,7 @@ class ORCA(logfileparser.Logfile):
         if "SCF CONVERGED AFTER" in line:
 
             if not hasattr(self, "scfenergies"):
-                self.scfenergies = []
+                self.scfenergies = utils.FrameBuffer()
             if not hasattr(self, "scfvalues"):
                 self.scfvalues = []
             if not hasattr(self, "scftargets"):
@@ -145,7 +247,7 @@ class ORCA(logfileparser.Logfile):
         if "SCF NOT CONVERGED AFTER" in line:
 
             if not hasattr(self, "scfenergies"):
-                self.scfenergies = []
+                self.scfenergies = utils.FrameBuffer()
             if not hasattr(self, "scfvalues"):
                 self.scfvalues = []
             if not hasattr(self, "scftargets"):
@@ -265,7 +367,7 @@ class ORCA(logfileparser.Logfile):
         if line[33:53] == "Geometry convergence":
 
             if not hasattr(self, "geovalues"):
-                self.geovalues = []
+                self.geovalues = utils.FrameBuffer()
             
             headers = next(inputfile)
             dashes = next(inputfile)
@@ -316,7 +418,7 @@ class ORCA(logfileparser.Logfile):
             self.set_attribute('natom', len(atomnos))
             self.set_attribute('atomnos', atomnos)
 
-            self.atomcoords = [atomcoords]
+            self.atomcoords = utils.FrameBuffer([atomcoords])
 
         # There's always a banner announcing the next geometry optimization cycle,
         # which looks something like this:
@@ -333,7 +435,7 @@ class ORCA(logfileparser.Logfile):
             self.skip_lines(inputfile, ['s', 'd', 'text', 'd'])
            
             if not hasattr(self,"atomcoords"):
-                self.atomcoords = []
+                self.atomcoords = utils.FrameBuffer()
 
             atomnos = []
             atomcoords = []
@@ -412,17 +514,15 @@ class ORCA(logfileparser.Logfile):
 
             self.skip_line(inputfile, 'dashes')
 
-            self.aooverlaps = numpy.zeros( (self.nbasis, self.nbasis), "d")
+            lines = []
             for i in range(0, self.nbasis, 6):
                 self.updateprogress(inputfile, "Overlap")
 
                 header = next(inputfile)
-                size = len(header.split())
 
                 for j in range(self.nbasis):
-                    line = next(inputfile)
-                    broken = line.split()
-                    self.aooverlaps[j, i:i+size] = list(map(float, broken[1:size+1]))
+                    lines.append(next(inputfile))
+            self.aooverlaps = utils.readmatrix(lines, self.nbasis, 6, width=11, start=11, ncols=self.nbasis)
 
         # Molecular orbital coefficients.
         # This is also where atombasis is parsed.
@@ -430,7 +530,7 @@ class ORCA(logfileparser.Logfile):
 
             self.skip_line(inputfile, 'dashes')
 
-            mocoeffs = [ numpy.zeros((self.nbasis, self.nbasis), "d") ]
+            mocoeffs = []
             self.aonames = []
             self.atombasis = []
             for n in range(self.natom):
@@ -440,8 +540,8 @@ class ORCA(logfileparser.Logfile):
 
                 if spin == 1:
                     self.skip_line(inputfile, 'blank')
-                    mocoeffs.append(numpy.zeros((self.nbasis, self.nbasis), "d"))
 
+                lines = []
                 for i in range(0, self.nbasis, 6):
 
                     self.updateprogress(inputfile, "Coefficients")
@@ -449,8 +549,6 @@ class ORCA(logfileparser.Logfile):
                     self.skip_lines(inputfile, ['numbers', 'energies', 'occs'])
 
                     dashes = next(inputfile)
-                    broken = dashes.split()
-                    size = len(broken)
 
                     for j in range(self.nbasis):
                         line = next(inputfile)
@@ -465,11 +563,10 @@ class ORCA(logfileparser.Logfile):
                             self.aonames.append("%s%i_%s"%(atomname, num+1, orbital))
                             self.atombasis[num].append(j)
 
-                        temp = []
-                        vals = line[16:-1] #-1 to remove the last blank space
-                        for k in range(0, len(vals), 10):
-                            temp.append(float(vals[k:k+10]))
-                        mocoeffs[spin][i:i+size, j] = temp
+                        lines.append(line)
+
+                coeffs = utils.readmatrix(lines, self.nbasis, 6, width=10, start=16, ncols=self.nbasis)
+                mocoeffs.append(coeffs.T.copy())
 
             self.mocoeffs = mocoeffs
 
@@ -24,6 +24,45 @@ from . import utils
 class Psi(logfileparser.Logfile):
     """A Psi log file."""
 
+    # Phrases that start each section parsed in extract(), in the same order.
+    section_triggers = [
+        "PSI3: An Open-Source Ab Initio",
+        "PSI4: An Open-Source Ab Initio",
+        "==>",
+        "-Geometry in the canonical coordinate system (Angstrom):",
+        "Geometry (in Angstrom), charge",
+        "-SYMMETRY INFORMATION:",
+        "-BASIS SET INFORMATION:",
+        "(?i)charge       =",
+        "(?i)multiplicity =",
+        "-Contraction Scheme:",
+        "CINTS: An integrals program written in C",
+        "CSCF3.0: An SCF program written in C",
+        "Number of atoms",
+        "Number of atomic orbitals",
+        "iter       total energy",
+        "(?i)orbital energies (a.u.)",
+        "* SCF total energy",
+        "@RHF Final Energy:",
+        "@RKS Final Energy",
+        "Mulliken Charges: (a.u.)",
+        "Lowdin Charges: (a.u.)",
+        "MP2 Total Energy (a.u.)",
+        "* CCSD total energy",
+        "**** Optimization is complete! ****",
+        "Optimizer: Did not converge!",
+        "Properties will be evaluated at",
+        "Dipole Moment: (a.u.)",
+        "Multipole Moments:",
+        "*** Electric multipole moments ***",
+    ]
+
+    # Attributes that are parsed once and never change afterwards.
+    final_attributes = ["charge", "mult", "natom", "nbasis"]
+
+    # Phrases printed at the end of jobs that terminate normally, for status().
+    termination_triggers = ["PSI3 stopped on", "PSI4 exiting successfully"]
+
     def __init__(self, *args, **kwargs):
 
         # Call the __init__ method of the superclass
@@ -547,7 +586,7 @@ class Psi(logfileparser.Logfile):
            (self.section == "Post-Iterations" and ("@RHF Final Energy:" in line or "@RKS Final Energy" in line)):
             e = float(line.split()[-1])
             if not hasattr(self, 'scfenergies'):
-                self.scfenergies = []
+                self.scfenergies = utils.FrameBuffer()
             self.scfenergies.append(utils.convertor(e, 'hartree', 'eV'))
 
         #  ==> Molecular Orbitals <==
@@ -575,27 +614,24 @@ class Psi(logfileparser.Logfile):
 
             self.skip_line(inputfile, 'blank')
 
-            mocoeffs = []
+            # The coefficients of all pages are converted at once at the end.
+            lines = []
+            nmo = 0
             indices = next(inputfile)
             while indices.strip():
 
                 indices = [int(i) for i in indices.split()]
-
-                if len(mocoeffs) < indices[-1]:
-                    for i in range(len(indices)):
-                        mocoeffs.append([])
-                else:
-                    assert len(mocoeffs) == indices[-1]
+                assert indices[0] == nmo + 1
+                nmo = indices[-1]
 
                 self.skip_line(inputfile, 'blank')
 
                 line = next(inputfile)
                 while line.strip():
-                    iao = int(line.split()[0])
-                    coeffs = [float(c) for c in line.split()[1:]]
-                    for i,c in enumerate(coeffs):
-                        mocoeffs[indices[i]-1].append(c)
+                    lines.append(line)
                     line = next(inputfile)
+                if nmo == len(indices):
+                    naos = len(lines)
 
                 energies = next(inputfile)
                 symmetries = next(inputfile)
@@ -604,9 +640,10 @@ class Psi(logfileparser.Logfile):
                 self.skip_lines(inputfile, ['b', 'b'])
                 indices = next(inputfile)
 
+            mocoeffs = utils.readmatrix(lines, naos, 5, width=13, start=5, ncols=nmo)
             if not hasattr(self, 'mocoeffs'):
                 self.mocoeffs = []
-            self.mocoeffs.append(mocoeffs)
+            self.mocoeffs.append(mocoeffs.T)
 
         # The formats for Mulliken and Lowdin atomic charges are the same, just with
         # the name changes, so use the same code for both.
@@ -698,7 +735,7 @@ class Psi(logfileparser.Logfile):
                 assert self.geotargets == geotargets
 
             if not hasattr(self, 'geovalues'):
-                self.geovalues = []
+                self.geovalues = utils.FrameBuffer()
             self.geovalues.append(geovalues)
 
         # This message signals a converged optimization, in which case we want
@@ -25,6 +25,56 @@ from . import utils
 class QChem(logfileparser.Logfile):
     """A Q-Chem 4 log file."""
 
+    # Phrases that start each section parsed in extract(), in the same order.
+    section_triggers = [
+        "User input:",
+        ("Basis set in general basis input format:", ["gbasis"]),
+        "Standard Nuclear Orientation (Angstroms)",
+        "Nuclear Repulsion Energy",
+        "basis functions",
+        "calculation will be",
+        "SCF converges when ",
+        ("Final Alpha MO Coefficients", ["mocoeffs"]),
+        ("Final Beta MO Coefficients", ["mocoeffs"]),
+        "Total energy in the final basis set",
+        "Maximum     Tolerance    Cnvgd?",
+        "**  OPTIMIZATION CONVERGED  **",
+        "**  MAXIMUM OPTIMIZATION CYCLES REACHED  **",
+        "MP2         total energy",
+        "MP2 energy",
+        "EHF",
+        "CCD total energy",
+        "CCSD total energy",
+        "Excitation Energies",
+        "Orbital Energies (a.u.)",
+        ("RESTRICTED (RHF) MOLECULAR ORBITAL COEFFICIENTS", ["aonames", "atombasis", "mocoeffs"]),
+        ("ALPHA MOLECULAR ORBITAL COEFFICIENTS", ["aonames", "atombasis", "mocoeffs"]),
+        ("BETA  MOLECULAR ORBITAL COEFFICIENTS", ["mocoeffs"]),
+        "Ground-State Mulliken Net Atomic Charges",
+        "Hirshfeld Atomic Charges",
+        "Ground-State ChElPG Net Atomic Charges",
+        "Cartesian Multipole Moments",
+        "Gradient of SCF Energy",
+        "Hessian of the SCF Energy",
+        "VIBRATIONAL ANALYSIS",
+        "STANDARD THERMODYNAMIC QUANTITIES AT",
+    ]
+
+    # Attributes that are parsed once and never change afterwards.
+    final_attributes = ["charge", "mult", "nbasis"]
+
+    # Phrases that start the parts of the header handled by sniff_header().
+    header_triggers = ["Q-Chem", "User input:"]
+
+    # The values of the jobtype $rem variable, and the job types in sniff().
+    rem_jobtypes = {"sp": "sp", "force": "sp", "opt": "opt", "ts": "opt", "freq": "freq", "pes_scan": "scan"}
+
+    # Phrases printed at the end of jobs that terminate normally, for status().
+    termination_triggers = ["Thank you very much for using Q-Chem"]
+
+    # Phrase that starts each job of a multi-job input (jobs separated by @@@).
+    job_triggers = ["Running Job"]
+
     def __init__(self, *args, **kwargs):
 
         # Call the __init__ method of the superclass
@@ -127,6 +177,44 @@ class QChem(logfileparser.Logfile):
                     newbfname = '{}{}'.format(bfcounts[bfname], bfname)
                     self.aonames[bfindex] = '_'.join([atomname, newbfname])
 
+    def sniff_header(self, inputfile, line, record):
+        """Update the job description from the version and the echo of the input."""
+
+        #  Q-Chem 4.2.0 for Intel X86 Linux
+        if re.match(r" Q-Chem \S+ for ", line) and record["version"] is None:
+            record["version"] = line.split()[1]
+
+        # The $rem section has a variable on each line, with or without an equal sign,
+        # and the method is either given as such, or as the exchange functional (which
+        # can be HF) together with the correlation method. The first line of the $molecule
+        # section has the charge and multiplicity, unless they are read from elsewhere.
+        if line[0:11] == 'User input:' and record["method"] is None:
+            rem = {}
+            self.skip_line(inputfile, 'd')
+            line = next(inputfile)
+            while list(set(line.strip())) != ['-']:
+                if '$rem' in line.lower():
+                    line = next(inputfile)
+                    while not '$end' in line.lower():
+                        words = line.split('!')[0].replace('=', ' ').lower().split()
+                        if len(words) > 1:
+                            rem[words[0]] = words[1]
+                        line = next(inputfile)
+                if '$molecule' in line.lower() and record["charge"] is None:
+                    words = next(inputfile).split()
+                    if len(words) == 2:
+                        record["charge"], record["mult"] = map(int, words)
+                line = next(inputfile)
+            method = rem.get("method") or rem.get("exchange")
+            if method == "hf" and rem.get("correlation", "none") != "none":
+                method = rem["correlation"]
+            jobtypes = [self.rem_jobtypes.get(rem.get("jobtype", "sp"), rem.get("jobtype"))]
+            if int(rem.get("cis_n_roots", 0)) or method in ("cis", "cis(d)"):
+                jobtypes = [jobtype for jobtype in jobtypes if jobtype != "sp"] + ["td"]
+            record["method"] = method
+            record["basis"] = rem.get("basis")
+            record["jobtypes"] = sorted(jobtypes)
+
     def extract(self, inputfile, line):
         """Extract information from the file object inputfile."""
 
@@ -382,7 +470,7 @@ class QChem(logfileparser.Logfile):
 
         if 'Total energy in the final basis set' in line:
             if not hasattr(self, 'scfenergies'):
-                self.scfenergies = []
+                self.scfenergies = utils.FrameBuffer()
             scfenergy = float(line.split()[-1])
             self.scfenergies.append(utils.convertor(scfenergy, 'hartree', 'eV'))
 
@@ -396,7 +484,7 @@ class QChem(logfileparser.Logfile):
             if not hasattr(self, 'geotargets'):
                 self.geotargets = [line_g[1], line_d[1], self.float(line_e[1])]
             if not hasattr(self, 'geovalues'):
-                self.geovalues = []
+                self.geovalues = utils.FrameBuffer()
             try:
                 ediff = abs(self.float(line_e[0]))
             except ValueError:
@@ -675,19 +763,9 @@ class QChem(logfileparser.Logfile):
                     if 'Virtual' in line:
                         self.homos = [len(energies_alpha)-1]
                     line = next(inputfile)
-                # Parse the energies and symmetries in pairs of lines.
-                # energies = [utils.convertor(energy, 'hartree', 'eV')
-                #             for energy in map(float, line.split())]
-                # This convoluted bit handles '*******' when present.
-                energies = []
-                energy_line = line.split()
-                for e in energy_line:
-                    try:
-                        energy = utils.convertor(self.float(e), 'hartree', 'eV')
-                    except ValueError:
-                        energy = numpy.nan
-                    energies.append(energy)
-                energies_alpha.extend(energies)
+                # Parse the energies and symmetries in pairs of lines, and convert the
+                # energies all at once at the end, where '*******' becomes NaN.
+                energies_alpha.extend(line.split())
                 line = next(inputfile)
                 symbols = line.split()[1::2]
                 symbols_alpha.extend(symbols)
@@ -707,15 +785,7 @@ class QChem(logfileparser.Logfile):
                             if len(self.homos) == 1:
                                 self.homos.append(len(energies_beta)-1)
                         line = next(inputfile)
-                    energies = []
-                    energy_line = line.split()
-                    for e in energy_line:
-                        try:
-                            energy = utils.convertor(self.float(e), 'hartree', 'eV')
-                        except ValueError:
-                            energy = numpy.nan
-                        energies.append(energy)
-                    energies_beta.extend(energies)
+                    energies_beta.extend(line.split())
                     line = next(inputfile)
                     symbols = line.split()[1::2]
                     symbols_beta.extend(symbols)
@@ -725,12 +795,12 @@ class QChem(logfileparser.Logfile):
             # printed at every step of geometry optimizations and fragment jobs.
             self.moenergies = [[]]
             self.mosyms = [[]]
-            self.moenergies[0] = numpy.array(energies_alpha)
+            self.moenergies[0] = utils.convertor(utils.fortranfloats(energies_alpha, strict=False), 'hartree', 'eV')
             self.mosyms[0] = symbols_alpha
             if self.unrestricted:
                 self.moenergies.append([])
                 self.mosyms.append([])
-                self.moenergies[1] = numpy.array(energies_beta)
+                self.moenergies[1] = utils.convertor(utils.fortranfloats(energies_beta, strict=False), 'hartree', 'eV')
                 self.mosyms[1] = symbols_beta
 
             self.set_attribute('nmo', len(self.moenergies[0]))
@@ -786,15 +856,7 @@ class QChem(logfileparser.Logfile):
                     if 'Virtual' in line:
                         self.homos = [len(energies_alpha)-1]
                     line = next(inputfile)
-                energies = []
-                energy_line = line.split()
-                for e in energy_line:
-                    try:
-                        energy = utils.convertor(self.float(e), 'hartree', 'eV')
-                    except ValueError:
-                        energy = numpy.nan
-                    energies.append(energy)
-                energies_alpha.extend(energies)
+                energies_alpha.extend(line.split())
                 line = next(inputfile)
 
             line = next(inputfile)
@@ -811,24 +873,16 @@ class QChem(logfileparser.Logfile):
                             if len(self.homos) == 1:
                                 self.homos.append(len(energies_beta)-1)
                         line = next(inputfile)
-                    energies = []
-                    energy_line = line.split()
-                    for e in energy_line:
-                        try:
-                            energy = utils.convertor(self.float(e), 'hartree', 'eV')
-                        except ValueError:
-                            energy = numpy.nan
-                        energies.append(energy)
-                    energies_beta.extend(energies)
+                    energies_beta.extend(line.split())
                     line = next(inputfile)
 
             # For now, only keep the last set of MO energies, even though it is
             # printed at every step of geometry optimizations and fragment jobs.
             self.moenergies = [[]]
-            self.moenergies[0] = numpy.array(energies_alpha)
+            self.moenergies[0] = utils.convertor(utils.fortranfloats(energies_alpha, strict=False), 'hartree', 'eV')
             if self.unrestricted:
                 self.moenergies.append([])
-                self.moenergies[1] = numpy.array(energies_beta)
+                self.moenergies[1] = utils.convertor(utils.fortranfloats(energies_beta, strict=False), 'hartree', 'eV')
             self.set_attribute('nmo', len(self.moenergies[0]))
 
         # If we've asked to display more virtual orbitals than there
@@ -999,7 +1053,7 @@ class QChem(logfileparser.Logfile):
         # the gradient is printed.
         if 'Gradient of SCF Energy' in line:
             if not hasattr(self, 'grads'):
-                self.grads = []
+                self.grads = utils.FrameBuffer()
             grad = numpy.empty(shape=(3, self.natom))
             self.parse_matrix(inputfile, grad)
             self.grads.append(grad.T)
@@ -1208,6 +1262,7 @@ class QChem(logfileparser.Logfile):
         nrows, ncols = nparray.shape
         line = next(inputfile)
         assert len(line.split()) == min(self.ncolsblock, ncols)
+        lines = []
         colcounter = 0
         while colcounter < ncols:
             # If the line is just the column header (indices)...
@@ -1215,12 +1270,11 @@ class QChem(logfileparser.Logfile):
                 line = next(inputfile)
             rowcounter = 0
             while rowcounter < nrows:
-                row = list(map(float, line.split()[1:]))
-                assert len(row) == min(self.ncolsblock, (ncols - colcounter))
-                nparray[rowcounter][colcounter:colcounter + self.ncolsblock] = row
+                lines.append(line)
                 line = next(inputfile)
                 rowcounter += 1
             colcounter += self.ncolsblock
+        nparray[:] = utils.readmatrix(lines, nrows, self.ncolsblock, start=5, ncols=ncols)
 
     def parse_matrix_aonames(self, inputfile, nparray):
         """Q-Chem prints most matrices in a standard format; parse the matrix
@@ -1234,6 +1288,7 @@ class QChem(logfileparser.Logfile):
         nrows, ncols = nparray.shape
         line = next(inputfile)
         assert len(line.split()) == min(self.ncolsblock, ncols)
+        lines = []
         colcounter = 0
         while colcounter < ncols:
             # If the line is just the column header (indices)...
@@ -1263,11 +1318,11 @@ class QChem(logfileparser.Logfile):
                             shell = ''.join([shell, row[3 + offset]])
                         aoname = ''.join([name, '_', shell.upper()])
                         self.aonames.append(aoname)
-                row = list(map(float, row[-min(self.ncolsblock, (ncols - colcounter)):]))
-                nparray[rowcounter][colcounter:colcounter + self.ncolsblock] = row
+                lines.append(line)
                 line = next(inputfile)
                 rowcounter += 1
             colcounter += self.ncolsblock
+        nparray[:] = utils.readmatrix(lines, nrows, self.ncolsblock, start=18, ncols=ncols)
 
     def generate_atom_map(self):
         """Generate the map to go from Q-Chem atom numbering:
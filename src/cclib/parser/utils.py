@@ -13,6 +13,12 @@
 """Utilities often used by cclib parsers"""
 
 
+import itertools
+import re
+
+import numpy
+
+
 def convertor(value, fromunits, tounits):
     """Convert from one set of units to another.
 
@@ -77,6 +83,336 @@ def convertor(value, fromunits, tounits):
     return _convertor["%s_to_%s" % (fromunits, tounits)] (value)
 
 
+# Minus signs that directly follow a number, where two fields have run together.
+_fused = re.compile(r"-(?<=[0-9.]-)")
+
+
+def fortranfloats(numbers, strict=True):
+    """Convert numbers as printed by Fortran programs to an array of floats, all at once.
+
+    The numbers are a list of strings, a string with numbers separated by whitespace,
+    or an array of bytes strings. Besides what float() reads, exponents can start with
+    D or d instead of E, and the E can be missing altogether, as Fortran does for
+    exponents with three digits (1.234-102). Fields of asterisks, which is how Fortran
+    prints numbers that do not fit, become NaN, and so do blank fields. Anything else
+    that cannot be read raises a ValueError, or becomes NaN as well if not strict.
+
+    This does not go through the numbers one by one in Python, and is many times faster
+    than converting them with Logfile.float() wherever there are more than a few.
+
+    >>> fortranfloats(["1.5D+02", "-2.5d-3", "1.234-102", "*****", "  ", "7"]).tolist()
+    [150.0, -0.0025, 1.234e-102, nan, nan, 7.0]
+    >>> fortranfloats(" 0.1E+01  -2.0  3 ").tolist()
+    [1.0, -2.0, 3.0]
+    """
+
+    if isinstance(numbers, (str, bytes)):
+        numbers = numbers.split()
+
+    # Most blocks of numbers need none of the handling below, so try without it first.
+    try:
+        return numpy.array(numbers, "d").ravel()
+    except ValueError:
+        pass
+    fields = numpy.asarray(numbers, "S").ravel()
+
+    # The characters of all numbers, in rows padded with zeros, to be changed in place.
+    width = fields.dtype.itemsize
+    codes = numpy.array(fields).view("u1").reshape(len(fields), width)
+    codes[(codes == ord("D")) | (codes == ord("d"))] = ord("E")
+
+    values = numpy.empty(len(fields), "d")
+    values.fill(numpy.nan)
+    blank = (codes <= ord(" ")).all(axis=1)
+    valid = ~blank & ~(codes == ord("*")).any(axis=1)
+
+    # A sign right after a digit or decimal point starts an exponent without the E,
+    # so these numbers get one more character, with the E inserted before the sign.
+    sign = (codes[:, 1:] == ord("-")) | (codes[:, 1:] == ord("+"))
+    before = codes[:, :-1]
+    lost = sign & (((before >= ord("0")) & (before <= ord("9"))) | (before == ord(".")))
+    shifted = lost.any(axis=1) & valid
+    if shifted.any():
+        rows = codes[shifted]
+        position = lost[shifted].argmax(axis=1)[:, numpy.newaxis] + 1
+        columns = numpy.arange(width + 1)
+        widened = rows[numpy.arange(len(rows))[:, numpy.newaxis], columns - (columns > position)]
+        widened[columns == position] = ord("E")
+        values[shifted] = _tofloats(widened, strict)
+        valid &= ~shifted
+
+    if valid.all():
+        return _tofloats(codes, strict)
+    values[valid] = _tofloats(codes[valid], strict)
+    return values
+
+
+def _tofloats(codes, strict):
+    """Convert rows of characters to floats, by the conversion of numpy from bytes."""
+
+    fields = numpy.ascontiguousarray(codes).view("S%i" % codes.shape[1]).ravel()
+    try:
+        return fields.astype("d")
+    except ValueError:
+        if strict:
+            raise
+    values = numpy.empty(len(fields), "d")
+    for i, field in enumerate(fields):
+        try:
+            values[i] = float(field)
+        except ValueError:
+            values[i] = numpy.nan
+    return values
+
+
+def readfields(lines, width=None, start=0, ncols=None):
+    """Read the numbers in a block of lines into a two-dimensional array.
+
+    Each line gives one row, read from its character at start onwards. With a width,
+    the numbers are in fields of that many characters, so negative numbers that fill
+    their field are read even if they run into the number before. Without a width,
+    the numbers are separated by whitespace, or by a minus sign right after a number.
+    Exponents with D instead of E are read, fields of asterisks become NaN, and so do
+    fields that are blank or missing at the end of shorter lines. The array has ncols
+    columns, by default as many as the longest line has numbers.
+
+    All the lines are converted at once, which is much faster than one number at a time.
+
+    >>> readfields(["  1  0.500000D+00", "  2 -0.222815D+00-0.100000D+01"], width=13, start=4)
+    array([[ 0.5     ,       nan],
+           [-0.222815, -1.      ]])
+    >>> readfields(["1.5 -2.25-3.0", "******* 4"])
+    array([[ 1.5 , -2.25, -3.  ],
+           [  nan,  4.  ,   nan]])
+    """
+
+    if width:
+        lines = [line[start:].rstrip("\r\n") for line in lines]
+        if ncols is None:
+            ncols = max([-(-len(line) // width) for line in lines] or [0])
+        size = ncols * width
+        text = "".join(line[:size].ljust(size) for line in lines)
+        fields = numpy.frombuffer(text.encode("ascii", "replace"), "S%i" % width)
+        return fortranfloats(fields).reshape(len(lines), ncols)
+
+    text = _fused.sub(" -", "\n".join(line[start:].rstrip() for line in lines))
+    rows = [row.split()[:ncols] for row in text.split("\n")] if lines else []
+    counts = numpy.array([len(row) for row in rows], "i")
+    if ncols is None:
+        ncols = int(counts.max()) if len(rows) else 0
+    array = numpy.empty((len(rows), ncols), "d")
+    array.fill(numpy.nan)
+    array[numpy.arange(ncols) < counts[:, numpy.newaxis]] = fortranfloats(list(itertools.chain(*rows)))
+    return array
+
+
+def readpage(matrix, lines, first, columns, width=None, start=0, triangular=False):
+    """Read one page of a matrix printed in pages of a few columns each into an array.
+
+    The lines are the rows of the page, with the numbers for the columns of the matrix
+    from the first one on, which are written into the array in place. If the matrix is
+    triangular, the page starts at the diagonal, so that the lines are the rows from the
+    first one on, and the numbers are also written to the upper triangle of the array.
+    The array can be a view, such as the transpose of a matrix with its columns as rows.
+    The other arguments are as for readfields.
+
+    >>> matrix = numpy.zeros((3, 3))
+    >>> readpage(matrix, ["1 1.0", "2 0.5 2.0", "3 0.0 0.1"], 0, 2, start=1, triangular=True)
+    >>> readpage(matrix, ["3 3.0"], 2, 2, start=1, triangular=True)
+    >>> matrix
+    array([[1. , 0.5, 0. ],
+           [0.5, 2. , 0.1],
+           [0. , 0.1, 3. ]])
+    """
+
+    ncols = max(min(columns, matrix.shape[1] - first), 0)
+    values = readfields(lines, width, start, ncols)
+
+    if not triangular:
+        matrix[:len(lines), first:first + ncols] = values
+        return
+
+    # Fill the upper triangle of the square at the top of the page from its lower one.
+    top = values[:ncols]
+    upper = numpy.triu_indices(len(top), 1)
+    top[upper] = top.T[upper]
+    matrix[first:first + len(lines), first:first + ncols] = values
+    matrix[first:first + ncols, first:first + len(lines)] = values.T
+
+
+def readmatrix(lines, nrows, columns, width=None, start=0, ncols=None, triangular=False):
+    """Read a matrix printed in pages of a few columns each into an array.
+
+    The lines are the rows of all the pages in order, without the lines with
+    column numbers and such in between, and each page has the next columns of the
+    matrix. Usually every page has all nrows rows, but a triangular matrix is printed
+    from the diagonal downwards, so that each page has fewer rows, and the upper
+    triangle is then filled from the lower one. The array has ncols columns, by default
+    nrows for triangular matrices and otherwise as many as there are in the pages.
+    Each page is read into the array in turn with readpage, and the other arguments
+    are as for readfields.
+
+    >>> readmatrix(["1 1.0", "2 0.5 2.0", "3 0.0 0.1", "3 3.0"], 3, 2, start=1, triangular=True)
+    array([[1. , 0.5, 0. ],
+           [0.5, 2. , 0.1],
+           [0. , 0.1, 3. ]])
+    """
+
+    if triangular:
+        matrix = numpy.zeros((nrows, nrows), "d")
+        end = 0
+        for first in range(0, nrows, columns):
+            readpage(matrix, lines[end:end + nrows - first], first, columns, width, start, True)
+            end += nrows - first
+        return matrix[:, :ncols]
+
+    npages = len(lines) // nrows if nrows else 0
+    size = npages * columns if ncols is None else min(ncols, npages * columns)
+    matrix = numpy.empty((nrows, size), "d")
+    matrix.fill(numpy.nan)
+    for page in range(npages):
+        readpage(matrix, lines[page * nrows:(page + 1) * nrows], page * columns, columns, width, start)
+    if ncols is None:
+        filled = numpy.flatnonzero(~numpy.isnan(matrix).all(axis=0))
+        matrix = matrix[:, :filled[-1] + 1 if len(filled) else 0]
+    return matrix
+
+
+class FrameBuffer(object):
+    """A growing array for attributes with a frame for every step, such as atomcoords.
+
+    Parsers append whole frames to it like to a list, and each one is copied into a
+    NumPy array that doubles in size whenever it is full, so appending takes constant
+    time on average and there is no Python float for every number. This array, cut to
+    the frames appended, is returned by the array method and numpy.asarray, and this
+    is what arrayify sets the attribute to, without a copy. Frames can be read and
+    changed by index as rows of that array. If a frame has another shape than the
+    first one, the buffer simply keeps a list of frames from then on, and converts it
+    like arrayify would.
+
+    >>> frames = FrameBuffer()
+    >>> frames.append([[0.0, 0.0, 1.0]])
+    >>> frames.append([[0.0, 0.0, 2.0]])
+    >>> len(frames), frames[-1].tolist()
+    (2, [[0.0, 0.0, 2.0]])
+    >>> frames.array().shape
+    (2, 1, 3)
+
+    Frames that are no longer needed can be dropped with the discard method, to keep
+    the memory used bounded while streaming the frames of a long trajectory. They still
+    count in the length and the indices of the others, but only the frames kept are in
+    the array, and reading a dropped frame raises an IndexError.
+    """
+
+    def __init__(self, frames=(), dtype="d"):
+        self.dtype = dtype
+        self._data = None
+        self._size = 0
+        self._frames = None
+        self._dropped = 0
+        for frame in frames:
+            self.append(frame)
+
+    def append(self, frame):
+        if self._frames is not None:
+            self._frames.append(frame)
+            return
+        try:
+            frame = numpy.asarray(frame, self.dtype)
+        except (TypeError, ValueError):
+            self._frames = list(self) + [frame]
+            self._data = None
+            return
+
+        if self._data is None:
+            self._data = numpy.empty((4,) + frame.shape, self.dtype)
+        elif frame.shape != self._data.shape[1:]:
+            self._frames = list(self) + [frame]
+            self._data = None
+            return
+        elif self._size == len(self._data):
+            data = numpy.empty((2 * self._size,) + frame.shape, self.dtype)
+            data[:self._size] = self._data
+            self._data = data
+        self._data[self._size] = frame
+        self._size += 1
+
+    def discard(self, count):
+        """Drop the frames before index count, if at least half of those stored are."""
+
+        stored = len(self._items())
+        count = min(count, len(self)) - self._dropped
+        if count <= 0 or 2 * count < stored:
+            return
+        if self._frames is not None:
+            del self._frames[:count]
+        else:
+            self._data[:stored - count] = self._data[count:stored]
+            self._size -= count
+        self._dropped += count
+
+    def truncate(self, count):
+        """Drop the frames from index count on, such as those of a section parsed again."""
+
+        count = max(count - self._dropped, 0)
+        if self._frames is not None:
+            del self._frames[count:]
+        else:
+            self._size = min(count, self._size)
+
+    def array(self):
+        """Return the frames as an array, which is a view if they all have the same shape."""
+        if self._frames is not None:
+            return numpy.array(self._frames, self.dtype)
+        if self._data is None:
+            return numpy.zeros(0, self.dtype)
+        return self._data[:self._size]
+
+    def __array__(self, dtype=None, copy=None):
+        array = self.array()
+        if dtype is not None and numpy.dtype(dtype) != array.dtype:
+            if copy is False:
+                raise ValueError("A copy is needed to convert the frames to %s" % dtype)
+            return array.astype(dtype)
+        return array.copy() if copy else array
+
+    def _items(self):
+        return self._frames if self._frames is not None else self.array()
+
+    def __len__(self):
+        return self._dropped + (self._size if self._frames is None else len(self._frames))
+
+    def _index(self, index):
+        """Return an index into the frames kept for an index into all frames."""
+
+        if not self._dropped:
+            return index
+        if isinstance(index, slice):
+            return [i - self._dropped for i in range(*index.indices(len(self))) if i >= self._dropped]
+        if index < 0:
+            index += len(self)
+        if not self._dropped <= index < len(self):
+            raise IndexError("frame %i was discarded or is out of range" % index)
+        return index - self._dropped
+
+    def __getitem__(self, index):
+        index = self._index(index)
+        if isinstance(index, list) and self._frames is not None:
+            return [self._frames[i] for i in index]
+        return self._items()[index]
+
+    def __setitem__(self, index, value):
+        index = self._index(index)
+        if isinstance(index, list) and self._frames is not None:
+            for i, frame in zip(index, value):
+                self._frames[i] = frame
+            return
+        self._items()[index] = value
+
+    def __iter__(self):
+        return iter(self._items())
+
+
 class PeriodicTable(object):
     """Allows conversion between element name and atomic no.
 
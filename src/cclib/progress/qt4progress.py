@@ -29,7 +29,8 @@ class Qt4Progress(QtGui.QProgressDialog):
 
         self.nstep = nstep
         self.text = text
-        self.setRange(0,nstep)
+        # Without a number of steps, the dialog shows that it is busy.
+        self.setRange(0, nstep if nstep is not None else 0)
         if text:
             self.setLabelText(text)
         self.setValue(1)
@@ -39,6 +40,7 @@ class Qt4Progress(QtGui.QProgressDialog):
 
         if text:
             self.setLabelText(text)
-        self.setValue(step)
+        if self.nstep is not None:
+            self.setValue(step)
         self.loop.processEvents(QtCore.QEventLoop.ExcludeUserInputEvents)
 
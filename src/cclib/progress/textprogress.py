@@ -24,13 +24,28 @@ class TextProgress:
 
     def initialize(self, nstep, text=None):
 
-        self.nstep = float(nstep)
+        # Without a number of steps, only the current step is shown.
+        self.nstep = float(nstep) if nstep is not None else None
         self.text = text
 
         #sys.stdout.write("\n")
 
     def update(self, step, text=None):
 
+        if self.nstep is None:
+            self.calls += 1
+            if self.calls % 100 == 0 or self.text != text or text == "Done":
+                mystr = "\r[%10i]" % step
+                if text:
+                    mystr += "    "+text
+                sys.stdout.write("\r" + 70 * " ")
+                sys.stdout.write(mystr)
+                sys.stdout.flush()
+                self.text = text
+                if text == "Done":
+                    print(" ")
+            return
+
         self.progress = int(step * 100 / self.nstep)
 
         if self.progress/2 >= self.oldprogress/2 + 1 or self.text != text:
@@ -14,6 +14,7 @@
 from .cjsonwriter import CJSON
 from .cmlwriter import CML
 from .xyzwriter import XYZ
+from .xyzwriter import write_frames
 
 # This allows users to type:
 #     from cclib.writer import ccwrite
@@ -10,6 +10,10 @@
 
 """A writer for XYZ (Cartesian coordinate) files."""
 
+import numpy
+
+from cclib.parser.utils import PeriodicTable
+
 from . import filewriter
 
 
@@ -100,5 +104,66 @@ class XYZ(filewriter.Writer):
         return '\n'.join(block)
 
 
+def write_frames(frames, outputfile, extended=False, jobfilename=None):
+    """Write the geometries of a trajectory to an XYZ file, one frame at a time.
+
+    The frames can be any iterable of Frame tuples, such as the iterator returned by
+    cclib.parser.iter_frames, and each one is written as soon as it is read, so that
+    the trajectory does not have to be held in memory. Frames without coordinates or
+    elements are skipped. If extended, the comment lines are in the extended XYZ format,
+    with the properties of the columns and the energy in eV and geovalues of the step,
+    and the gradients are written as three more columns if they are known for all atoms.
+
+    Inputs:
+      frames - An iterable of Frame tuples.
+      outputfile - A filename or a file object open for writing text.
+      extended - Boolean to write extended XYZ instead of plain XYZ.
+      jobfilename - The name of the logfile, used in the comment lines.
+    Returns:
+      The number of frames written.
+    """
+
+    if not hasattr(outputfile, "write"):
+        with open(outputfile, "w") as handle:
+            return write_frames(frames, handle, extended, jobfilename)
+
+    element = PeriodicTable().element
+    atom_template = '{:3s} {:15.10f} {:15.10f} {:15.10f}'
+    grads_template = ' {:15.10f} {:15.10f} {:15.10f}'
+    written = 0
+    for step, frame in enumerate(frames, 1):
+        if frame.coords is None or frame.atomnos is None:
+            continue
+        grads = frame.grads if extended else None
+        if grads is not None and numpy.shape(grads) != numpy.shape(frame.coords):
+            grads = None
+
+        if extended:
+            properties = "species:S:1:pos:R:3" + (":grads:R:3" if grads is not None else "")
+            comment = 'Properties={} step={}'.format(properties, step)
+            if frame.energy is not None:
+                comment += ' energy={:.10f}'.format(frame.energy)
+            if frame.geovalues is not None:
+                geovalues = " ".join("{:g}".format(value) for value in frame.geovalues)
+                comment += ' geovalues="{}"'.format(geovalues)
+            if jobfilename is not None:
+                comment += ' source="{}"'.format(jobfilename)
+        elif jobfilename is not None:
+            comment = "{}: Geometry {}".format(jobfilename, step)
+        else:
+            comment = "Geometry {}".format(step)
+
+        block = [str(len(frame.atomnos)), comment]
+        for index, (Z, (x, y, z)) in enumerate(zip(frame.atomnos, frame.coords)):
+            line = atom_template.format(element[Z], x, y, z)
+            if grads is not None:
+                line += grads_template.format(*grads[index])
+            block.append(line)
+        outputfile.write('\n'.join(block) + '\n')
+        written += 1
+
+    return written
+
+
 if __name__ == "__main__":
     pass
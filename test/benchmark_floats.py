@@ -0,0 +1,60 @@
+# This file is part of cclib (http://cclib.github.io), a library for parsing
+# and interpreting the results of computational chemistry packages.
+#
+# Copyright (C) 2015, the cclib development team
+#
+# The library is free software, distributed under the terms of
+# the GNU Lesser General Public version 2.1 or later. You should have
+# received a copy of the license along with cclib. You can also access
+# the full license online at http://www.gnu.org/copyleft/lgpl.html.
+
+"""This script compares converting numbers one by one with converting them all at once.
+
+The numbers are like those in the MO coefficients of logfiles, with a few of them in
+the Fortran formats that need special handling. Pass the count of numbers to convert
+as an argument, by default one million.
+"""
+
+from __future__ import print_function
+
+import sys
+import timeit
+
+import numpy
+
+from cclib.parser import logfileparser
+from cclib.parser import utils
+
+
+def numbers(count):
+    """Return a list of strings with random numbers in the formats found in logfiles."""
+
+    values = numpy.random.RandomState(0).uniform(-10.0, 10.0, count)
+    numbers = ["%.6f" % value for value in values]
+    numbers[1::100] = [("%.5E" % value).replace("E", "D") for value in values[1::100]]
+    numbers[2::1000] = ["*" * 10] * len(numbers[2::1000])
+    return numbers
+
+
+def scalar(log, numbers):
+    return numpy.array([log.float(number) for number in numbers], "d")
+
+
+def batch(log, numbers):
+    return log.floats(numbers)
+
+
+if __name__ == "__main__":
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    tokens = numbers(count)
+    log = logfileparser.Logfile("dummyfile")
+
+    numpy.testing.assert_array_equal(scalar(log, tokens), batch(log, tokens))
+
+    print("Converting %i numbers, best of 3:" % count)
+    timings = {}
+    for function in scalar, batch:
+        timings[function] = min(timeit.repeat(lambda: function(log, tokens), number=1, repeat=3))
+        print("  %-6s %8.3f s" % (function.__name__, timings[function]))
+    print("  speedup %7.1fx" % (timings[scalar] / timings[batch]))
@@ -0,0 +1,121 @@
+# This file is part of cclib (http://cclib.github.io), a library for parsing
+# and interpreting the results of computational chemistry packages.
+#
+# Copyright (C) 2015, the cclib development team
+#
+# The library is free software, distributed under the terms of
+# the GNU Lesser General Public version 2.1 or later. You should have
+# received a copy of the license along with cclib. You can also access
+# the full license online at http://www.gnu.org/copyleft/lgpl.html.
+
+"""Unit tests for the cache module."""
+
+import logging
+import mmap
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from cclib.parser import ccData
+from cclib.parser import ccread
+from cclib.parser import GAMESS
+from cclib.parser import ParseCache
+
+
+__filedir__ = os.path.dirname(os.path.realpath(__file__))
+__datadir__ = os.path.join(__filedir__, "..", "data")
+
+
+class ParseCacheTest(unittest.TestCase):
+    """Unit tests for the ParseCache class."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.cache = ParseCache(os.path.join(self.tmpdir, "cache"))
+        self.path = os.path.join(self.tmpdir, "dvb_sp.out")
+        shutil.copy(os.path.join(__datadir__, "GAMESS", "basicGAMESS-US2012", "dvb_sp.out"), self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def parse(self, attributes=None):
+        return self.cache.parse(GAMESS(self.path, loglevel=logging.ERROR), attributes=attributes)
+
+    def entries(self):
+        return [name for name in os.listdir(self.cache.directory) if name.endswith(self.cache.suffix)]
+
+    def test_hit(self):
+        """Is the data loaded from the cache the same as the data parsed?"""
+
+        parsed = self.parse()
+        self.assertEqual(len(self.entries()), 1)
+        cached = self.parse()
+        self.assertIsNot(cached, parsed)
+        self.assertEqual(cached.mocoeffs[0].tolist(), parsed.mocoeffs[0].tolist())
+        self.assertEqual(len(self.entries()), 1)
+
+    def test_changed(self):
+        """Is a logfile parsed again when it changes, or other attributes are requested?"""
+
+        self.parse()
+        self.parse(attributes=["natom"])
+        self.assertEqual(len(self.entries()), 2)
+        with open(self.path, "a") as handle:
+            handle.write("\n")
+        self.parse()
+        self.assertEqual(len(self.entries()), 3)
+
+    def test_evict(self):
+        """Are the least recently used entries removed when the cache is too big?"""
+
+        self.parse()
+        self.cache.maxsize = os.path.getsize(os.path.join(self.cache.directory, self.entries()[0]))
+        self.parse(attributes=["natom"])
+        self.assertEqual(len(self.entries()), 1)
+
+    def test_ccread(self):
+        """Can ccread use a cache directory?"""
+
+        data = ccread(self.path, verbose=False, loglevel=logging.ERROR, cache=self.cache.directory)
+        self.assertEqual(data.natom, 20)
+        self.assertEqual(len(self.entries()), 1)
+
+    def test_mapped(self):
+        """Are the arrays of cached data mapped from the entry?"""
+
+        parsed = self.parse()
+        cached = self.parse()
+        self.assertIsInstance(cached.mocoeffs[0].base, mmap.mmap)
+        self.assertEqual(cached.mocoeffs[0].tolist(), parsed.mocoeffs[0].tolist())
+        self.assertRaises(ValueError, self.cache.parse, GAMESS(self.path), lazy=True)
+
+    def test_digest(self):
+        """Are the contents hashed only if a logfile changed shortly before it was parsed?"""
+
+        # Whole seconds are kept the same when the modification time is set.
+        now = int(time.time())
+        os.utime(self.path, (now, now))
+        self.parse()
+        with open(self.path, "r+b") as handle:
+            handle.seek(-2, os.SEEK_END)
+            handle.write(b"!\n")
+        os.utime(self.path, (now, now))
+        self.parse()
+        self.assertEqual(len(self.entries()), 1)
+        self.assertEqual(self.cache.load(self.cache.key(GAMESS(self.path)), ccData)["digest"],
+                         self.cache.digest(GAMESS(self.path)))
+
+        os.utime(self.path, (now - 10, now - 10))
+        self.parse()
+        self.cache.digest = None
+        self.assertEqual(self.parse().natom, 20)
+
+
+tests = [ParseCacheTest]
+
+
+if __name__ == "__main__":
+    for test in tests:
+        unittest.TextTestRunner(verbosity=2).run(unittest.makeSuite(test))
@@ -0,0 +1,108 @@
+# This file is part of cclib (http://cclib.github.io), a library for parsing
+# and interpreting the results of computational chemistry packages.
+#
+# Copyright (C) 2015, the cclib development team
+#
+# The library is free software, distributed under the terms of
+# the GNU Lesser General Public version 2.1 or later. You should have
+# received a copy of the license along with cclib. You can also access
+# the full license online at http://www.gnu.org/copyleft/lgpl.html.
+
+"""Unit tests for the data module."""
+
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy
+
+from cclib.parser import ccData
+from cclib.parser import GAMESS
+from cclib.parser import utils
+
+
+__filedir__ = os.path.dirname(os.path.realpath(__file__))
+__datadir__ = os.path.join(__filedir__, "..", "data")
+
+
+class SaveLoadTest(unittest.TestCase):
+    """Unit tests for saving and loading data objects."""
+
+    def setUp(self):
+        path = os.path.join(__datadir__, "GAMESS", "basicGAMESS-US2012", "dvb_sp.out")
+        self.data = GAMESS(path, loglevel=logging.ERROR).parse()
+        self.data.scanparm = [(1.0, "a"), (2.0, "b")]
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "dvb_sp.ccdata")
+        self.data.save(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def check(self, loaded):
+        for attr in self.data._attrlist:
+            if not hasattr(self.data, attr):
+                self.assertFalse(hasattr(loaded, attr))
+                continue
+            value = getattr(self.data, attr)
+            if isinstance(value, numpy.ndarray):
+                self.assertEqual(loaded.__dict__[attr].dtype, value.dtype)
+                numpy.testing.assert_array_equal(getattr(loaded, attr), value)
+            elif isinstance(value, list) and isinstance(value[0], numpy.ndarray):
+                for array, expected in zip(getattr(loaded, attr), value):
+                    numpy.testing.assert_array_equal(array, expected)
+            elif isinstance(value, dict):
+                for key in value:
+                    numpy.testing.assert_array_equal(getattr(loaded, attr)[key], value[key])
+            else:
+                self.assertEqual(getattr(loaded, attr), value)
+
+    def test_read(self):
+        """Are all attributes the same after loading without memory maps?"""
+
+        self.check(ccData.load(self.path, mmap=False))
+
+    def test_mmap(self):
+        """Are all attributes the same after loading with memory maps, and can they change?"""
+
+        loaded = ccData.load(self.path)
+        self.check(loaded)
+        loaded.mocoeffs[0][0, 0] = 42.0
+        self.check(ccData.load(self.path))
+
+    def test_npz(self):
+        """Can the file be read by numpy.load?"""
+
+        arrays = numpy.load(self.path)
+        numpy.testing.assert_array_equal(arrays["mocoeffs/0"], self.data.mocoeffs[0])
+
+
+class ArrayifyTest(unittest.TestCase):
+    """Unit tests for converting attributes to arrays."""
+
+    def test_framebuffer(self):
+        """Does a buffer of frames become a view of its array, without a copy?"""
+
+        data = ccData()
+        data.atomcoords = utils.FrameBuffer()
+        for step in range(10):
+            data.atomcoords.append(numpy.ones((3, 3)) * step)
+        data.arrayify()
+        self.assertIsInstance(data.atomcoords, numpy.ndarray)
+        self.assertEqual(data.atomcoords.shape, (10, 3, 3))
+        self.assertEqual(data.atomcoords[9, 0, 0], 9.0)
+        self.assertIsNotNone(data.atomcoords.base)
+
+        atomcoords = data.atomcoords
+        data.arrayify()
+        self.assertIs(data.atomcoords, atomcoords)
+
+
+tests = [SaveLoadTest, ArrayifyTest]
+
+
+if __name__ == "__main__":
+    for test in tests:
+        unittest.TextTestRunner(verbosity=2).run(unittest.makeSuite(test))
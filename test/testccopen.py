@@ -0,0 +1,280 @@
+# This file is part of cclib (http://cclib.github.io), a library for parsing
+# and interpreting the results of computational chemistry packages.
+#
+# Copyright (C) 2015, the cclib development team
+#
+# The library is free software, distributed under the terms of
+# the GNU Lesser General Public version 2.1 or later. You should have
+# received a copy of the license along with cclib. You can also access
+# the full license online at http://www.gnu.org/copyleft/lgpl.html.
+
+"""Unit tests for the ccopen module."""
+
+import gzip
+import logging
+import os
+import shutil
+import subprocess
+import tarfile
+import tempfile
+import unittest
+import zipfile
+
+from cclib.parser import ccopen
+from cclib.parser import ccread
+from cclib.parser import ccread_archive
+from cclib.parser import ccread_many
+from cclib.parser import ccsniff
+from cclib.parser import ccstatus
+from cclib.parser import iter_frames
+from cclib.parser import GAMESS
+from cclib.parser import GAMESSUK
+from cclib.parser import ParseTimeout
+from cclib.parser import logfileparser
+from cclib.parser.ccopen import sniff_filetype
+from cclib.writer import write_frames
+
+
+__filedir__ = os.path.dirname(os.path.realpath(__file__))
+__datadir__ = os.path.join(__filedir__, "..", "data")
+
+
+class CcopenTest(unittest.TestCase):
+    """Unit tests for the ccopen function."""
+
+    path = os.path.join(__datadir__, "GAMESS", "basicGAMESS-US2012", "dvb_sp.out")
+
+    def test_sniff(self):
+        """Is the end of a logfile searched only when its start is ambiguous?"""
+
+        filler = b"filler\n" * 100
+        raw = b" GAMESS\n" + filler + b" G A M E S S - U K\n" + filler
+        self.assertEqual(sniff_filetype(logfileparser.FileWrapper(raw)), (GAMESSUK, 1.0))
+        self.assertEqual(sniff_filetype(logfileparser.FileWrapper(raw), limit=100), (GAMESS, 0.5))
+        self.assertEqual(sniff_filetype(logfileparser.FileWrapper(raw + filler), limit=100), (GAMESS, 0.5))
+        self.assertEqual(sniff_filetype(logfileparser.FileWrapper(filler)), (None, 0.0))
+        self.assertEqual(sniff_filetype(raw.decode().splitlines(True), limit=100), (GAMESS, 0.5))
+
+    def test_opened(self):
+        """Is a logfile opened for guessing its type read again by the parser?"""
+
+        log = ccopen(self.path, loglevel=logging.ERROR)
+        opened = log._opened
+        data = log.parse()
+        self.assertFalse(hasattr(log, "_opened"))
+        self.assertEqual(opened.pos, os.path.getsize(self.path))
+        self.assertEqual(data.scfenergies.tolist(), log.parse().scfenergies.tolist())
+
+    def test_opened_refresh(self):
+        """Is a logfile opened for guessing its type closed when it is followed instead?"""
+
+        log = ccopen(self.path, loglevel=logging.ERROR)
+        opened = log._opened
+        data = log.refresh()
+        self.assertFalse(hasattr(log, "_opened"))
+        # A closed mmap has no closed attribute in Python 2, but cannot be read.
+        self.assertRaises(ValueError, opened.buffer.__getitem__, slice(0, 1))
+        self.assertEqual(data.scfenergies.tolist(), ccread(self.path, verbose=False).scfenergies.tolist())
+
+    def test_pipe(self):
+        """Is a logfile read from a pipe parsed after its type is guessed?"""
+
+        expected = ccread(self.path, verbose=False, loglevel=logging.ERROR)
+        process = subprocess.Popen(["cat", self.path], stdout=subprocess.PIPE)
+        log = ccopen(process.stdout, loglevel=logging.ERROR)
+        self.assertEqual(log.logname, "GAMESS")
+        data = log.parse()
+        process.stdout.close()
+        process.wait()
+        self.assertEqual(data.scfenergies.tolist(), expected.scfenergies.tolist())
+        self.assertEqual(data.mocoeffs[0].tolist(), expected.mocoeffs[0].tolist())
+
+    def test_text_stream(self):
+        """Is a text stream parsed from the start after its type is guessed?"""
+
+        expected = ccread(self.path, verbose=False, loglevel=logging.ERROR)
+        with open(self.path) as handle:
+            log = ccopen(handle, loglevel=logging.ERROR)
+            data = log.parse()
+        self.assertEqual(data.scfenergies.tolist(), expected.scfenergies.tolist())
+
+    def test_sniff_job(self):
+        """Are the program, method, basis and job types read from headers?"""
+
+        jobs = [
+            ("GAMESS", "basicGAMESS-US2012", "dvb_sp.out", "b3lyp", ["sp"]),
+            ("Gaussian", "basicGaussian09", "dvb_gopt.out", "b3lyp", ["opt"]),
+            ("NWChem", "basicNWChem6.5", "dvb_sp_hf.out", "hf", ["sp"]),
+            ("ORCA", "basicORCA3.0", "dvb_ir.out", "b3lyp", ["freq"]),
+            ("QChem", "basicQChem4.2", "dvb_td.out", "b3lyp", ["td"]),
+        ]
+        for program, folder, name, method, jobtypes in jobs:
+            path = os.path.join(__datadir__, program, folder, name)
+            record = ccsniff(path, loglevel=logging.ERROR)
+            self.assertEqual(record["program"], program)
+            self.assertEqual(record["method"], method)
+            self.assertEqual(record["basis"], "sto-3g")
+            self.assertEqual(record["jobtypes"], jobtypes)
+            self.assertEqual((record["charge"], record["mult"]), (0, 1))
+
+        log = ccopen(self.path, loglevel=logging.ERROR)
+        self.assertIsNone(log.sniff(limit=100)["method"])
+
+    def test_status(self):
+        """Is the status of a job the same from its end, archive entry or compressed file?"""
+
+        path = os.path.join(__datadir__, "Gaussian", "basicGaussian09", "dvb_gopt.out")
+        data = ccread(path, verbose=False, loglevel=logging.ERROR, attributes=["scfenergies", "atomcoords"])
+        tmpdir = tempfile.mkdtemp()
+        try:
+            compressed = os.path.join(tmpdir, "dvb_gopt.out.gz")
+            with open(path, "rb") as handle, gzip.open(compressed, "wb") as output:
+                output.write(handle.read())
+            for source in (path, compressed):
+                status = ccstatus(source, loglevel=logging.ERROR)
+                self.assertTrue(status["terminated"])
+                self.assertAlmostEqual(status["scfenergy"], data.scfenergies[-1], 4)
+                self.assertEqual(status["atomcoords"].tolist(), data.atomcoords[-1].tolist())
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_status_orientation(self):
+        """Is the geometry in the status in the standard orientation, or else left out?"""
+
+        for name in ("dvb_ir.out", "Mo4OCl4-sp.log"):
+            path = os.path.join(__datadir__, "Gaussian", "basicGaussian09", name)
+            data = ccread(path, verbose=False, loglevel=logging.ERROR, attributes=["atomcoords"])
+            status = ccstatus(path, loglevel=logging.ERROR)
+            self.assertEqual(status["atomcoords"].tolist(), data.atomcoords[-1].tolist())
+            self.assertIsNone(ccopen(path, loglevel=logging.ERROR).status(limit=2**12)["atomcoords"])
+
+    def test_max_memory(self):
+        """Is the memory budget passed on by ccread, and refused with lazy parsing?"""
+
+        data = ccread(self.path, verbose=False, loglevel=logging.ERROR, max_memory=40000)
+        self.assertEqual(data.memory_actions["mocoeffs"][0], "skipped")
+        self.assertRaises(ValueError, ccread, self.path, verbose=False, max_memory=40000, lazy=True)
+
+    def test_frames(self):
+        """Are the frames of an optimization written to an extended XYZ file one by one?"""
+
+        path = os.path.join(__datadir__, "Gaussian", "basicGaussian09", "dvb_gopt.out")
+        data = ccread(path, verbose=False, loglevel=logging.ERROR)
+        tmpdir = tempfile.mkdtemp()
+        try:
+            output = os.path.join(tmpdir, "dvb_gopt.xyz")
+            written = write_frames(iter_frames(path, loglevel=logging.ERROR), output, extended=True)
+            with open(output) as handle:
+                lines = handle.read().splitlines()
+        finally:
+            shutil.rmtree(tmpdir)
+        self.assertEqual(written, len(lines) // (data.natom + 2))
+        self.assertEqual(written, len(data.atomcoords))
+        self.assertTrue(lines[1].startswith("Properties=species:S:1:pos:R:3:grads:R:3 step=1"))
+        self.assertAlmostEqual(float(lines[1].split("energy=")[1].split()[0]), data.scfenergies[0], 6)
+        self.assertEqual([float(x) for x in lines[2].split()[1:4]], data.atomcoords[0][0].tolist())
+        self.assertEqual(len(lines[2].split()), 7)
+        self.assertIsNone(iter_frames(os.path.join(__filedir__, "dvb_sp.mbo")))
+
+    def test_frames_coords(self):
+        """Is there a frame for each geometry in the data, even if it is printed after the energies?"""
+
+        paths = [
+            os.path.join(__datadir__, "Gaussian", "basicGaussian03", "dvb_gopt.out"),
+            os.path.join(__datadir__, "Gaussian", "basicGaussian09", "dvb_gopt.out"),
+            os.path.join(__datadir__, "QChem", "basicQChem4.2", "dvb_raman.out"),
+        ]
+        for path in paths:
+            data = ccread(path, verbose=False, loglevel=logging.ERROR)
+            frames = list(iter_frames(path, loglevel=logging.ERROR))
+            self.assertEqual(len(frames), len(data.atomcoords))
+            self.assertEqual([frame.coords.tolist() for frame in frames], data.atomcoords.tolist())
+
+
+class CcreadManyTest(unittest.TestCase):
+    """Unit tests for the ccread_many function."""
+
+    paths = [
+        os.path.join(__datadir__, "GAMESS", "basicGAMESS-US2012", "dvb_sp.out"),
+        os.path.join(__datadir__, "QChem", "basicQChem4.2", "dvb_sp.out"),
+        os.path.join(__datadir__, "ORCA", "basicORCA3.0", "dvb_sp.out"),
+        os.path.join(__filedir__, "dvb_sp.mbo"),
+    ]
+
+    def test_ordered(self):
+        """Are the results the same as from ccread, in the order of the paths?"""
+
+        results = list(ccread_many(self.paths, workers=2, ordered=True, loglevel=logging.ERROR))
+        self.assertEqual([path for path, result in results], self.paths)
+        for path, result in results[:-1]:
+            data = ccread(path, verbose=False, loglevel=logging.ERROR)
+            self.assertEqual(result.scfenergies.tolist(), data.scfenergies.tolist())
+        self.assertIsInstance(results[-1][1], ValueError)
+
+    def test_unordered(self):
+        """Is a result yielded for every path with small chunks and recycled workers?"""
+
+        results = ccread_many(self.paths, workers=2, chunksize=1, recycle=1, loglevel=logging.ERROR)
+        self.assertEqual(sorted(path for path, result in results), sorted(self.paths))
+
+    def test_timeout(self):
+        """Is an error returned for files that take too long to parse?"""
+
+        results = ccread_many(self.paths[:1] * 20, workers=1, timeout=1e-3, loglevel=logging.ERROR)
+        for path, result in results:
+            self.assertIsInstance(result, ParseTimeout)
+
+    def test_missing(self):
+        """Is a file that does not exist reported as such?"""
+
+        results = list(ccread_many([os.path.join(__filedir__, "missing.out")], workers=1))
+        self.assertIsInstance(results[0][1], EnvironmentError)
+
+
+class CcreadArchiveTest(unittest.TestCase):
+    """Unit tests for the ccread_archive function."""
+
+    paths = CcreadManyTest.paths
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.names = ["%d/%s" % (i, os.path.basename(path)) for i, path in enumerate(self.paths)]
+        self.archives = [os.path.join(self.tmpdir, "logs.tar.gz"), os.path.join(self.tmpdir, "logs.zip")]
+        with tarfile.open(self.archives[0], "w:gz") as archive:
+            for path, name in zip(self.paths, self.names):
+                archive.add(path, name)
+        with zipfile.ZipFile(self.archives[1], "w", zipfile.ZIP_DEFLATED) as archive:
+            for path, name in zip(self.paths, self.names):
+                archive.write(path, name)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def check(self, results):
+        self.assertEqual([name for name, result in results], self.names)
+        for path, (name, result) in zip(self.paths[:-1], results):
+            data = ccread(path, verbose=False, loglevel=logging.ERROR)
+            self.assertEqual(result.scfenergies.tolist(), data.scfenergies.tolist())
+        self.assertIsInstance(results[-1][1], ValueError)
+
+    def test_stream(self):
+        """Are the files in archives streamed into parsers one by one?"""
+
+        for archive in self.archives:
+            self.check(list(ccread_archive(archive, workers=1, loglevel=logging.ERROR)))
+
+    def test_workers(self):
+        """Are the files in archives parsed by a pool of processes?"""
+
+        for archive in self.archives:
+            self.check(list(ccread_archive(archive, workers=2, ordered=True, loglevel=logging.ERROR)))
+            results = ccread_archive(archive, workers=2, loglevel=logging.ERROR)
+            self.assertEqual(sorted(name for name, result in results), sorted(self.names))
+
+
+tests = [CcopenTest, CcreadManyTest, CcreadArchiveTest]
+
+
+if __name__ == "__main__":
+    for test in tests:
+        unittest.TextTestRunner(verbosity=2).run(unittest.makeSuite(test))
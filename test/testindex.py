@@ -0,0 +1,105 @@
+# This file is part of cclib (http://cclib.github.io), a library for parsing
+# and interpreting the results of computational chemistry packages.
+#
+# Copyright (C) 2015, the cclib development team
+#
+# The library is free software, distributed under the terms of
+# the GNU Lesser General Public version 2.1 or later. You should have
+# received a copy of the license along with cclib. You can also access
+# the full license online at http://www.gnu.org/copyleft/lgpl.html.
+
+"""Unit tests for the index module."""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy
+
+from cclib.parser import ccread
+from cclib.parser import GAMESS
+from cclib.parser import SectionIndex
+
+
+__filedir__ = os.path.dirname(os.path.realpath(__file__))
+__datadir__ = os.path.join(__filedir__, "..", "data")
+
+
+class SectionIndexTest(unittest.TestCase):
+    """Unit tests for the SectionIndex class."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.index = SectionIndex()
+        self.path = os.path.join(self.tmpdir, "dvb_sp.out")
+        shutil.copy(os.path.join(__datadir__, "GAMESS", "basicGAMESS-US2012", "dvb_sp.out"), self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def parse(self, attributes=None):
+        return self.index.parse(GAMESS(self.path, loglevel=logging.ERROR), attributes=attributes)
+
+    def test_same(self):
+        """Is the data parsed with an index the same as without it, for any attributes?"""
+
+        for attributes in (None, ["scfenergies"], ["mocoeffs", "natom"]):
+            parser = GAMESS(self.path, loglevel=logging.ERROR)
+            expected = parser.parse(attributes=attributes)
+            for i in range(2):
+                data = self.parse(attributes=attributes)
+                self.assertEqual(sorted(data.__dict__), sorted(expected.__dict__))
+                self.assertEqual(data.scfenergies.tolist(), expected.scfenergies.tolist())
+                if attributes != ["scfenergies"]:
+                    self.assertEqual(data.mocoeffs[0].tolist(), expected.mocoeffs[0].tolist())
+            self.assertTrue(os.path.exists(self.index.path(self.path)))
+
+    def test_changed(self):
+        """Is the index written again when the logfile or the phrases change?"""
+
+        self.parse()
+        log = GAMESS(self.path, loglevel=logging.ERROR)
+        self.assertIsNotNone(self.index.load(log))
+        log.section_triggers = log.section_triggers + ["NEW PHRASE"]
+        self.assertIsNone(self.index.load(log))
+        with open(self.path, "a") as handle:
+            handle.write(" NEW PHRASE\n")
+        self.assertIsNone(self.index.load(GAMESS(self.path, loglevel=logging.ERROR)))
+
+        self.index.parse(log)
+        offsets, phrases = self.index.load(log)
+        self.assertEqual(offsets[-1], os.path.getsize(self.path) - len(" NEW PHRASE\n"))
+        self.assertEqual(phrases[-1], len(log.section_triggers) - 1)
+
+    @unittest.skipIf(getattr(os, "geteuid", lambda: -1)() == 0, "directories are always writable by root")
+    def test_readonly(self):
+        """Is a logfile still parsed when its index cannot be written?"""
+
+        os.chmod(self.tmpdir, 0o555)
+        try:
+            data = self.parse(attributes=["natom"])
+        finally:
+            os.chmod(self.tmpdir, 0o755)
+        self.assertEqual(data.natom, 20)
+        self.assertFalse(os.path.exists(self.index.path(self.path)))
+
+    def test_ccread(self):
+        """Can ccread write and use an index?"""
+
+        data = ccread(self.path, verbose=False, loglevel=logging.ERROR, index=True)
+        self.assertEqual(data.natom, 20)
+        with numpy.load(self.index.path(self.path)) as archive:
+            header = json.loads(str(archive["header"]))
+        self.assertEqual(header["parser"], "GAMESS")
+        self.assertEqual(header["size"], os.path.getsize(self.path))
+
+
+tests = [SectionIndexTest]
+
+
+if __name__ == "__main__":
+    for test in tests:
+        unittest.TextTestRunner(verbosity=2).run(unittest.makeSuite(test))
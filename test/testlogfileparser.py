@@ -0,0 +1,509 @@
+# This file is part of cclib (http://cclib.github.io), a library for parsing
+# and interpreting the results of computational chemistry packages.
+#
+# Copyright (C) 2015, the cclib development team
+#
+# The library is free software, distributed under the terms of
+# the GNU Lesser General Public version 2.1 or later. You should have
+# received a copy of the license along with cclib. You can also access
+# the full license online at http://www.gnu.org/copyleft/lgpl.html.
+
+"""Unit tests for the logfileparser module."""
+
+import bz2
+import gzip
+import io
+import logging
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import unittest
+
+import numpy
+
+from cclib.parser import logfileparser
+from cclib.parser import GAMESS
+from cclib.parser import Gaussian
+from cclib.parser import ccread
+
+
+__filedir__ = os.path.dirname(os.path.realpath(__file__))
+__datadir__ = os.path.join(__filedir__, "..", "data")
+
+
+class FileWrapperTest(unittest.TestCase):
+    """Unit tests for the FileWrapper class."""
+
+    def test_lines_and_pos(self):
+        """Are lines the same as in text mode, with pos at byte offsets?"""
+
+        # This logfile has Windows line endings.
+        path = os.path.join(__datadir__, "Gaussian", "basicGaussian03", "dvb_un_sp.out")
+        with io.open(path, "r", errors="ignore") as handle:
+            expected = handle.readlines()
+        with open(path, "rb") as handle:
+            raw = handle.read()
+
+        for blocksize in (logfileparser.FileWrapper.blocksize, 100):
+            wrapper = logfileparser.FileWrapper(io.open(path, "rb"))
+            wrapper.blocksize = blocksize
+            lines = []
+            for line in wrapper:
+                lines.append(line)
+                self.assertIn(raw[wrapper.pos-1:wrapper.pos], (b"\n", b"\r"))
+            wrapper.close()
+            self.assertEqual(lines, expected)
+            self.assertEqual(wrapper.pos, len(raw))
+
+    def test_buffers(self):
+        """Can raw bytes be wrapped directly?"""
+
+        raw = b"first\r\nsecond\rthird \xc3\xa9\nlast"
+        expected = ["first\n", "second\n", b"third \xc3\xa9\n".decode("utf-8"), "last"]
+        for source in (raw, bytearray(raw), memoryview(raw)):
+            wrapper = logfileparser.FileWrapper(source)
+            self.assertEqual(wrapper.size, len(raw))
+            self.assertEqual(list(wrapper), expected)
+            self.assertEqual(wrapper.pos, len(raw))
+
+    def test_seek(self):
+        """Does seeking discard buffered lines?"""
+
+        wrapper = logfileparser.FileWrapper(b"one\ntwo\nthree\n")
+        self.assertEqual(next(wrapper), "one\n")
+        wrapper.seek(0, 2)
+        self.assertEqual(list(wrapper), [])
+        wrapper.seek(4)
+        self.assertEqual(list(wrapper), ["two\n", "three\n"])
+
+    def test_history(self):
+        """Can a file that cannot seek go back to the start once, if its history is kept?"""
+
+        raw = b"one\ntwo\nthree\n"
+        archive = io.BytesIO()
+        with tarfile.open(fileobj=archive, mode="w") as tar:
+            info = tarfile.TarInfo("raw")
+            info.size = len(raw)
+            tar.addfile(info, io.BytesIO(raw))
+        archive.seek(0)
+        with tarfile.open(fileobj=archive, mode="r|") as tar:
+            info = tar.next()
+            wrapper = logfileparser.FileWrapper(tar.extractfile(info), size=info.size)
+            self.assertFalse(wrapper.seekable())
+            wrapper.history = []
+            self.assertEqual(next(wrapper), "one\n")
+            wrapper.seek(0)
+            self.assertIsNone(wrapper.history)
+            self.assertEqual(list(wrapper), ["one\n", "two\n", "three\n"])
+            self.assertEqual(wrapper.pos, len(raw))
+
+    def test_pipe(self):
+        """Can a pipe be read, with no size, and go back to the start once?"""
+
+        path = os.path.join(__datadir__, "GAMESS", "basicGAMESS-US2012", "dvb_sp.out")
+        expected = list(logfileparser.openlogfile(path))
+        process = subprocess.Popen(["cat", path], stdout=subprocess.PIPE)
+        wrapper = logfileparser.FileWrapper(process.stdout)
+        self.assertFalse(wrapper.seekable())
+        self.assertIsNone(wrapper.size)
+        wrapper.history = []
+        for i in range(100):
+            next(wrapper)
+        wrapper.seek(0)
+        self.assertEqual(list(wrapper), expected)
+        self.assertEqual(wrapper.progress_pos(), os.path.getsize(path))
+        wrapper.close()
+        process.wait()
+
+    def test_skip_to(self):
+        """Does skip_to return only the lines matching the triggers?"""
+
+        regex = logfileparser.compile_triggers(("SCF Done", "(?i)step"))
+        raw = b"header\n SCF Done: -1.0\nfiller\n STEP 2\n Step 3\nend\n"
+        for blocksize in (logfileparser.FileWrapper.blocksize, 8):
+            wrapper = logfileparser.FileWrapper(raw)
+            wrapper.blocksize = blocksize
+            lines = list(iter(lambda: wrapper.skip_to(regex), None))
+            self.assertEqual(lines, [" SCF Done: -1.0\n", " STEP 2\n", " Step 3\n"])
+            self.assertEqual(wrapper.pos, len(raw))
+
+        wrapper = logfileparser.FileWrapper(raw)
+        self.assertEqual(wrapper.skip_to(regex, 20), " SCF Done: -1.0\n")
+        self.assertIsNone(wrapper.skip_to(regex, 20))
+        self.assertEqual(next(wrapper), " STEP 2\n")
+
+    def test_tail(self):
+        """Is the end of the input read backwards when possible, and forwards otherwise?"""
+
+        raw = b"".join(b"line %d\n" % i for i in range(1000))
+        process = subprocess.Popen(["printf", "%s", raw.decode()], stdout=subprocess.PIPE)
+        wrappers = [logfileparser.FileWrapper(raw), logfileparser.FileWrapper(io.BytesIO(raw))]
+        wrappers.append(logfileparser.FileWrapper(process.stdout))
+        for wrapper, tailed in zip(wrappers, (True, True, False)):
+            wrapper.blocksize = 100
+            self.assertEqual(wrapper.tailed(), tailed)
+            self.assertEqual(wrapper.tail(30), raw[-30:])
+        for wrapper in wrappers[:2]:
+            next(wrapper)
+            self.assertEqual(wrapper.tail(10**6), raw)
+            self.assertEqual(next(wrapper), "line 1\n")
+        process.wait()
+
+    def test_compressed(self):
+        """Are compressed files recognized by their first bytes and read like plain files?"""
+
+        path = os.path.join(__datadir__, "GAMESS", "basicGAMESS-US2012", "dvb_sp.out")
+        with open(path, "rb") as handle:
+            raw = handle.read()
+        expected = list(logfileparser.openlogfile(path))
+        half = raw.rfind(b"\n", 0, len(raw) // 2) + 1
+        # A gzip file with two members, written without gzip.compress for Python 2.
+        members = io.BytesIO()
+        for part in (raw[:half], raw[half:]):
+            with gzip.GzipFile(fileobj=members, mode="wb") as member:
+                member.write(part)
+        compressed = [members.getvalue(), bz2.compress(raw)]
+        if logfileparser.lzma is not None:
+            compressed.append(logfileparser.lzma.compress(raw))
+
+        tmpdir = tempfile.mkdtemp()
+        try:
+            for i, contents in enumerate(compressed):
+                path = os.path.join(tmpdir, "dvb_sp%d.out" % i)
+                with open(path, "wb") as handle:
+                    handle.write(contents)
+                wrapper = logfileparser.openlogfile(path)
+                self.assertEqual(wrapper.size, len(contents))
+                self.assertEqual(list(wrapper), expected)
+                self.assertEqual(wrapper.pos, len(raw))
+                # Before Python 3.3, bzip2 files are read by name, so progress is not known.
+                if i != 1 or sys.version_info >= (3, 3):
+                    self.assertEqual(wrapper.progress_pos(), len(contents))
+                wrapper.seek(0)
+                next(wrapper)
+                wrapper.seek(0, 2)
+                self.assertEqual(wrapper.pos, len(raw))
+                wrapper.close()
+        finally:
+            shutil.rmtree(tmpdir)
+
+
+class LogfileTest(unittest.TestCase):
+    """Unit tests for the Logfile class."""
+
+    path = os.path.join(__datadir__, "GAMESS", "basicGAMESS-US2012", "dvb_sp.out")
+
+    def parse(self, attributes=None):
+        return GAMESS(self.path, loglevel=logging.ERROR).parse(attributes=attributes)
+
+    def test_attributes(self):
+        """Are sections skipped when their attributes are not requested?"""
+
+        full = self.parse()
+        parser = GAMESS(self.path, loglevel=logging.ERROR)
+        data = parser.parse(attributes=["scfenergies"])
+        self.assertEqual(data.scfenergies.tolist(), full.scfenergies.tolist())
+        self.assertFalse(hasattr(data, "mocoeffs"))
+        self.assertIn("mocoeffs", parser.skipped_attributes)
+        self.assertNotIn("scfenergies", parser.skipped_attributes)
+
+    def test_final_attributes(self):
+        """Does parsing stop once all requested attributes are final?"""
+
+        data = self.parse(attributes=["natom", "nbasis"])
+        self.assertEqual(data.natom, 20)
+        self.assertEqual(data.nbasis, 60)
+        self.assertFalse(hasattr(data, "scfenergies"))
+
+    def test_lazy(self):
+        """Are lazy attributes parsed only when accessed, and the same as otherwise?"""
+
+        full = self.parse()
+        data = GAMESS(self.path, loglevel=logging.ERROR).parse(lazy=True)
+        self.assertEqual(list(data._lazy), ["aooverlaps"])
+        self.assertTrue(data.hasattribute("aooverlaps"))
+        self.assertNotIn("aooverlaps", data.__dict__)
+        self.assertEqual(data.scfenergies.tolist(), full.scfenergies.tolist())
+        self.assertEqual(data.aooverlaps.tolist(), full.aooverlaps.tolist())
+        self.assertIn("aooverlaps", data.__dict__)
+
+        # Lazy attributes in the same sections as others are parsed right away.
+        self.assertIn("mocoeffs", data.__dict__)
+        self.assertIn("moenergies", data.__dict__)
+
+        data.evict()
+        self.assertNotIn("aooverlaps", data.__dict__)
+        unpickled = pickle.loads(pickle.dumps(data))
+        self.assertNotIn("aooverlaps", unpickled.__dict__)
+        self.assertEqual(unpickled.aooverlaps.tolist(), full.aooverlaps.tolist())
+
+    def test_lazy_absent(self):
+        """Are attributes that the logfile does not have left out without parsing?"""
+
+        path = os.path.join(__datadir__, "GAMESS", "basicGAMESS-US2012", "dvb_ir.out")
+        data = GAMESS(path, loglevel=logging.ERROR).parse(lazy=True)
+        for name in ("nocoeffs", "nooccnos", "vibramans"):
+            self.assertFalse(data.hasattribute(name))
+        self.assertIn("vibfreqs", data.__dict__)
+        self.assertIn("vibirs", data.__dict__)
+        data._lazy = dict((name, None) for name in data._lazy)
+        self.assertFalse(hasattr(data, "nocoeffs"))
+
+    def test_max_memory(self):
+        """Are the largest attributes reduced or skipped when they do not fit in memory?"""
+
+        full = self.parse()
+        data = GAMESS(self.path, loglevel=logging.ERROR).parse(max_memory=2**30)
+        self.assertEqual(data.memory_actions, {})
+        self.assertEqual(data.mocoeffs[0].tolist(), full.mocoeffs[0].tolist())
+
+        # The overlaps and coefficients of dvb_sp take 28800 bytes each.
+        data = GAMESS(self.path, loglevel=logging.ERROR).parse(max_memory=50000)
+        self.assertEqual(data.memory_actions, {"mocoeffs": ("float32", 28800)})
+        self.assertEqual(data.mocoeffs[0].dtype, numpy.float32)
+        numpy.testing.assert_allclose(data.mocoeffs[0], full.mocoeffs[0], rtol=1e-6)
+        self.assertEqual(data.aooverlaps.tolist(), full.aooverlaps.tolist())
+
+        parser = GAMESS(self.path, loglevel=logging.ERROR)
+        data = parser.parse(max_memory=40000)
+        self.assertEqual(data.memory_actions["mocoeffs"], ("skipped", 28800))
+        self.assertFalse(hasattr(data, "mocoeffs"))
+        self.assertIn("mocoeffs", parser.skipped_attributes)
+        self.assertEqual(data.scfenergies.tolist(), full.scfenergies.tolist())
+
+        tmpdir = tempfile.mkdtemp()
+        try:
+            data = GAMESS(self.path, loglevel=logging.ERROR).parse(max_memory=1000, spill=tmpdir)
+            self.assertEqual(sorted(data.memory_actions), ["aooverlaps", "mocoeffs"])
+            self.assertEqual(data.mocoeffs[0].tolist(), full.mocoeffs[0].tolist())
+            self.assertIsInstance(data.aooverlaps.base, numpy.memmap)
+            self.assertEqual(len(os.listdir(tmpdir)), 2)
+            del data
+        finally:
+            shutil.rmtree(tmpdir)
+
+        self.assertRaises(ValueError, GAMESS(self.path).parse, lazy=True, max_memory=1000)
+
+    def test_memory_actions(self):
+        """Are actions only reported for attributes in sections that were found?"""
+
+        path = os.path.join(__datadir__, "GAMESS", "basicGAMESS-US2012", "C_bigbasis.out")
+        data = GAMESS(path, loglevel=logging.ERROR).parse(max_memory=10000)
+        self.assertEqual(sorted(data.memory_actions), ["aooverlaps", "mocoeffs"])
+
+        # Firefly prints the condition number of the overlap matrix, but not the matrix.
+        path = os.path.join(__datadir__, "GAMESS", "basicFirefly8.0", "dvb_td.out")
+        data = GAMESS(path, loglevel=logging.ERROR).parse(max_memory=10000)
+        self.assertEqual(data.memory_actions, {"mocoeffs": ("skipped", 28800)})
+
+    def test_iterparse(self):
+        """Are events yielded for each new entry and attribute, in the order of the logfile?"""
+
+        full = self.parse()
+        parser = GAMESS(self.path, loglevel=logging.ERROR)
+        events = list(parser.iterparse())
+        self.assertEqual([offset for name, value, offset in events],
+                         sorted(offset for name, value, offset in events))
+        energies = [value for name, value, offset in events if name == "scfenergies"]
+        self.assertEqual(energies, full.scfenergies.tolist())
+        values = dict((name, value) for name, value, offset in events)
+        self.assertEqual(values["natom"], 20)
+        self.assertEqual(values["mocoeffs"][0].tolist(), full.mocoeffs[0].tolist())
+        self.assertNotIn("_assigned", parser.__dict__)
+
+        events = GAMESS(self.path, loglevel=logging.ERROR).iterparse(attributes=["scfenergies"])
+        self.assertEqual(set(name for name, value, offset in events), set(["scfenergies"]))
+
+    def test_iterparse_window(self):
+        """Are only the last entries of a trajectory kept, with the same events?"""
+
+        path = os.path.join(__datadir__, "Gaussian", "basicGaussian09", "dvb_gopt.out")
+        full = list(Gaussian(path, loglevel=logging.ERROR).iterparse(attributes=["atomcoords"]))
+        parser = Gaussian(path, loglevel=logging.ERROR)
+        kept = []
+        coords = []
+        for name, value, offset in parser.iterparse(attributes=["atomcoords"], window=1):
+            if isinstance(value, slice):
+                coords = coords[value]
+                continue
+            kept.append(len(parser.atomcoords.array()))
+            self.assertEqual(value.tolist(), full[len(kept) - 1][1].tolist())
+            coords.append(value.tolist())
+        self.assertEqual(len(kept), len(full) - 1)
+        self.assertLessEqual(max(kept), 2)
+
+        # The last geometry is printed twice, so it is taken back at the end.
+        self.assertEqual(full[-1][1], slice(None, len(full) - 2))
+        self.assertEqual(coords, Gaussian(path, loglevel=logging.ERROR).parse().atomcoords.tolist())
+
+    def test_iterparse_restart(self):
+        """Is an event with None yielded when a parser starts the geometries again?"""
+
+        path = os.path.join(__datadir__, "GAMESS", "basicGAMESS-US2012", "dvb_gopt_a.out")
+        coords = []
+        for name, value, offset in GAMESS(path, loglevel=logging.ERROR).iterparse(attributes=["atomcoords"]):
+            if value is None:
+                coords = []
+            else:
+                coords.append(value.tolist())
+        self.assertEqual(coords, GAMESS(path, loglevel=logging.ERROR).parse().atomcoords.tolist())
+
+    def test_iterframes(self):
+        """Are the geometries of an optimization yielded with the energy of each step?"""
+
+        path = os.path.join(__datadir__, "Gaussian", "basicGaussian09", "dvb_gopt.out")
+        full = Gaussian(path, loglevel=logging.ERROR).parse()
+        frames = list(Gaussian(path, loglevel=logging.ERROR).iterframes(window=1))
+        self.assertEqual([frame.energy for frame in frames], full.scfenergies.tolist())
+        self.assertEqual([frame.coords.tolist() for frame in frames], full.atomcoords.tolist())
+        self.assertEqual(frames[0].grads.tolist(), full.grads[0].tolist())
+        self.assertEqual(frames[0].geovalues.tolist(), full.geovalues[0].tolist())
+        self.assertEqual(frames[-1].atomnos.tolist(), full.atomnos.tolist())
+
+    def test_workers(self):
+        """Are independent sections parsed in other processes, with the same data?"""
+
+        full = self.parse()
+        parser = GAMESS(self.path, loglevel=logging.ERROR)
+        data = parser.parse(workers=2)
+        self.assertEqual(sorted(data.getattributes()), sorted(full.getattributes()))
+        self.assertEqual(data.scfenergies.tolist(), full.scfenergies.tolist())
+        self.assertEqual(data.mocoeffs[0].tolist(), full.mocoeffs[0].tolist())
+        self.assertEqual(data.aooverlaps.tolist(), full.aooverlaps.tolist())
+        self.assertNotIn("mocoeffs", parser.skipped_attributes)
+
+        data = GAMESS(self.path, loglevel=logging.ERROR).parse(attributes=["mocoeffs"], workers=2)
+        self.assertEqual(data.mocoeffs[0].tolist(), full.mocoeffs[0].tolist())
+        self.assertFalse(hasattr(data, "aooverlaps"))
+
+    def test_independent_groups(self):
+        """Are sections sharing any attributes parsed together?"""
+
+        parser = Gaussian(self.path)
+        found = set(range(len(parser.section_triggers)))
+        groups = parser.independent_groups(found)
+        self.assertIn(["aonames", "atombasis", "mocoeffs", "nocoeffs", "nooccnos"], groups)
+        self.assertEqual(parser.independent_groups(found, ["mocoeffs"]),
+                         [["aonames", "atombasis", "mocoeffs", "nocoeffs", "nooccnos"]])
+
+    def test_status(self):
+        """Is the status of a job read from the end of the logfile, also while running?"""
+
+        full = self.parse()
+        raw = open(self.path, "rb").read()
+        status = GAMESS(self.path, loglevel=logging.ERROR).status()
+        self.assertTrue(status["terminated"])
+        self.assertEqual(status["scfenergy"], full.scfenergies[-1])
+        self.assertEqual(status["atomcoords"].tolist(), full.atomcoords[-1].tolist())
+
+        status = GAMESS(bytearray(raw[:len(raw) // 2]), loglevel=logging.ERROR).status()
+        self.assertFalse(status["terminated"])
+        self.assertIsNone(status["scfenergy"])
+        self.assertEqual(status["atomcoords"].tolist(), full.atomcoords[-1].tolist())
+
+    def test_refresh(self):
+        """Does following a growing logfile give the same data as parsing it?"""
+
+        full = self.parse()
+        raw = open(self.path, "rb").read()
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, "dvb_sp.out")
+            parser = GAMESS(path, loglevel=logging.ERROR)
+            for cut in (len(raw) // 3, 2 * len(raw) // 3, len(raw)):
+                with open(path, "wb") as handle:
+                    handle.write(raw[:cut])
+                data = parser.refresh()
+            self.assertEqual(data.natom, full.natom)
+            self.assertEqual(data.scfenergies.tolist(), full.scfenergies.tolist())
+            self.assertEqual(data.mocoeffs[0].tolist(), full.mocoeffs[0].tolist())
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_refresh_truncated(self):
+        """Is a logfile that was truncated or replaced while followed parsed again?"""
+
+        raw = open(self.path, "rb").read()
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, "dvb_sp.out")
+            parser = GAMESS(path, loglevel=logging.ERROR)
+            with open(path, "wb") as handle:
+                handle.write(raw)
+            parser.refresh()
+            with open(path, "wb") as handle:
+                handle.write(raw[:len(raw) // 2])
+            data = parser.refresh()
+            self.assertFalse(hasattr(data, "mocoeffs"))
+
+            # Another logfile that is larger is written in its place.
+            other = os.path.join(__datadir__, "GAMESS", "basicGAMESS-US2012", "dvb_un_sp.out")
+            full = GAMESS(other, loglevel=logging.ERROR).parse()
+            os.rename(path, path + ".1")
+            shutil.copy(other, path)
+            data = parser.refresh()
+            self.assertEqual(data.scfenergies.tolist(), full.scfenergies.tolist())
+            self.assertEqual(len(data.mocoeffs), 2)
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_refresh_stream(self):
+        """Can only a logfile given by name be followed?"""
+
+        parser = GAMESS(io.BytesIO(open(self.path, "rb").read()), loglevel=logging.ERROR)
+        self.assertRaises(ValueError, parser.refresh)
+
+
+class JobsTest(unittest.TestCase):
+    """Unit tests for parsing logfiles with several jobs."""
+
+    paths = [os.path.join(__datadir__, "Gaussian", "basicGaussian09", name)
+             for name in ("water_mp2.log", "dvb_sp.out")]
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "link1.log")
+        link = b" Link1:  Proceeding to internal job step number  2.\n"
+        with open(self.path, "wb") as handle:
+            handle.write(link.join(open(path, "rb").read() for path in self.paths))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def check(self, jobs):
+        self.assertEqual(len(jobs), 2)
+        for path, data in zip(self.paths, jobs):
+            full = Gaussian(path, loglevel=logging.ERROR).parse()
+            self.assertEqual(data.natom, full.natom)
+            self.assertEqual(data.scfenergies.tolist(), full.scfenergies.tolist())
+            self.assertEqual(data.atomcoords.tolist(), full.atomcoords.tolist())
+
+    def test_jobs(self):
+        """Is each job parsed into its own data object?"""
+
+        self.check(list(Gaussian(self.path, loglevel=logging.ERROR).parse_jobs()))
+        single = list(Gaussian(self.paths[0], loglevel=logging.ERROR).parse_jobs())
+        self.assertEqual(len(single), 1)
+
+    def test_workers(self):
+        """Are the jobs the same and in order when parsed in a pool of processes?"""
+
+        self.check(list(Gaussian(self.path, loglevel=logging.ERROR).parse_jobs(workers=2)))
+
+    def test_ccread(self):
+        """Does ccread yield the jobs with split_jobs?"""
+
+        self.check(list(ccread(self.path, split_jobs=True, verbose=False, loglevel=logging.ERROR)))
+        self.assertRaises(ValueError, ccread, self.path, split_jobs=True, lazy=True, verbose=False)
+
+
+tests = [FileWrapperTest, LogfileTest, JobsTest]
+
+
+if __name__ == "__main__":
+    for test in tests:
+        unittest.TextTestRunner(verbosity=2).run(unittest.makeSuite(test))
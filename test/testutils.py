@@ -0,0 +1,225 @@
+# This file is part of cclib (http://cclib.github.io), a library for parsing
+# and interpreting the results of computational chemistry packages.
+#
+# Copyright (C) 2015, the cclib development team
+#
+# The library is free software, distributed under the terms of
+# the GNU Lesser General Public version 2.1 or later. You should have
+# received a copy of the license along with cclib. You can also access
+# the full license online at http://www.gnu.org/copyleft/lgpl.html.
+
+"""Unit tests for the utils module."""
+
+import unittest
+
+import numpy
+
+from cclib.parser import utils
+
+
+class FortranFloatsTest(unittest.TestCase):
+    """Unit tests for the fortranfloats function."""
+
+    def test_formats(self):
+        """Are D exponents, exponents without an E, stars and blanks converted?"""
+
+        numbers = ["1.0", "-2.5D-01", "3.0d+2", "1.234-102", "-5.-3", "+4.5+101", "*******", "  ", "\n"]
+        values = utils.fortranfloats(numbers)
+        numpy.testing.assert_array_equal(values[:6], [1.0, -0.25, 300.0, 1.234e-102, -0.005, 4.5e101])
+        self.assertTrue(numpy.isnan(values[6:]).all())
+
+    def test_inputs(self):
+        """Are strings, bytes and arrays of bytes strings converted as well as lists?"""
+
+        expected = [1.0, -2.0, 0.03]
+        numpy.testing.assert_array_equal(utils.fortranfloats(" 1.0 -2.0\n  3.0D-02 "), expected)
+        numpy.testing.assert_array_equal(utils.fortranfloats(b"1.0 -2.0 3.0D-02"), expected)
+        numpy.testing.assert_array_equal(utils.fortranfloats(numpy.array([b"1.0", b"-2.0", b"3.0D-02"])), expected)
+        self.assertEqual(utils.fortranfloats([]).shape, (0,))
+
+    def test_strict(self):
+        """Is a ValueError raised for other text, unless it should become NaN?"""
+
+        self.assertRaises(ValueError, utils.fortranfloats, ["1.0", "abc"])
+        values = utils.fortranfloats(["1.0", "abc", "2.0-1x"], strict=False)
+        self.assertEqual(values[0], 1.0)
+        self.assertTrue(numpy.isnan(values[1:]).all())
+
+
+class ReadFieldsTest(unittest.TestCase):
+    """Unit tests for the readfields function."""
+
+    def test_fixed_width(self):
+        """Are fused negative numbers, D exponents, stars and blanks read in fixed-width fields?"""
+
+        lines = ["    1  C  1  S   -0.990409-10.0000000    1.0D-02\r\n",
+                 "    2  C  1  S ***********   0.500000\n",
+                 "    3  C  1  S  \n"]
+        fields = utils.readfields(lines, width=11, start=15)
+        self.assertEqual(fields.shape, (3, 3))
+        numpy.testing.assert_array_equal(fields[0], [-0.990409, -10.0, 0.01])
+        self.assertTrue(numpy.isnan(fields[1, 0]))
+        self.assertEqual(fields[1, 1], 0.5)
+        self.assertTrue(numpy.isnan(fields[1:, 2]).all())
+        self.assertTrue(numpy.isnan(fields[2]).all())
+
+    def test_free_format(self):
+        """Are numbers separated by whitespace or by minus signs read, but not exponents?"""
+
+        lines = ["   1    1.000000E+00-2.483624E-01", "   2   -5.0D-01   ****   3"]
+        fields = utils.readfields(lines, start=4, ncols=3)
+        numpy.testing.assert_array_equal(fields[0, :2], [1.0, -0.2483624])
+        self.assertTrue(numpy.isnan(fields[0, 2]))
+        self.assertEqual(fields[1, 0], -0.5)
+        self.assertTrue(numpy.isnan(fields[1, 1]))
+        self.assertEqual(fields[1, 2], 3.0)
+
+    def test_empty(self):
+        """Are no lines read into an empty array?"""
+
+        self.assertEqual(utils.readfields([], width=10).shape, (0, 0))
+        self.assertEqual(utils.readfields([]).shape, (0, 0))
+
+
+class ReadMatrixTest(unittest.TestCase):
+    """Unit tests for the readmatrix and readpage functions."""
+
+    def setUp(self):
+        self.matrix = numpy.arange(49, dtype="d").reshape(7, 7) / 10.0
+        self.symmetric = self.matrix + self.matrix.T
+
+    def pages(self, matrix, columns, triangular=False):
+        lines = []
+        for base in range(0, matrix.shape[1], columns):
+            first = base if triangular else 0
+            for i in range(first, matrix.shape[0]):
+                last = min(i + 1, base + columns) if triangular else base + columns
+                values = "".join("%10.2E" % x for x in matrix[i, base:last]).replace("E", "D")
+                lines.append("%5i%s\n" % (i + 1, values))
+        return lines
+
+    def test_square(self):
+        """Is a matrix printed in pages of columns put together again?"""
+
+        lines = self.pages(self.matrix[:, :6], 4)
+        matrix = utils.readmatrix(lines, 7, 4, width=10, start=5)
+        numpy.testing.assert_array_almost_equal(matrix, self.matrix[:, :6])
+        matrix = utils.readmatrix(lines, 7, 4, width=10, start=5, ncols=5)
+        numpy.testing.assert_array_almost_equal(matrix, self.matrix[:, :5])
+
+    def test_triangular(self):
+        """Is a lower triangle printed in pages of columns filled to a symmetric matrix?"""
+
+        for columns in (1, 3, 5, 7, 8):
+            lines = self.pages(self.symmetric, columns, triangular=True)
+            matrix = utils.readmatrix(lines, 7, columns, width=10, start=5, triangular=True)
+            numpy.testing.assert_array_almost_equal(matrix, self.symmetric)
+            matrix = utils.readmatrix(lines, 7, columns, start=5, triangular=True)
+            numpy.testing.assert_array_almost_equal(matrix, self.symmetric)
+
+    def test_readpage(self):
+        """Are pages read one at a time into a preallocated array, also through a view?"""
+
+        lines = self.pages(self.matrix, 3)
+        matrix = numpy.zeros((7, 7))
+        for page, base in enumerate(range(0, 7, 3)):
+            utils.readpage(matrix.T, lines[page * 7:(page + 1) * 7], base, 3, width=10, start=5)
+        numpy.testing.assert_array_almost_equal(matrix, self.matrix.T)
+
+        lines = self.pages(self.symmetric, 3, triangular=True)
+        matrix = numpy.zeros((7, 7))
+        utils.readpage(matrix, lines[:7], 0, 3, width=10, start=5, triangular=True)
+        numpy.testing.assert_array_almost_equal(matrix[:, :3], self.symmetric[:, :3])
+        numpy.testing.assert_array_almost_equal(matrix[:3], self.symmetric[:3])
+        self.assertFalse(matrix[3:, 3:].any())
+
+
+class FrameBufferTest(unittest.TestCase):
+    """Unit tests for the FrameBuffer class."""
+
+    def test_append(self):
+        """Are frames appended past the initial size, and read back by index?"""
+
+        frames = utils.FrameBuffer()
+        for step in range(100):
+            frames.append([[step, 0.0, 0.0], [0.0, step, 0.0]])
+        self.assertEqual(len(frames), 100)
+        self.assertEqual(frames.array().shape, (100, 2, 3))
+        self.assertEqual(frames[-1][1, 1], 99.0)
+        frames[0] = numpy.zeros((2, 3)) + 5.0
+        self.assertEqual(frames[0][0, 0], 5.0)
+        self.assertEqual([frame[0, 0] for frame in frames][:3], [5.0, 1.0, 2.0])
+        self.assertIs(numpy.asarray(frames).base, frames.array().base)
+
+    def test_scalars(self):
+        """Are scalar frames, such as energies, kept in a one-dimensional array?"""
+
+        frames = utils.FrameBuffer([1.0, 2.0, 3.0])
+        numpy.testing.assert_array_equal(numpy.asarray(frames), [1.0, 2.0, 3.0])
+        self.assertEqual(utils.FrameBuffer().array().shape, (0,))
+
+    def test_array_copy(self):
+        """Does conversion to an array follow the copy argument of NumPy 2?"""
+
+        frames = utils.FrameBuffer([1.0, 2.0, 3.0])
+        self.assertIs(frames.__array__(copy=False).base, frames.array().base)
+        self.assertIsNot(frames.__array__(copy=True).base, frames.array().base)
+        self.assertEqual(frames.__array__("i", copy=True).tolist(), [1, 2, 3])
+        self.assertRaises(ValueError, frames.__array__, "i", copy=False)
+
+    def test_truncate(self):
+        """Are the frames from an index on dropped, so that others can be appended again?"""
+
+        frames = utils.FrameBuffer([1.0, 2.0, 3.0])
+        frames.truncate(1)
+        frames.append(4.0)
+        self.assertEqual(frames.array().tolist(), [1.0, 4.0])
+
+        frames = utils.FrameBuffer([[1.0], [2.0, 3.0], [4.0]])
+        frames.truncate(2)
+        self.assertEqual(len(frames), 2)
+        self.assertEqual(list(frames[-1]), [2.0, 3.0])
+
+    def test_shapes(self):
+        """Are frames of different shapes kept as a list, converted like before?"""
+
+        frames = utils.FrameBuffer([[1.0, 2.0], [3.0, 4.0]])
+        frames.append([5.0])
+        self.assertEqual(len(frames), 3)
+        self.assertEqual(list(frames[-1]), [5.0])
+        self.assertRaises(ValueError, frames.array)
+
+        frames = utils.FrameBuffer([[1.0, 2.0], [3.0, 4.0]])
+        frames.append([5.0, 6.0])
+        self.assertEqual(frames.array().tolist(), [[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]])
+
+    def test_discard(self):
+        """Are discarded frames dropped from memory, keeping the indices of the others?"""
+
+        frames = utils.FrameBuffer()
+        for step in range(100):
+            frames.append([step, 0.0])
+            frames.discard(step - 2)
+        self.assertEqual(len(frames), 100)
+        self.assertLessEqual(len(frames._data), 8)
+        self.assertEqual(frames[-1].tolist(), [99.0, 0.0])
+        self.assertEqual(frames[98].tolist(), [98.0, 0.0])
+        self.assertEqual(frames[97:][:, 0].tolist(), [97.0, 98.0, 99.0][-len(frames.array()):])
+        self.assertRaises(IndexError, frames.__getitem__, 0)
+
+        frames = utils.FrameBuffer([[1.0], [2.0, 3.0], [4.0]])
+        frames.discard(2)
+        self.assertEqual(len(frames), 3)
+        self.assertEqual(frames[2], [4.0])
+        self.assertEqual(frames.array().tolist(), [[4.0]])
+
+        frames = utils.FrameBuffer([1.0, 2.0, 3.0, 4.0])
+        frames.discard(2)
+        frames.truncate(3)
+        frames.append(5.0)
+        self.assertEqual(len(frames), 4)
+        self.assertEqual(frames.array().tolist(), [3.0, 5.0])
+
+
+if __name__ == "__main__":
+    unittest.main()